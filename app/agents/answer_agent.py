@@ -1,24 +1,64 @@
-from app.models import JobDescription, UserProfile
+import os
+from typing import AsyncIterator, Optional
+from app.models import JobDescription, ResumeDigest, UserProfile
+from app.tools.jd_sections import ANSWER_PRIORITY, compress_jd
+from app.tools.resume_digest import resume_prompt
+
+ANSWER_JD_TOKENS = int(os.getenv("ANSWER_JD_TOKENS", "400"))  # requirements / responsibilities the answer can point at
+ANSWER_RESUME_TOKENS = int(os.getenv("ANSWER_RESUME_TOKENS", "250"))
 
 class AnswerAgent:
     def __init__(self, llm_provider=None):
         self.llm = llm_provider
 
-    async def generate_answer(self, question: str, jd: JobDescription, profile: UserProfile) -> str:
+    async def generate_answer(self, question: str, jd: JobDescription, profile: UserProfile, regenerate: bool = False, resume: Optional[ResumeDigest] = None) -> str:
+        prompt = self._build_prompt(question, jd, profile, resume)
+        if not self.llm:
+            return "AI Client not configured."
+
+        # The AI Client returns a raw string (the answer)
+        # regenerate skips the response cache so the user gets a fresh draft
+        response = await self.llm.chat(prompt, agent="answer", bypass_cache=regenerate)
+        return response.strip()
+
+    async def stream_answer(self, question: str, jd: JobDescription, profile: UserProfile, regenerate: bool = False, resume: Optional[ResumeDigest] = None) -> AsyncIterator[str]:
+        """generate_answer, but yields the text as the model writes it"""
+        prompt = self._build_prompt(question, jd, profile, resume)
+        if not self.llm:
+            yield "AI Client not configured."
+            return
+
+        started = False
+        async for chunk in self.llm.chat_stream(prompt, agent="answer", bypass_cache=regenerate):
+            if not started:
+                # same leading-whitespace trim as generate_answer
+                chunk = chunk.lstrip()
+                if not chunk:
+                    continue
+                started = True
+            yield chunk
+
+    def _build_prompt(self, question: str, jd: JobDescription, profile: UserProfile, resume: Optional[ResumeDigest] = None) -> str:
         # Data Science Logic: We feed the AI the 'Work History' and 'Skills' separately
         work_context = ""
         for exp in profile.work_history[:2]: # Use top 2 experiences
             work_context += f"- {exp.role} at {exp.company}: {exp.description}\n"
 
+        # the stored resume digest adds normalized skills + highlights the profile may lack
+        skills = list(dict.fromkeys(profile.skills + (resume.skills if resume else [])))
+        resume_context = f"USER RESUME (Digest):\n{resume_prompt(resume, ANSWER_RESUME_TOKENS)}\n" if resume else ""
+
         prompt = f"""
 Role: Professional Career Coach & Ghostwriter.
 Task: Write a personalized response to a specific application question.
 
 APPLICATION QUESTION: {question}
 TARGET JOB: {jd.title} at {jd.company}
-USER SKILLS: {", ".join(profile.skills)}
+JOB DESCRIPTION (Key sections):
+{compress_jd(jd.raw_text, ANSWER_JD_TOKENS, ANSWER_PRIORITY)}
+USER SKILLS: {", ".join(skills)}
 USER EXPERIENCE:
-{work_context}
+{work_context}{resume_context}
 
 INSTRUCTIONS:
 1. Use the STAR Method (Situation, Task, Action, Result).
@@ -29,9 +69,4 @@ INSTRUCTIONS:
 
 Answer:
 """
-        if not self.llm:
-            return "AI Client not configured."
-
-        # The AI Client returns a raw string (the answer)
-        response = await self.llm.chat(prompt)
-        return response.strip()
\ No newline at end of file
+        return prompt
\ No newline at end of file
@@ -1,6 +1,131 @@
 import json
-from typing import Dict, Any, Optional, List
+import os
+from typing import Dict, Any, Optional, List, Union
+
+import numpy as np
+import pandas as pd
+
 from app.models import JobDescription
+from app.tools.jd_sections import PREFERENCE_PRIORITY, compress_jd
+from app.tools.keyword_matcher import KeywordMatcher, MatcherCache
+
+PREFERENCE_JD_TOKENS = int(os.getenv("PREFERENCE_JD_TOKENS", "375"))
+
+REMOTE_KEYWORDS = ['remote', 'work from home', 'wfh', 'distributed', 'anywhere']
+LEVEL_KEYWORDS = {
+    'entry level': ['entry', 'junior', 'associate', 'graduate'],
+    'mid-level': ['mid', 'intermediate', 'engineer ii', 'engineer 2'],
+    'senior': ['senior', 'sr.', 'lead engineer', 'staff'],
+    'lead/principal': ['lead', 'principal', 'architect', 'staff engineer'],
+    'executive/director': ['director', 'vp', 'vice president', 'executive', 'head of', 'chief']
+}
+VALUE_KEYWORDS = {
+    'competitive compensation': ['competitive salary', 'competitive compensation', 'competitive pay', 'equity', 'stock options'],
+    'work-life balance': ['work-life balance', 'flexible hours', 'work life balance', 'flexible schedule'],
+    'career growth': ['career growth', 'professional development', 'learning', 'advancement', 'promotion'],
+    'company culture': ['culture', 'team environment', 'collaborative', 'inclusive', 'diversity'],
+    'making impact': ['impact', 'mission', 'meaningful work', 'change lives', 'make a difference'],
+    'flexibility': ['flexible', 'flexibility', 'hybrid', 'remote options', 'work from anywhere'],
+    'benefits & perks': ['benefits', 'health insurance', 'dental', '401k', 'pto', 'vacation', 'perks'],
+    'job security': ['stable', 'established', 'fortune 500', 'publicly traded', 'security']
+}
+
+# any level's keywords in a title, to warn about level mismatches
+TITLE_LEVEL_MATCHER = KeywordMatcher([(('level', level), keywords) for level, keywords in LEVEL_KEYWORDS.items()])
+# compiled matchers per user_id, rebuilt when that user's preferences change
+matcher_cache = MatcherCache()
+
+
+def build_preference_matcher(preferences: Dict[str, Any]) -> KeywordMatcher:
+    """Every keyword the boost looks for in a description, labelled with what it stands for."""
+    table = [
+        ('field', [preferences.get('field') or '']),
+        ('subfield', [preferences.get('subfield') or '']),
+        ('specialization', [preferences.get('specialization') or '']),
+        ('remote', REMOTE_KEYWORDS),
+    ]
+    table += [(('location', loc.lower()), [loc]) for loc in preferences.get('locations', [])]
+    role_level = (preferences.get('role_level') or '').lower()
+    table.append((('level', role_level), LEVEL_KEYWORDS.get(role_level, [])))
+    table += [(('value', v.lower()), VALUE_KEYWORDS.get(v.lower(), [])) for v in preferences.get('values', [])]
+    return KeywordMatcher(table)
+
+
+def preference_matcher_for(preferences: Dict[str, Any]) -> KeywordMatcher:
+    fingerprint = json.dumps(
+        [preferences.get(k) for k in ('field', 'subfield', 'specialization', 'locations', 'role_level', 'values')], sort_keys=True
+    )
+    key = preferences.get('user_id') or fingerprint
+    return matcher_cache.get(key, fingerprint, lambda: build_preference_matcher(preferences))
+
+
+def _hits(matcher: KeywordMatcher, jobs: pd.DataFrame, column: str) -> List[set]:
+    if column not in jobs.columns:
+        return [set()] * len(jobs)
+    return [matcher.scan(text) for text in jobs[column].fillna("").astype(str)]
+
+
+def _has(hits: List[set], label) -> np.ndarray:
+    return np.fromiter((label in h for h in hits), dtype=bool, count=len(hits))
+
+
+def preference_frame(jobs: Union[pd.DataFrame, List[Union[dict, JobDescription]]], preferences: Optional[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    calculate_preference_boost for a whole search result at once: one matcher scan per
+    text column and row, then the points for every row in numpy, no insight strings.
+    Adds `preference_boost` (same points and cap), `remote_match` (remote keywords, or
+    JobSpy's own is_remote flag) and `level_match` columns. Takes the JobSpy DataFrame
+    (title / location / description) or a list of job dicts / JobDescriptions.
+    The input frame is left untouched.
+    """
+    if not isinstance(jobs, pd.DataFrame):
+        jobs = pd.DataFrame([
+            {"title": j.title, "company": j.company, "location": j.location, "description": j.raw_text} if isinstance(j, JobDescription) else j
+            for j in jobs
+        ])
+    if jobs.empty:
+        return jobs.assign(preference_boost=pd.Series(dtype=int), remote_match=pd.Series(dtype=bool), level_match=pd.Series(dtype=bool))
+    preferences = preferences or {}
+    matcher = preference_matcher_for(preferences)
+    text_hits = _hits(matcher, jobs, "description")
+    location_hits = _hits(matcher, jobs, "location")
+    title_hits = _hits(TITLE_LEVEL_MATCHER, jobs, "title")
+
+    boost = np.zeros(len(jobs), dtype=int)
+    for key, points in (('field', 3), ('subfield', 3), ('specialization', 2)):
+        boost += points * _has(text_hits, key)
+
+    location = np.zeros(len(jobs), dtype=bool)
+    for loc in preferences.get('locations', []):
+        location |= _has(location_hits, ('location', loc.lower())) | _has(text_hits, ('location', loc.lower()))
+    boost += 3 * location
+
+    remote = _has(text_hits, 'remote')
+    if 'is_remote' in jobs.columns:
+        remote |= jobs['is_remote'].fillna(False).astype(bool).to_numpy()
+    if preferences.get('remote_preference', False):
+        boost += 2 * remote
+
+    role_level = ('level', (preferences.get('role_level') or '').lower())
+    level = _has(title_hits, role_level) | _has(text_hits, role_level)
+    boost += 4 * level
+
+    values_matched = np.zeros(len(jobs), dtype=int)
+    for v in preferences.get('values', []):
+        values_matched += _has(text_hits, ('value', v.lower()))
+    boost += np.minimum(3, values_matched)
+
+    return jobs.assign(preference_boost=np.minimum(20, boost), remote_match=remote, level_match=level)
+
+
+def rank_by_preferences(jobs: pd.DataFrame, preferences: Optional[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Search results with the preference columns, best fit first. The sort is stable, so
+    rows with the same boost keep their order (resume relevance, when ranked by it first).
+    """
+    scored = preference_frame(jobs, preferences)
+    return scored.sort_values("preference_boost", ascending=False, kind="stable").reset_index(drop=True)
+
 
 class PreferenceMatcher:
     """
@@ -14,6 +139,7 @@ class PreferenceMatcher:
     def calculate_preference_boost(self, job_description: JobDescription, preferences: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Calculate preference-based boost to match score and generate personalized insights.
+        Keywords match whole words only, through a matcher compiled once per user.
         
         Returns:
             {
@@ -33,42 +159,38 @@ class PreferenceMatcher:
         insights = []
         warnings = []
         
-        job_text = job_description.raw_text.lower()
-        job_title = job_description.title.lower()
-        job_location = job_description.location.lower() if job_description.location else ""
+        matcher = preference_matcher_for(preferences)
+        text_hits = matcher.scan(job_description.raw_text)
+        title_hits = TITLE_LEVEL_MATCHER.scan(job_description.title)
+        location_hits = matcher.scan(job_description.location or "")
         
         # 1. Field & Subfield Matching (up to +8 points)
-        field = preferences.get('field', '').lower()
-        subfield = preferences.get('subfield', '').lower()
-        specialization = preferences.get('specialization', '').lower()
-        
-        if field and field in job_text:
+        if 'field' in text_hits:
             boost += 3
             insights.append(f"✓ This role aligns with your {preferences.get('field')} field preference")
         
-        if subfield and subfield in job_text:
+        if 'subfield' in text_hits:
             boost += 3
             insights.append(f"✓ Matches your {preferences.get('subfield')} expertise")
         
-        if specialization and specialization in job_text:
+        if 'specialization' in text_hits:
             boost += 2
             insights.append(f"✓ Perfect fit for your {preferences.get('specialization')} specialization")
         
         # 2. Location Matching (up to +5 points)
-        user_locations = [loc.lower() for loc in preferences.get('locations', [])]
         remote_preference = preferences.get('remote_preference', False)
         
         location_matched = False
-        for loc in user_locations:
-            if loc in job_location or loc in job_text:
+        for loc in preferences.get('locations', []):
+            label = ('location', loc.lower())
+            if label in location_hits or label in text_hits:
                 boost += 3
-                insights.append(f"✓ Location match: {loc.title()}")
+                insights.append(f"✓ Location match: {loc.lower().title()}")
                 location_matched = True
                 break
         
         # Check for remote work
-        remote_keywords = ['remote', 'work from home', 'wfh', 'distributed', 'anywhere']
-        is_remote_job = any(keyword in job_text for keyword in remote_keywords)
+        is_remote_job = 'remote' in text_hits
         
         if remote_preference and is_remote_job:
             boost += 2
@@ -79,46 +201,21 @@ class PreferenceMatcher:
             insights.append("ℹ This role offers remote work flexibility")
         
         # 3. Role Level Matching (up to +4 points)
-        role_level = preferences.get('role_level', '').lower()
-        level_keywords = {
-            'entry level': ['entry', 'junior', 'associate', 'graduate'],
-            'mid-level': ['mid', 'intermediate', 'engineer ii', 'engineer 2'],
-            'senior': ['senior', 'sr.', 'lead engineer', 'staff'],
-            'lead/principal': ['lead', 'principal', 'architect', 'staff engineer'],
-            'executive/director': ['director', 'vp', 'vice president', 'executive', 'head of', 'chief']
-        }
+        role_level = (preferences.get('role_level') or '').lower()
         
-        if role_level in level_keywords:
-            keywords = level_keywords[role_level]
-            if any(keyword in job_title or keyword in job_text for keyword in keywords):
+        if role_level in LEVEL_KEYWORDS:
+            if ('level', role_level) in title_hits or ('level', role_level) in text_hits:
                 boost += 4
                 insights.append(f"✓ Role level matches your {preferences.get('role_level')} target")
             else:
                 # Check if it's a mismatch
-                for level, kws in level_keywords.items():
-                    if level != role_level and any(kw in job_title for kw in kws):
+                for level in LEVEL_KEYWORDS:
+                    if level != role_level and ('level', level) in title_hits:
                         warnings.append(f"⚠ This appears to be a {level.title()} role, but you're targeting {preferences.get('role_level')}")
                         break
         
         # 4. Values Alignment (up to +3 points) - Check if job description mentions user values
-        user_values = [v.lower() for v in preferences.get('values', [])]
-        value_keywords = {
-            'competitive compensation': ['competitive salary', 'competitive compensation', 'competitive pay', 'equity', 'stock options'],
-            'work-life balance': ['work-life balance', 'flexible hours', 'work life balance', 'flexible schedule'],
-            'career growth': ['career growth', 'professional development', 'learning', 'advancement', 'promotion'],
-            'company culture': ['culture', 'team environment', 'collaborative', 'inclusive', 'diversity'],
-            'making impact': ['impact', 'mission', 'meaningful work', 'change lives', 'make a difference'],
-            'flexibility': ['flexible', 'flexibility', 'hybrid', 'remote options', 'work from anywhere'],
-            'benefits & perks': ['benefits', 'health insurance', 'dental', '401k', 'pto', 'vacation', 'perks'],
-            'job security': ['stable', 'established', 'fortune 500', 'publicly traded', 'security']
-        }
-        
-        values_matched = 0
-        for value in user_values:
-            if value in value_keywords:
-                keywords = value_keywords[value]
-                if any(keyword in job_text for keyword in keywords):
-                    values_matched += 1
+        values_matched = sum(1 for v in preferences.get('values', []) if ('value', v.lower()) in text_hits)
         
         if values_matched > 0:
             boost += min(3, values_matched)
@@ -156,7 +253,7 @@ JOB DETAILS:
 - Title: {job_description.title}
 - Company: {job_description.company}
 - Location: {job_description.location}
-- Description: {job_description.raw_text[:1500]}
+- Description: {compress_jd(job_description.raw_text, PREFERENCE_JD_TOKENS, PREFERENCE_PRIORITY)}
 
 Provide a brief 2-3 sentence personalized analysis of how this job aligns with the user's preferences. 
 Focus on the most important matches or mismatches. Be honest but constructive.
@@ -165,7 +262,7 @@ Return ONLY the analysis text, no JSON or formatting.
 """
         
         try:
-            response = await self.llm_provider.chat(prompt)
+            response = await self.llm_provider.chat(prompt, agent="preferences")
             return response.strip()
         except Exception as e:
             return ""
@@ -1,7 +1,21 @@
+import asyncio
 import json
+import os
 import re
-from typing import Dict, Any
-from app.models import JobDescription
+from typing import AsyncIterator, Dict, Any, List, Optional
+from pydantic import ValidationError
+from app.models import JobDescription, ResumeMatch
+from app.tools.jd_sections import SCORING_PRIORITY, compress_jd, estimate_tokens
+from app.tools.json_stream import JsonFieldStream
+from app.tools.resume_digest import Resume, resume_prompt
+
+# --- Batched Scoring Config (override via env) ---
+SCORING_BATCH_TOKEN_BUDGET = int(os.getenv("SCORING_BATCH_TOKEN_BUDGET", "6000"))  # prompt + expected answer
+SCORING_BATCH_MAX_JOBS = int(os.getenv("SCORING_BATCH_MAX_JOBS", "8"))
+SCORING_JD_TOKENS = int(os.getenv("SCORING_JD_TOKENS", "500"))  # job description budget in a single prompt
+BATCH_JD_TOKENS = int(os.getenv("SCORING_BATCH_JD_TOKENS", "375"))  # ...and per job in a batched prompt
+RESULT_TOKENS = 250  # room for one job's JSON in the answer
+
 
 class ScoringAgent:
     def __init__(self, llm_provider=None):
@@ -9,30 +23,130 @@ class ScoringAgent:
         llm_provider: The AIClient instance from your root directory.
         """
         self.llm_provider = llm_provider
+        self.token_budget = SCORING_BATCH_TOKEN_BUDGET
+        self.max_batch_jobs = SCORING_BATCH_MAX_JOBS
+        self.batch_stats = {"batches": 0, "jobs_batched": 0, "fallbacks": 0}
 
-    async def generate_score(self, resume_text: str, job_description: JobDescription, user_preferences: dict = None) -> Dict[str, Any]:
+    async def generate_score(self, resume_text: Resume, job_description: JobDescription, user_preferences: dict = None) -> Dict[str, Any]:
         """
         Performs deep analysis and keyword extraction to provide actionable insights.
         Now includes preference-based matching for personalized results.
         """
         # check if err so we dont crash
         if job_description.title.startswith("Error"):
-            return {
-                "match_score": 0,
-                "matched_skills": [],
-                "missing_skills": [],
-                "tailoring_tips": ["Job scraping failed. Please check the URL."],
-                "fit_summary": "Analysis failed due to invalid job description."
-            }
+            return self._scrape_failed_result()
+
+        prompt = self._build_prompt(resume_text, job_description)
+        if not self.llm_provider:
+            base_result = self._get_mock_analysis()
+        else:
+            # call teh ai
+            response = await self.llm_provider.chat(prompt, agent="scoring")
+            base_result = self._parse_json_response(response)
+
+        pref_result = self._preference_boost(job_description, user_preferences)
+        return self._apply_preferences(base_result, pref_result)
+
+    async def stream_score(self, resume_text: Resume, job_description: JobDescription, user_preferences: dict = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        generate_score over a token stream. Yields {"field": name, "value": v} as soon as
+        each top level field of the model's JSON is complete, then {"result": {...}} with
+        exactly what generate_score would have returned.
+        The preference boost doesn't need the model so it is applied to the streamed
+        match_score / fit_summary right away.
+        """
+        if job_description.title.startswith("Error"):
+            yield {"result": self._scrape_failed_result()}
+            return
 
+        pref_result = self._preference_boost(job_description, user_preferences)
+        if not self.llm_provider:
+            result = self._apply_preferences(self._get_mock_analysis(), pref_result)
+            for name, value in result.items():
+                yield {"field": name, "value": value}
+            yield {"result": result}
+            return
+
+        parser = JsonFieldStream()
+        parts = []
+        async for chunk in self.llm_provider.chat_stream(self._build_prompt(resume_text, job_description), agent="scoring"):
+            parts.append(chunk)
+            for name, value in parser.feed(chunk):
+                yield {"field": name, "value": self._boost_field(name, value, pref_result)}
+
+        yield {"result": self._apply_preferences(self._parse_json_response("".join(parts)), pref_result)}
+
+    async def generate_scores(self, resume_text: Resume, jobs: List[JobDescription], user_preferences: dict = None) -> List[Dict[str, Any]]:
+        """
+        generate_score for many jobs with fewer round-trips: jobs are packed into
+        batched prompts (see plan_batches) that send the resume once. Jobs whose entry
+        in the batch answer is missing or malformed are re-scored one by one.
+        Results come back in the order of `jobs`.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+        to_score = []
+        for i, job in enumerate(jobs):
+            if job.title.startswith("Error") or not self.llm_provider:
+                results[i] = await self.generate_score(resume_text, job, user_preferences)
+            else:
+                to_score.append(i)
+
+        async def score_batch(indices: List[int]):
+            if len(indices) == 1:
+                results[indices[0]] = await self.generate_score(resume_text, jobs[indices[0]], user_preferences)
+                return
+            batch = [jobs[i] for i in indices]
+            self.batch_stats["batches"] += 1
+            self.batch_stats["jobs_batched"] += len(batch)
+            response = await self.llm_provider.chat(self._build_batch_prompt(resume_text, batch), agent="scoring")
+            parsed = self._parse_batch_response(response, len(batch))
+
+            retry = []
+            for i, base_result in zip(indices, parsed):
+                if base_result is None:
+                    retry.append(i)
+                else:
+                    results[i] = self._apply_preferences(base_result, self._preference_boost(jobs[i], user_preferences))
+            self.batch_stats["fallbacks"] += len(retry)
+            singles = await asyncio.gather(*(self.generate_score(resume_text, jobs[i], user_preferences) for i in retry))
+            for i, result in zip(retry, singles):
+                results[i] = result
+
+        batches = self.plan_batches(resume_text, [jobs[i] for i in to_score])
+        await asyncio.gather(*(score_batch([to_score[b] for b in batch]) for batch in batches))
+        return results
+
+    def plan_batches(self, resume_text: Resume, jobs: List[JobDescription]) -> List[List[int]]:
+        """Greedy packing of job indices into batches that fit the token budget."""
+        batches, current = [], []
+        for i, job in enumerate(jobs):
+            if current and not self.fits_batch(resume_text, [jobs[j] for j in current] + [job]):
+                batches.append(current)
+                current = []
+            current.append(i)
+        if current:
+            batches.append(current)
+        return batches
+
+    def fits_batch(self, resume_text: Resume, jobs: List[JobDescription]) -> bool:
+        """A single job always fits, more only within max_batch_jobs and the token budget."""
+        if len(jobs) <= 1:
+            return True
+        if len(jobs) > self.max_batch_jobs:
+            return False
+        cost = estimate_tokens(self._build_batch_prompt(resume_text, jobs)) + RESULT_TOKENS * len(jobs)
+        return cost <= self.token_budget
+
+    def _build_prompt(self, resume_text: Resume, job_description: JobDescription) -> str:
         prompt = f"""
 Role: Expert ATS (Applicant Tracking System) Optimization Engineer.
 Task: Provide a high-fidelity match analysis between the Resume and Job Description.
 
 [CONTEXT]
 JOB TITLE: {job_description.title}
-JD CONTENT (Truncated): {job_description.raw_text[:2000]}
-USER RESUME: {resume_text[:2000]}
+JD CONTENT (Key sections): {compress_jd(job_description.raw_text, SCORING_JD_TOKENS, SCORING_PRIORITY)}
+USER RESUME (Digest):
+{resume_prompt(resume_text)}
 
 [ANALYSIS REQUIREMENTS]
 1. IDENTIFY: Top 5 matched technical skills/keywords.
@@ -55,36 +169,124 @@ USER RESUME: {resume_text[:2000]}
 
 Constraint: Return ONLY valid JSON. No conversational text.
 """
-        if not self.llm_provider:
-            base_result = self._get_mock_analysis()
-        else:
-            # call teh ai
-            response = await self.llm_provider.chat(prompt)
-            base_result = self._parse_json_response(response)
-        
+        return prompt
+
+    def _build_batch_prompt(self, resume_text: Resume, jobs: List[JobDescription]) -> str:
+        job_blocks = "\n".join(
+            f"JOB {i}\nJOB TITLE: {job.title}\nJD CONTENT (Key sections): {compress_jd(job.raw_text, BATCH_JD_TOKENS, SCORING_PRIORITY)}\n"
+            for i, job in enumerate(jobs, start=1)
+        )
+        prompt = f"""
+Role: Expert ATS (Applicant Tracking System) Optimization Engineer.
+Task: Provide a high-fidelity match analysis between the Resume and EACH of the {len(jobs)} numbered Job Descriptions, scoring every job independently.
+
+[CONTEXT]
+USER RESUME (Digest):
+{resume_prompt(resume_text)}
+
+[JOBS]
+{job_blocks}
+[ANALYSIS REQUIREMENTS - PER JOB]
+1. IDENTIFY: Top 5 matched technical skills/keywords.
+2. IDENTIFY: Top 5 missing technical skills/keywords required by the JD.
+3. ADVISE: 3 specific, actionable tailoring tips using the format: "Update [Section] to include [Skill/Action] because [Reason]."
+4. SCORE: 0-100 based on core technical alignment.
+
+[REQUIRED OUTPUT FORMAT - JSON ONLY]
+A JSON array with exactly {len(jobs)} objects, one per job, in job order:
+[
+    {{
+        "job": (int, the JOB number),
+        "match_score": (int),
+        "matched_skills": ["skill1", "skill2"],
+        "missing_skills": ["keyword1", "keyword2"],
+        "tailoring_tips": ["Tip 1...", "Tip 2...", "Tip 3..."],
+        "fit_summary": "One sentence data-driven explanation of the match."
+    }}
+]
+
+Constraint: Return ONLY valid JSON. No conversational text.
+"""
+        return prompt
+
+    def _parse_batch_response(self, response: str, count: int) -> List[Optional[Dict[str, Any]]]:
+        """
+        One analysis per job (in job order) out of a batched answer, None for every job
+        whose entry is missing or doesn't validate as a ResumeMatch.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * count
+        try:
+            code_block = re.search(r'```(?:json)?\s*(\[.*?\])\s*```', response, re.DOTALL)
+            array_match = code_block.group(1) if code_block else re.search(r'\[.*\]', response, re.DOTALL).group()
+            items = json.loads(array_match)
+        except Exception:
+            return results
+        if not isinstance(items, list):
+            return results
+
+        numbered = all(isinstance(item, dict) and isinstance(item.get("job"), int) for item in items)
+        if not numbered and len(items) != count:
+            # can't tell which answer belongs to which job
+            return results
+        for position, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            index = item.pop("job") - 1 if numbered else position
+            if not 0 <= index < count or results[index] is not None:
+                continue
+            try:
+                ResumeMatch(**item)
+            except (ValidationError, TypeError):
+                continue
+            results[index] = item
+        return results
+
+    def _preference_boost(self, job_description: JobDescription, user_preferences: dict = None) -> Optional[Dict[str, Any]]:
+        if not user_preferences:
+            return None
+        from app.agents.preference_matcher import PreferenceMatcher
+        matcher = PreferenceMatcher(self.llm_provider)
+        return matcher.calculate_preference_boost(job_description, user_preferences)
+
+    def _apply_preferences(self, base_result: Dict[str, Any], pref_result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Adds the preference boost / insights to a full analysis."""
         # apply prefs boost
-        if user_preferences:
-            from app.agents.preference_matcher import PreferenceMatcher
-            matcher = PreferenceMatcher(self.llm_provider)
-            pref_result = matcher.calculate_preference_boost(job_description, user_preferences)
-            
+        if pref_result:
             # boost score (max 100)
             base_score = base_result.get("match_score", 0)
-            boosted_score = min(100, base_score + pref_result["preference_boost"])
-            base_result["match_score"] = boosted_score
-            
+            base_result["match_score"] = min(100, base_score + pref_result["preference_boost"])
+
             # add insights to tips
             if pref_result["preference_insights"]:
                 base_result["preference_insights"] = pref_result["preference_insights"]
             if pref_result["preference_warnings"]:
                 base_result["preference_warnings"] = pref_result["preference_warnings"]
-            
+
             # add context to summary
-            if pref_result["preference_boost"] > 0:
+            if pref_result["preference_boost"] > 0 and "fit_summary" in base_result:
                 base_result["fit_summary"] += f" (+{pref_result['preference_boost']} preference boost)"
-        
+
         return base_result
 
+    def _boost_field(self, name: str, value: Any, pref_result: Optional[Dict[str, Any]]) -> Any:
+        """_apply_preferences for one streamed field."""
+        if not pref_result:
+            return value
+        if name == "match_score" and isinstance(value, (int, float)):
+            return min(100, value + pref_result["preference_boost"])
+        if name == "fit_summary" and isinstance(value, str) and pref_result["preference_boost"] > 0:
+            return value + f" (+{pref_result['preference_boost']} preference boost)"
+        return value
+
+    def _scrape_failed_result(self) -> Dict[str, Any]:
+        return {
+            "match_score": 0,
+            "matched_skills": [],
+            "missing_skills": [],
+            "tailoring_tips": ["Job scraping failed. Please check the URL."],
+            "fit_summary": "Analysis failed due to invalid job description."
+        }
+
 
     def _parse_json_response(self, response: str) -> Dict[str, Any]:
         """
@@ -1,19 +1,30 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text
+from sqlalchemy import create_engine, event, inspect, tuple_, Column, DateTime, Index, Integer, LargeBinary, String, Text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import json
 
+import asyncio
+import base64
+import binascii
+import functools
+import hashlib
 import os
 import shutil
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from app.tools.preferences_cache import PreferencesCache
 
 # --- Db Migration & Path Setup ---
 OLD_DB_PATH = "./job_assistant.db"
 DATA_DIR = "./.data"
-NEW_DB_PATH = os.path.join(DATA_DIR, "job_assistant.db")
+NEW_DB_PATH = os.getenv("DB_PATH", os.path.join(DATA_DIR, "job_assistant.db"))
 
-# Ensure .data directory exists
-if not os.path.exists(DATA_DIR):
-    os.makedirs(DATA_DIR)
+# Ensure .data directory exists (or wherever DB_PATH points)
+if not os.path.exists(os.path.dirname(NEW_DB_PATH) or "."):
+    os.makedirs(os.path.dirname(NEW_DB_PATH))
 
 # move old db if needd
 if os.path.exists(OLD_DB_PATH) and not os.path.exists(NEW_DB_PATH):
@@ -27,9 +38,47 @@ if os.path.exists(OLD_DB_PATH) and not os.path.exists(NEW_DB_PATH):
 db_path_str = NEW_DB_PATH.replace("\\", "/")
 SQLALCHEMY_DATABASE_URL = f"sqlite:///{db_path_str}"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# --- Db Tuning Config (override via env) ---
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))  # db reader threads, and pooled connections to match
+DB_JOURNAL_MODE = os.getenv("DB_JOURNAL_MODE", "WAL")  # readers don't wait for writers
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")  # with WAL only a power loss can lose the last commits
+DB_CACHE_KB = int(os.getenv("DB_CACHE_KB", "16384"))  # page cache per connection
+DB_MMAP_BYTES = int(os.getenv("DB_MMAP_BYTES", "268435456"))
+DB_BUSY_TIMEOUT = float(os.getenv("DB_BUSY_TIMEOUT", "10.0"))  # seconds a writer waits for the write lock
+
+SQLITE_PRAGMAS = {
+    "journal_mode": DB_JOURNAL_MODE,
+    "synchronous": DB_SYNCHRONOUS,
+    "cache_size": -DB_CACHE_KB,  # negative = KiB
+    "mmap_size": DB_MMAP_BYTES,
+    "temp_store": "MEMORY",
+}
+
+# --- Analysis Storage Config (override via env) ---
+BLOB_COMPRESS_MIN_BYTES = int(os.getenv("BLOB_COMPRESS_MIN_BYTES", "512"))  # smaller analyses / postings are stored as is
+BLOB_COMPRESS_LEVEL = int(os.getenv("BLOB_COMPRESS_LEVEL", "6"))  # zlib level
+
+
+def make_engine(url: str = SQLALCHEMY_DATABASE_URL, pragmas: dict = SQLITE_PRAGMAS, pool_size: int = DB_POOL_SIZE):
+    """SQLite engine with the pragmas set on every new connection, pooled for the db threads."""
+    new_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False, "timeout": DB_BUSY_TIMEOUT},
+        pool_size=pool_size,
+        max_overflow=pool_size,  # the writer thread and sync callers outside the db threads
+    )
+
+    @event.listens_for(new_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return new_engine
+
+
+engine = make_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -50,6 +99,20 @@ class JobApplicationTable(Base):
     status = Column(String, default="Not Submitted")
     match_score = Column(Integer)
     url = Column(String)
+    user_id = Column(String, index=True)  # null for anonymous analyses
+    created_at = Column(DateTime, default=datetime.utcnow)
+    analysis_hash = Column(String)  # full ResumeMatch json in blobs, null for rows saved before it was kept
+    job_hash = Column(String)  # the posting (JobDescription without url) in blobs
+
+    # one per dashboard sort, with and without each filter, all ending in the keyset (sort column, id)
+    __table_args__ = (
+        Index("ix_applications_user_created", "user_id", "created_at", "id"),
+        Index("ix_applications_user_score", "user_id", "match_score", "id"),
+        Index("ix_applications_user_status_created", "user_id", "status", "created_at", "id"),
+        Index("ix_applications_user_status_score", "user_id", "status", "match_score", "id"),
+        Index("ix_applications_user_company_created", "user_id", "company", "created_at", "id"),
+        Index("ix_applications_user_company_score", "user_id", "company", "match_score", "id"),
+    )
 
 class UserPreferencesTable(Base):
     __tablename__ = "user_preferences"
@@ -62,9 +125,68 @@ class UserPreferencesTable(Base):
     locations = Column(Text)  # json list
     remote_preference = Column(Integer)  # 0 or 1 for boolean
     role_level = Column(String)
+    version = Column(Integer, default=1)  # bumped on every save, lets other workers spot stale cached copies
+
+class ResumeDigestTable(Base):
+    __tablename__ = "resume_digests"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String, index=True)  # null for anonymous uploads
+    content_hash = Column(String, index=True)  # sha256 of the text
+    file_hash = Column(String, index=True)  # sha256 of the uploaded pdf, if it came from one
+    text = Column(Text)
+    skills = Column(Text)  # json list
+    titles = Column(Text)  # json list
+    summary = Column(Text)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class BlobTable(Base):
+    """Analyses and job postings, content addressed: identical ones are stored once"""
+    __tablename__ = "blobs"
+    hash = Column(String, primary_key=True)  # sha256 of the uncompressed json
+    codec = Column(String)  # "zlib" or "raw"
+    size = Column(Integer)  # uncompressed bytes
+    data = Column(LargeBinary)
+
+def migrate_schema(bind):
+    """Creates missing tables, then the columns (and their indexes) added after a table was first created"""
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        if "version" not in {c["name"] for c in inspect(conn).get_columns("user_preferences")}:
+            conn.exec_driver_sql("ALTER TABLE user_preferences ADD COLUMN version INTEGER DEFAULT 1")
+        application_columns = {c["name"] for c in inspect(conn).get_columns("applications")}
+        if "user_id" not in application_columns:
+            conn.exec_driver_sql("ALTER TABLE applications ADD COLUMN user_id VARCHAR")
+        for column in ("analysis_hash", "job_hash"):
+            if column not in application_columns:
+                conn.exec_driver_sql(f"ALTER TABLE applications ADD COLUMN {column} VARCHAR")
+        if "created_at" not in application_columns:
+            conn.exec_driver_sql("ALTER TABLE applications ADD COLUMN created_at DATETIME")
+            # older rows get the migration time, same timestamp so they keep their insertion order (ties go by id).
+            # microseconds like sqlalchemy writes them: sqlite compares the strings, a cursor of "...:05.123000"
+            # must not sort after its own row's "...:05.123"
+            conn.exec_driver_sql("UPDATE applications SET created_at = strftime('%Y-%m-%d %H:%M:%f000', 'now')")
+        for index in JobApplicationTable.__table__.indexes:
+            index.create(bind=conn, checkfirst=True)
 
 # create teh tables
-Base.metadata.create_all(bind=engine)
+migrate_schema(engine)
+
+# the CRUD functions below are blocking, async code runs them on these threads instead of the event loop.
+# sqlite takes one writer at a time anyway: writes queue on their own thread (no busy waiting on the
+# write lock), so reads never wait behind a burst of writes
+db_executor = ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix="db")
+db_write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-write")
+
+
+async def run_db(func, *args, **kwargs):
+    """await a reading CRUD function on the db threads"""
+    return await asyncio.get_running_loop().run_in_executor(db_executor, functools.partial(func, *args, **kwargs))
+
+
+async def run_db_write(func, *args, **kwargs):
+    """await a writing CRUD function on the writer thread"""
+    return await asyncio.get_running_loop().run_in_executor(db_write_executor, functools.partial(func, *args, **kwargs))
+
 
 
 # --- CRUD Funcs ---
@@ -93,19 +215,75 @@ def save_user_profile(profile_data: dict):
     finally:
         db.close()
 
-def add_application(job_title: str, company: str, score: int, url: str):
+def add_application(job_title: str, company: str, score: int, url: str, user_id: str = None):
+    """Save one analysis, the app itself queues them for add_applications (see WriteBehindQueue)"""
+    return add_applications([{"job_title": job_title, "company": company, "score": score, "url": url, "user_id": user_id}])
+
+def blob_key(value) -> tuple:
+    """(sha256, canonical json bytes) of a json-able value, same content = same key whatever the key order"""
+    raw = json.dumps(value, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest(), raw
+
+def decode_blob(codec: str, data: bytes):
+    return json.loads(zlib.decompress(data) if codec == "zlib" else data)
+
+def _save_blobs(db, values: list) -> list:
+    """Stores the values not stored yet, returns their hashes (None stays None)"""
+    payloads = {}
+    hashes = []
+    for value in values:
+        if value is None:
+            hashes.append(None)
+            continue
+        digest, raw = blob_key(value)
+        payloads.setdefault(digest, raw)
+        hashes.append(digest)
+    if payloads:
+        stored = {h for (h,) in db.query(BlobTable.hash).filter(BlobTable.hash.in_(list(payloads)))}
+        rows = []
+        for digest, raw in payloads.items():
+            if digest in stored:
+                continue  # reposted job / same analysis again: only compressed once
+            compress = len(raw) >= BLOB_COMPRESS_MIN_BYTES
+            rows.append({"hash": digest, "codec": "zlib" if compress else "raw", "size": len(raw),
+                         "data": zlib.compress(raw, BLOB_COMPRESS_LEVEL) if compress else raw})
+        if rows:
+            # another worker may have stored the same one meanwhile
+            db.execute(sqlite_insert(BlobTable).on_conflict_do_nothing(index_elements=["hash"]), rows)
+    return hashes
+
+def job_snapshot(job: dict) -> dict:
+    """The part of a JobDescription that identifies the posting, the url stays on the application"""
+    return {k: job.get(k) for k in ("title", "company", "location", "raw_text")}
+
+def add_applications(records: list):
+    """
+    Save many analyses in one transaction (one commit for the whole batch).
+    Records may carry the full "analysis" and the "job" posting (dicts), both go to the blobs table.
+    """
+    if not records:
+        return 0
     db = SessionLocal()
     try:
-        new_app = JobApplicationTable(
-            job_title=job_title,
-            company=company,
-            match_score=score,
-            url=url
-        )
-        db.add(new_app)
+        analysis_hashes = _save_blobs(db, [r.get("analysis") for r in records])
+        job_hashes = _save_blobs(db, [job_snapshot(r["job"]) if r.get("job") else None for r in records])
+        db.add_all([
+            JobApplicationTable(
+                job_title=r["job_title"],
+                company=r["company"],
+                match_score=r["score"],
+                url=r["url"],
+                user_id=r.get("user_id"),
+                analysis_hash=analysis_hash,
+                job_hash=job_hash
+            )
+            for r, analysis_hash, job_hash in zip(records, analysis_hashes, job_hashes)
+        ])
         db.commit()
-        db.refresh(new_app)
-        return new_app
+        return len(records)
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
 
@@ -117,6 +295,74 @@ def get_all_applications():
     finally:
         db.close()
 
+DASHBOARD_SORTS = {"date": JobApplicationTable.created_at, "score": JobApplicationTable.match_score}
+
+def encode_cursor(sort_value, row_id: int) -> str:
+    value = sort_value.isoformat() if isinstance(sort_value, datetime) else sort_value
+    return base64.urlsafe_b64encode(json.dumps([value, row_id]).encode()).decode()
+
+def decode_cursor(cursor: str, sort: str):
+    """(sort value, id) of the last row of the previous page, ValueError when it isn't one of ours"""
+    try:
+        value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if sort == "date":
+            value = datetime.fromisoformat(value)
+        elif not isinstance(value, int):
+            raise ValueError
+        return value, int(row_id)
+    except (TypeError, ValueError, json.JSONDecodeError, UnicodeDecodeError, binascii.Error):
+        raise ValueError("invalid cursor")
+
+def get_applications(user_id: str = None, sort: str = "date", descending: bool = True, status: str = None,
+                     company: str = None, limit: int = 50, cursor: str = None):
+    """
+    One dashboard page: (rows, cursor of the next page or None).
+    Keyset pagination on (sort column, id), so each page is an index range scan
+    whatever the page number or table size. user_id None means anonymous analyses.
+    """
+    column = DASHBOARD_SORTS[sort]
+    db = SessionLocal()
+    try:
+        query = db.query(JobApplicationTable).filter(JobApplicationTable.user_id.is_(None) if user_id is None else JobApplicationTable.user_id == user_id)
+        if status:
+            query = query.filter(JobApplicationTable.status == status)
+        if company:
+            query = query.filter(JobApplicationTable.company == company)
+        if cursor:
+            after = tuple_(column, JobApplicationTable.id)
+            value, row_id = decode_cursor(cursor, sort)
+            query = query.filter(after < tuple_(value, row_id) if descending else after > tuple_(value, row_id))
+        order = (column.desc(), JobApplicationTable.id.desc()) if descending else (column.asc(), JobApplicationTable.id.asc())
+        rows = query.order_by(*order).limit(limit + 1).all()
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor(getattr(rows[-1], column.key), rows[-1].id)
+    finally:
+        db.close()
+
+def get_stored_analysis(application_id: int, user_id: str = None):
+    """
+    One of the user's applications (user_id None: an anonymous one) with its full analysis and
+    the posting it was scored against, None if the user has no such application.
+    analysis / job are None for rows saved before they were kept.
+    """
+    db = SessionLocal()
+    try:
+        row = db.get(JobApplicationTable, application_id)
+        if row is None or row.user_id != user_id:
+            return None
+        hashes = [h for h in (row.analysis_hash, row.job_hash) if h]
+        blobs = {b.hash: decode_blob(b.codec, b.data) for b in db.query(BlobTable).filter(BlobTable.hash.in_(hashes))} if hashes else {}
+        job = blobs.get(row.job_hash)
+        return {
+            "application": {c.name: getattr(row, c.name) for c in JobApplicationTable.__table__.columns},
+            "analysis": blobs.get(row.analysis_hash),
+            "job": dict(job, url=row.url) if job else None,
+        }
+    finally:
+        db.close()
+
 def save_user_preferences(preferences: dict):
     """Save or update user preferences"""
     db = SessionLocal()
@@ -133,6 +379,8 @@ def save_user_preferences(preferences: dict):
             existing.locations = json.dumps(preferences.get('locations', []))
             existing.remote_preference = 1 if preferences.get('remote_preference') else 0
             existing.role_level = preferences.get('role_level', '')
+            existing.version = UserPreferencesTable.version + 1  # in sql, concurrent saves from other workers can't collide
+            row = existing
         else:
             # Create new preferences
             new_prefs = UserPreferencesTable(
@@ -143,34 +391,101 @@ def save_user_preferences(preferences: dict):
                 specialization=preferences.get('specialization', ''),
                 locations=json.dumps(preferences.get('locations', [])),
                 remote_preference=1 if preferences.get('remote_preference') else 0,
-                role_level=preferences.get('role_level', '')
+                role_level=preferences.get('role_level', ''),
+                version=1
             )
             db.add(new_prefs)
+            row = new_prefs
         
         db.commit()
+        # re-read after the commit, so the cached copy has the stored version
+        preferences_cache.put(user_id, _preferences_dict(row), row.version)
         return True
     except Exception as e:
         print(f"Error saving preferences: {e}")
         db.rollback()
+        preferences_cache.invalidate(preferences.get('user_id'))
         return False
     finally:
         db.close()
 
-def get_user_preferences(user_id: str):
-    """Get user preferences by user_id"""
+def _preferences_dict(prefs: UserPreferencesTable) -> dict:
+    return {
+        'user_id': prefs.user_id,
+        'values': json.loads(prefs.values),
+        'field': prefs.field,
+        'subfield': prefs.subfield,
+        'specialization': prefs.specialization,
+        'locations': json.loads(prefs.locations),
+        'remote_preference': bool(prefs.remote_preference),
+        'role_level': prefs.role_level
+    }
+
+def load_user_preferences(user_id: str):
+    """(preferences or None, version) straight from the db"""
     db = SessionLocal()
     try:
         prefs = db.query(UserPreferencesTable).filter_by(user_id=user_id).first()
         if prefs:
+            return _preferences_dict(prefs), prefs.version
+        return None, None
+    finally:
+        db.close()
+
+def get_preferences_version(user_id: str):
+    """Current version of a user's preferences, None if they have none"""
+    db = SessionLocal()
+    try:
+        return db.query(UserPreferencesTable.version).filter_by(user_id=user_id).scalar()
+    finally:
+        db.close()
+
+# parsed preferences per user, kept in step by save_user_preferences and the version column
+preferences_cache = PreferencesCache(load_user_preferences, get_preferences_version)
+
+def get_user_preferences(user_id: str):
+    """Get user preferences by user_id (cached, don't modify the returned dict)"""
+    return preferences_cache.get(user_id)
+
+def save_resume_digest(digest: dict, user_id: str = None, file_hash: str = None):
+    """Save or refresh a resume digest, one row per user + resume text"""
+    db = SessionLocal()
+    try:
+        row = db.query(ResumeDigestTable).filter_by(user_id=user_id, content_hash=digest['content_hash']).first()
+        if not row:
+            row = ResumeDigestTable(user_id=user_id, content_hash=digest['content_hash'])
+            db.add(row)
+        row.file_hash = file_hash or row.file_hash
+        row.text = digest['text']
+        row.skills = json.dumps(digest.get('skills', []))
+        row.titles = json.dumps(digest.get('titles', []))
+        row.summary = digest.get('summary', '')
+        row.updated_at = datetime.utcnow()
+        db.commit()
+        return True
+    except Exception as e:
+        print(f"Error saving resume digest: {e}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+def get_resume_digest(content_hash: str = None, file_hash: str = None, user_id: str = None):
+    """Most recent digest matching every given key (user_id alone = the user's latest resume)"""
+    filters = {k: v for k, v in (('content_hash', content_hash), ('file_hash', file_hash), ('user_id', user_id)) if v}
+    if not filters:
+        return None
+    db = SessionLocal()
+    try:
+        row = db.query(ResumeDigestTable).filter_by(**filters).order_by(ResumeDigestTable.updated_at.desc()).first()
+        if row:
             return {
-                'user_id': prefs.user_id,
-                'values': json.loads(prefs.values),
-                'field': prefs.field,
-                'subfield': prefs.subfield,
-                'specialization': prefs.specialization,
-                'locations': json.loads(prefs.locations),
-                'remote_preference': bool(prefs.remote_preference),
-                'role_level': prefs.role_level
+                'user_id': row.user_id,
+                'content_hash': row.content_hash,
+                'text': row.text,
+                'skills': json.loads(row.skills),
+                'titles': json.loads(row.titles),
+                'summary': row.summary
             }
         return None
     finally:
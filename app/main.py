@@ -1,26 +1,56 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
 from fastapi import UploadFile, File, Form
 import PyPDF2
+import asyncio
+import hashlib
 import io
+import json
+import math
 from typing import List, Optional
 from fastapi.middleware.cors import CORSMiddleware
 import sys
 import os
-import pandas as pd
+from contextlib import asynccontextmanager
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from llm_client import AIClient
+from llm_client import AIClient, LLMError
 
 from app.tools.scraper import JobScraper
+from app.tools.scrape_cache import ScrapeCache
+from app.tools import search_results
+from app.tools.near_dupes import NearDuplicateIndex, analysis_context_key, posting_text
+from app.tools.single_flight import SingleFlight
+from app.tools.write_behind import WriteBehindQueue
+from app.tools.prerank import PRERANK_MIN_SIMILARITY, PRERANK_TOP_N, TfidfRanker, local_estimate, rank_frame, select_for_llm
+from app.tools.resume_digest import build_digest, content_hash
 from app.agents.scoring_agent import ScoringAgent
 from app.agents.answer_agent import AnswerAgent
 from app.agents.autofill_agent import AutofillAgent
-from app.database import add_application, get_all_applications, save_user_profile, save_user_preferences, get_user_preferences
-from app.models import ResumeMatch, UserProfile, JobApplication, JobDescription, UserPreferences
+from app.agents.preference_matcher import matcher_cache, rank_by_preferences
+from app.database import DASHBOARD_SORTS, add_applications, get_applications, save_user_preferences, get_user_preferences, get_resume_digest, save_resume_digest, get_stored_analysis, preferences_cache, run_db, run_db_write
+from app.models import ResumeMatch, UserProfile, JobApplication, JobDescription, UserPreferences, ResumeDigest, StoredAnalysis
 
 
-app = FastAPI(title="AI Job Assistant API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # one pooled http client for the whole app (keep-alive + http2)
+    await scraper.start()
+    await application_writer.start()
+    yield
+    # commit the applications still queued before the process goes away
+    await application_writer.close()
+    await scraper.close()
+
+
+app = FastAPI(title="AI Job Assistant API", lifespan=lifespan)
+
+@app.exception_handler(LLMError)
+async def llm_error_handler(request: Request, exc: LLMError):
+    """Model provider failures become 502/503/504 instead of a fake 0% match"""
+    headers = {"Retry-After": str(math.ceil(exc.retry_after))} if exc.retry_after else None
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc), "error_type": type(exc).__name__}, headers=headers)
 
 app.add_middleware(
     CORSMiddleware,
@@ -28,14 +58,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Search-Sites"],
 )
 
+# batch limits
+BATCH_MAX_JOBS = int(os.getenv("BATCH_MAX_JOBS", "50"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "5"))
+
+# dashboard pages
+DASHBOARD_PAGE_SIZE = int(os.getenv("DASHBOARD_PAGE_SIZE", "50"))
+DASHBOARD_MAX_PAGE_SIZE = int(os.getenv("DASHBOARD_MAX_PAGE_SIZE", "200"))
+
 # setup stuf
 ai_client = AIClient()
-scraper = JobScraper()
+scraper = JobScraper(cache=ScrapeCache())
 scoring_agent = ScoringAgent(llm_provider=ai_client)
 answer_agent = AnswerAgent(llm_provider=ai_client)
 autofill_agent = AutofillAgent()
+dupe_index = NearDuplicateIndex()
+analysis_flight = SingleFlight()  # coalesces identical concurrent analyses
+# analyses are recorded in groups by a background task, the request doesn't wait for the commit
+application_writer = WriteBehindQueue(lambda records: run_db_write(add_applications, records))
+resume_stats = {"digests_built": 0, "digests_reused": 0, "pdf_parses_skipped": 0}
 
 
 class AnalyzeRequest(BaseModel):
@@ -55,58 +99,211 @@ class AnswerRequest(BaseModel):
     question: str
     job_url: str
     user_profile: UserProfile
+    regenerate: bool = False  # skip the cached answer and ask the model again
+    user_id: Optional[str] = None  # adds the user's stored resume digest to the prompt
+
+class BatchJob(BaseModel):
+    """One entry of a batch: either a url to scrape or a manual job description"""
+    url: Optional[str] = None
+    job_title: Optional[str] = None
+    company: Optional[str] = None
+    location: str = "Not Specified"
+    job_description: Optional[str] = None
+
+class BatchAnalyzeRequest(BaseModel):
+    resume_text: str
+    jobs: List[BatchJob]
+    user_id: Optional[str] = None
+    top_n: Optional[int] = None  # jobs that get a full LLM analysis, the rest a local estimate
+    min_similarity: Optional[float] = None
 
 class SearchJobRequest(BaseModel):
     query: str
     location: str = ""
     limit: int = 10
+    fields: Optional[List[str]] = None  # only return these columns
+    format: str = "records"  # records | columns | arrow
+    resume_text: Optional[str] = None  # ranks results by keyword similarity to the resume
+    user_id: Optional[str] = None  # ranks results by fit with the user's saved preferences
 
 
-async def extract_text_from_pdf(file: UploadFile) -> str:
-    """Extract text from uploaded PDF file"""
-    pdf_content = await file.read()
+def pdf_text(pdf_content: bytes) -> str:
     pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
-    
     resume_text = ""
     for page in pdf_reader.pages:
         resume_text += page.extract_text()
+    return resume_text
+
+async def extract_text_from_pdf(file: UploadFile, user_id: Optional[str] = None) -> str:
+    """Extract text from uploaded PDF file"""
+    return (await pdf_resume_digest(file, user_id)).text
+
+async def pdf_resume_digest(file: UploadFile, user_id: Optional[str] = None) -> ResumeDigest:
+    """
+    resume_digest of an uploaded PDF. A PDF uploaded before (same bytes) is not
+    parsed again, its stored digest has the text.
+    """
+    pdf_content = await file.read()
+    file_hash = content_hash(pdf_content)
+    stored = await run_db(get_resume_digest, file_hash=file_hash)
+    if stored:
+        resume_stats["pdf_parses_skipped"] += 1
+        return await resume_digest(stored["text"], user_id)
 
+    resume_text = await asyncio.to_thread(pdf_text, pdf_content)
     if not resume_text.strip():
         raise HTTPException(status_code=400, detail="Could not extract text from PDF.")
-    
-    return resume_text
+    return await resume_digest(resume_text, user_id, file_hash)
+
+async def resume_digest(resume_text: str, user_id: Optional[str] = None, file_hash: Optional[str] = None) -> ResumeDigest:
+    """
+    The stored digest of this resume (skills, titles, summary), built and saved the
+    first time the text is seen. Agents get it instead of the raw text.
+    """
+    text_hash = content_hash(resume_text)
+    stored = await run_db(get_resume_digest, content_hash=text_hash)
+    if stored:
+        resume_stats["digests_reused"] += 1
+        digest = ResumeDigest(**stored)
+        if (user_id and stored["user_id"] != user_id) or file_hash:
+            # remember it for this user / file too
+            await run_db_write(save_resume_digest, digest.dict(), user_id, file_hash)
+        return digest
+
+    digest = await asyncio.to_thread(build_digest, resume_text)
+    resume_stats["digests_built"] += 1
+    await run_db_write(save_resume_digest, digest.dict(), user_id, file_hash)
+    return digest
+
+async def score_job(resume_text: str, job_data: JobDescription, user_preferences: Optional[dict], resume: Optional[ResumeDigest] = None) -> dict:
+    """
+    ScoringAgent.generate_score, but a posting that is a near copy of one already
+    analyzed for the same resume + preferences reuses that stored analysis.
+    `resume` is the text's stored digest, the prompt is built from it when given.
+    """
+    doc_id, context_key, stored = await stored_analysis(resume_text, job_data, user_preferences)
+    if stored is not None:
+        return stored
+
+    analysis = await scoring_agent.generate_score(resume or resume_text, job_data, user_preferences)
+    await store_analysis(doc_id, context_key, analysis)
+    return analysis
+
+async def stored_analysis(resume_text: str, job_data: JobDescription, user_preferences: Optional[dict]):
+    """(doc_id, context_key, analysis or None) for the posting this job is a near copy of"""
+    doc_id = await asyncio.to_thread(dupe_index.canonical_id, posting_text(job_data.title, job_data.raw_text))
+    context_key = analysis_context_key(resume_text, user_preferences)
+    stored = None
+    if doc_id:
+        stored = await asyncio.to_thread(dupe_index.get_analysis, doc_id, context_key)
+    return doc_id, context_key, stored
+
+async def store_analysis(doc_id: Optional[str], context_key: str, analysis: dict):
+    # never keep llm / parsing failures around
+    if doc_id and "error" not in analysis:
+        await asyncio.to_thread(dupe_index.save_analysis, doc_id, context_key, analysis)
+
+def analysis_flight_key(resume_text: str, job_data: JobDescription, user_id: Optional[str]) -> str:
+    """Same resume + same posting (+ same user, whose prefs change the score) -> same analysis."""
+    payload = json.dumps([resume_text.strip(), job_data.title, job_data.company, job_data.raw_text, user_id])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def application_record(job_data: JobDescription, analysis: dict, url_for_db: str, user_id: Optional[str]) -> dict:
+    """Dashboard row for an analysis, with the full analysis and the posting so it can be reopened offline"""
+    try:
+        full = ResumeMatch(**analysis).dict()
+    except ValidationError:
+        full = None  # failed analyses only keep their row
+    return {
+        "job_title": job_data.title,
+        "company": job_data.company,
+        "score": analysis.get("match_score", 0),
+        "url": url_for_db,
+        "user_id": user_id,
+        "analysis": full,
+        "job": job_data.dict(),
+    }
 
 async def analyze_and_save(resume_text: str, job_data: JobDescription, url_for_db: str, user_id: str = None) -> ResumeMatch:
-    """Common logic for analyzing resume against job and saving to database"""
-    
+    """
+    Common logic for analyzing resume against job and saving to database.
+    Identical requests arriving while one is running share its result (and its db row).
+    """
+    key = analysis_flight_key(resume_text, job_data, user_id)
+    return await analysis_flight.do(key, lambda: _analyze_and_save(resume_text, job_data, url_for_db, user_id))
+
+async def _analyze_and_save(resume_text: str, job_data: JobDescription, url_for_db: str, user_id: str = None) -> ResumeMatch:
     # if user exists get prefs
     user_preferences = None
     if user_id:
-        user_preferences = get_user_preferences(user_id)
+        user_preferences = await run_db(get_user_preferences, user_id)
     
     # run analysis w/ prefs
-    analysis = await scoring_agent.generate_score(resume_text, job_data, user_preferences)
+    resume = await resume_digest(resume_text, user_id)
+    analysis = await score_job(resume_text, job_data, user_preferences, resume=resume)
     
-    add_application(
-        job_title=job_data.title,
-        company=job_data.company,
-        score=analysis.get("match_score", 0),
-        url=url_for_db
-    )
+    await application_writer.submit([application_record(job_data, analysis, url_for_db, user_id)])
     
     return analysis
 
 
 
+async def stream_analysis(resume_text: str, job_data: JobDescription, url_for_db: str, user_id: Optional[str], sse: bool):
+    """
+    analyze_and_save as a stream: each field of the analysis as soon as the model
+    has written it, then the final ResumeMatch (same as /api/analyze) once saved.
+    """
+    user_preferences = await run_db(get_user_preferences, user_id) if user_id else None
+    doc_id, context_key, analysis = await stored_analysis(resume_text, job_data, user_preferences)
+
+    if analysis is None:
+        resume = await resume_digest(resume_text, user_id)
+        try:
+            async for event in scoring_agent.stream_score(resume, job_data, user_preferences):
+                if "result" in event:
+                    analysis = event["result"]
+                else:
+                    yield format_stream_line(event, sse)
+        except LLMError as e:
+            # headers are already sent, report it in the stream and save nothing
+            yield format_stream_line({"done": True, "error": str(e), "error_type": type(e).__name__}, sse)
+            return
+        await store_analysis(doc_id, context_key, analysis)
+    else:
+        for name, value in analysis.items():
+            yield format_stream_line({"field": name, "value": value}, sse)
+
+    await application_writer.submit([application_record(job_data, analysis, url_for_db, user_id)])
+
+    try:
+        result = ResumeMatch(**analysis).dict()
+    except ValidationError:
+        yield format_stream_line({"done": True, "error": "Analysis failed.", "result": analysis}, sse)
+        return
+    yield format_stream_line({"done": True, "result": result}, sse)
+
+def stream_response(events, request: Request) -> StreamingResponse:
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    return StreamingResponse(events(sse), media_type="text/event-stream" if sse else "application/x-ndjson")
+
 @app.post("/api/analyze", response_model=ResumeMatch)
 async def analyze_job(request: AnalyzeRequest):
     """Analyze job from URL with text resume"""
-    job_data = scraper.scrape(request.url)
+    job_data = await scraper.scrape(request.url)
     if job_data.title.startswith("Error"):
         raise HTTPException(status_code=400, detail="Scraping failed.")
     
     return await analyze_and_save(request.resume_text, job_data, request.url, request.user_id)
 
+@app.post("/api/analyze-stream")
+async def analyze_job_stream(body: AnalyzeRequest, request: Request):
+    """/api/analyze streamed field by field as NDJSON (or SSE)"""
+    job_data = await scraper.scrape(body.url)
+    if job_data.title.startswith("Error"):
+        raise HTTPException(status_code=400, detail="Scraping failed.")
+
+    return stream_response(lambda sse: stream_analysis(body.resume_text, job_data, body.url, body.user_id, sse), request)
+
 @app.post("/api/analyze-manual", response_model=ResumeMatch)
 async def analyze_job_manual(request: ManualJobAnalyzeRequest):
     """Analyze job with manually entered job description and text resume"""
@@ -128,18 +325,19 @@ async def analyze_job_pdf(
 ):
     """Analyze job from URL with PDF resume"""
     try:
-        resume_text = await extract_text_from_pdf(file)
-        job_data = scraper.scrape(url)
-        
-        if job_data.title.startswith("Error"):
-            raise HTTPException(status_code=400, detail="Scraping failed.")
-        
-        return await analyze_and_save(resume_text, job_data, url, user_id)
+        resume_text = await extract_text_from_pdf(file, user_id)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"PDF Processing failed: {str(e)}")
 
+    job_data = await scraper.scrape(url)
+    if job_data.title.startswith("Error"):
+        raise HTTPException(status_code=400, detail="Scraping failed.")
+
+    # LLMError goes to llm_error_handler (502/503/504 + Retry-After)
+    return await analyze_and_save(resume_text, job_data, url, user_id)
+
 @app.post("/api/analyze-manual-pdf", response_model=ResumeMatch)
 async def analyze_job_manual_pdf(
     job_title: str = Form(...),
@@ -151,51 +349,314 @@ async def analyze_job_manual_pdf(
 ):
     """Analyze job with manually entered job description and PDF resume"""
     try:
-        resume_text = await extract_text_from_pdf(file)
-        
-        job_data = JobDescription(
-            title=job_title,
-            company=company,
-            location=location,
-            raw_text=job_description,
-            url=None
-        )
-        
-        return await analyze_and_save(resume_text, job_data, "Manual Entry", user_id)
+        resume_text = await extract_text_from_pdf(file, user_id)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"PDF Processing failed: {str(e)}")
 
+    job_data = JobDescription(
+        title=job_title,
+        company=company,
+        location=location,
+        raw_text=job_description,
+        url=None
+    )
+
+    # LLMError goes to llm_error_handler (502/503/504 + Retry-After)
+    return await analyze_and_save(resume_text, job_data, "Manual Entry", user_id)
+
+def validate_batch(jobs: List[BatchJob]):
+    if not jobs:
+        raise HTTPException(status_code=400, detail="No jobs given.")
+    if len(jobs) > BATCH_MAX_JOBS:
+        raise HTTPException(status_code=400, detail=f"Too many jobs, max is {BATCH_MAX_JOBS}.")
+    for i, job in enumerate(jobs):
+        if not job.url and not (job.job_title and job.company and job.job_description):
+            raise HTTPException(status_code=400, detail=f"Job {i} needs a url or job_title, company and job_description.")
+
+def format_stream_line(payload: dict, sse: bool) -> str:
+    data = json.dumps(payload)
+    return f"data: {data}\n\n" if sse else data + "\n"
+
+async def run_batch(resume_text: str, jobs: List[BatchJob], user_id: Optional[str], sse: bool,
+                    top_n: Optional[int] = None, min_similarity: Optional[float] = None):
+    """
+    Scores one resume against many jobs with bounded concurrency.
+    Jobs are scraped concurrently; as they come in they are packed into batched
+    scoring prompts (ScoringAgent.fits_batch) so the resume is sent once per batch.
+    With more than `top_n` jobs, every posting is ranked locally against the resume
+    first and only the top_n (plus any at/above min_similarity) reach the LLM, the
+    rest get a local estimate marked "estimated" that is not saved.
+    Yields one NDJSON line (or SSE event) per job as soon as it finishes,
+    then saves every successful analysis in a single transaction.
+    """
+    # prefs and the resume digest once for the whole batch
+    user_preferences = await run_db(get_user_preferences, user_id) if user_id else None
+    resume = await resume_digest(resume_text, user_id)
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    top_n = PRERANK_TOP_N if top_n is None else top_n
+    min_similarity = PRERANK_MIN_SIMILARITY if min_similarity is None else min_similarity
+    prerank = len(jobs) > top_n
+
+    async def prepare_one(index: int, job: BatchJob) -> dict:
+        """Scrape (or build) the posting and look up a stored near-duplicate analysis."""
+        async with semaphore:
+            try:
+                if job.url:
+                    job_data = await scraper.scrape(job.url)
+                    url_for_db = job.url
+                    if job_data.title.startswith("Error"):
+                        return {"index": index, "url": job.url, "error": "Scraping failed."}
+                else:
+                    job_data = JobDescription(
+                        title=job.job_title,
+                        company=job.company,
+                        location=job.location,
+                        raw_text=job.job_description,
+                        url=None
+                    )
+                    url_for_db = "Manual Entry"
+                doc_id, context_key, stored = await stored_analysis(resume_text, job_data, user_preferences)
+            except Exception as e:
+                return {"index": index, "url": job.url, "error": f"Analysis failed: {str(e)}"}
+            return {"index": index, "url": job.url, "job_data": job_data, "url_for_db": url_for_db,
+                    "doc_id": doc_id, "context_key": context_key, "stored": stored}
+
+    async def score_batch(batch: List[dict]) -> List[dict]:
+        async with semaphore:
+            try:
+                analyses = await scoring_agent.generate_scores(resume, [p["job_data"] for p in batch], user_preferences)
+            except Exception as e:
+                return [{"index": p["index"], "url": p["url"], "error": f"Analysis failed: {str(e)}"} for p in batch]
+        for prepared, analysis in zip(batch, analyses):
+            await store_analysis(prepared["doc_id"], prepared["context_key"], analysis)
+        return [finish(p, a) for p, a in zip(batch, analyses)]
+
+    def finish(prepared: dict, analysis: dict) -> dict:
+        job_data = prepared["job_data"]
+        try:
+            ResumeMatch(**analysis)
+        except ValidationError:
+            return {"index": prepared["index"], "url": prepared["url"], "error": "Analysis returned an invalid result."}
+        return {
+            "index": prepared["index"],
+            "url": prepared["url"],
+            "job_title": job_data.title,
+            "company": job_data.company,
+            "result": analysis,
+            "_record": application_record(job_data, analysis, prepared["url_for_db"], user_id),
+        }
+
+    def gate(prepared: List[dict]):
+        """(postings for the LLM, finished items with local estimates)"""
+        ranker = TfidfRanker([posting_text(p["job_data"].title, p["job_data"].raw_text) for p in prepared], resume_text)
+        similarity, coverage = ranker.similarities(), ranker.coverage()
+        selected = select_for_llm(similarity, top_n, min_similarity)
+        estimated = []
+        for row, p in enumerate(prepared):
+            if not selected[row]:
+                item = finish(p, local_estimate(ranker, row, float(coverage[row])))
+                item.pop("_record", None)  # only real analyses go to the dashboard
+                estimated.append(dict(item, estimated=True, relevance=round(float(similarity[row]), 4)))
+        return [p for row, p in enumerate(prepared) if selected[row]], estimated
+
+    pending = {asyncio.create_task(prepare_one(i, job)) for i, job in enumerate(jobs)}
+    preparing = len(pending)
+    buffer: List[dict] = []
+    to_rank: List[dict] = []
+    records = []
+    saved = False
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            ready = []
+            for task in done:
+                result = task.result()
+                if isinstance(result, list):
+                    ready.extend(result)
+                    continue
+                preparing -= 1
+                if "error" in result:
+                    ready.append(result)
+                elif result["stored"] is not None:
+                    ready.append(finish(result, result["stored"]))
+                elif prerank:
+                    # ranking needs the whole set
+                    to_rank.append(result)
+                else:
+                    # start a batch once the next posting would overflow it
+                    if buffer and not scoring_agent.fits_batch(resume, [p["job_data"] for p in buffer + [result]]):
+                        pending.add(asyncio.create_task(score_batch(buffer)))
+                        buffer = []
+                    buffer.append(result)
+            if preparing == 0 and to_rank:
+                selected, estimated = await asyncio.to_thread(gate, to_rank)
+                ready.extend(estimated)
+                for batch in scoring_agent.plan_batches(resume, [p["job_data"] for p in selected]):
+                    pending.add(asyncio.create_task(score_batch([selected[i] for i in batch])))
+                to_rank = []
+            if preparing == 0 and buffer:
+                pending.add(asyncio.create_task(score_batch(buffer)))
+                buffer = []
+
+            for item in ready:
+                record = item.pop("_record", None)
+                if record:
+                    records.append(record)
+                yield format_stream_line(item, sse)
+
+        saved = True
+        count = await application_writer.submit(records)
+        yield format_stream_line({"done": True, "total": len(jobs), "saved": count}, sse)
+    finally:
+        # client went away mid batch: stop pending work but keep what already finished
+        for task in pending:
+            task.cancel()
+        if not saved and records and not application_writer.submit_nowait(records):
+            await run_db_write(add_applications, records)
+
+def batch_response(resume_text: str, jobs: List[BatchJob], user_id: Optional[str], request: Request,
+                   top_n: Optional[int] = None, min_similarity: Optional[float] = None) -> StreamingResponse:
+    return stream_response(lambda sse: run_batch(resume_text, jobs, user_id, sse, top_n, min_similarity), request)
+
+@app.post("/api/analyze-batch")
+async def analyze_batch(body: BatchAnalyzeRequest, request: Request):
+    """Analyze one text resume against many jobs, streams results as NDJSON (or SSE)"""
+    validate_batch(body.jobs)
+    return batch_response(body.resume_text, body.jobs, body.user_id, request, body.top_n, body.min_similarity)
+
+@app.post("/api/analyze-batch-pdf")
+async def analyze_batch_pdf(
+    request: Request,
+    jobs: str = Form(...),
+    file: UploadFile = File(...),
+    user_id: Optional[str] = Form(None),
+    top_n: Optional[int] = Form(None),
+    min_similarity: Optional[float] = Form(None)
+):
+    """Analyze one PDF resume against many jobs, `jobs` is a JSON list of BatchJob"""
+    try:
+        batch_jobs = [BatchJob(**job) for job in json.loads(jobs)]
+    except (ValueError, TypeError, ValidationError):
+        raise HTTPException(status_code=400, detail="jobs must be a JSON list of jobs.")
+    validate_batch(batch_jobs)
+
+    try:
+        resume_text = await extract_text_from_pdf(file, user_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"PDF Processing failed: {str(e)}")
+
+    return batch_response(resume_text, batch_jobs, user_id, request, top_n, min_similarity)
+
 @app.post("/api/generate-answer")
-async def get_tailored_answer(request: AnswerRequest):
-    """Generate tailored answer for job application question"""
-    job_data = scraper.scrape(request.job_url)
-    answer = await answer_agent.generate_answer(request.question, job_data, request.user_profile)
+async def get_tailored_answer(body: AnswerRequest, request: Request):
+    """Generate tailored answer for job application question, streamed as SSE when the client accepts text/event-stream"""
+    job_data = await scraper.scrape(body.job_url)
+    stored = await run_db(get_resume_digest, user_id=body.user_id) if body.user_id else None
+    resume = ResumeDigest(**stored) if stored else None
+    if "text/event-stream" in request.headers.get("accept", ""):
+        return StreamingResponse(stream_answer(body, job_data, resume), media_type="text/event-stream")
+
+    answer = await answer_agent.generate_answer(body.question, job_data, body.user_profile, regenerate=body.regenerate, resume=resume)
     return {"answer": answer}
 
+async def stream_answer(body: AnswerRequest, job_data: JobDescription, resume: Optional[ResumeDigest] = None):
+    """SSE: {"token": ...} events while the model writes, then {"done": true, "answer": ...}"""
+    parts = []
+    try:
+        async for chunk in answer_agent.stream_answer(body.question, job_data, body.user_profile, regenerate=body.regenerate, resume=resume):
+            parts.append(chunk)
+            yield format_stream_line({"token": chunk}, sse=True)
+    except LLMError as e:
+        yield format_stream_line({"error": str(e), "error_type": type(e).__name__}, sse=True)
+        return
+    yield format_stream_line({"done": True, "answer": "".join(parts).strip()}, sse=True)
+
 @app.post("/api/search-jobs")
 async def search_jobs(request: SearchJobRequest):
     """Search for jobs using JobSpy"""
-    results = scraper.search_jobs(request.query, request.location, request.limit)
-    # fix pandas NaNs, json hates them
-    cleaned_results = []
-    for job in results:
-        cleaned_job = {k: (v if pd.notna(v) else None) for k, v in job.items()}
-        cleaned_results.append(cleaned_job)
-    return {"results": cleaned_results}
+    if request.format not in search_results.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(search_results.FORMATS)}")
+    if request.format == "arrow" and not search_results.ARROW_AVAILABLE:
+        raise HTTPException(status_code=400, detail="Arrow format needs pyarrow installed on the server.")
+
+    jobs, sites = await scraper.search_jobs_df(request.query, request.location, request.limit)
+    if request.resume_text:
+        jobs = await asyncio.to_thread(rank_frame, jobs, request.resume_text)
+    if request.user_id:
+        prefs = await run_db(get_user_preferences, request.user_id)
+        if prefs:
+            jobs = await asyncio.to_thread(rank_by_preferences, jobs, prefs)
+
+    # NaN -> null and json encoding happen column wise in pandas, off the event loop
+    if request.format == "arrow":
+        body = await asyncio.to_thread(search_results.arrow_ipc, jobs, request.fields)
+        return Response(content=body, media_type=search_results.ARROW_MEDIA_TYPE, headers={"X-Search-Sites": json.dumps(sites)})
+    body = await asyncio.to_thread(search_results.search_payload, jobs, sites, request.fields, request.format)
+    return Response(content=body, media_type="application/json")
+
+@app.get("/api/stats")
+async def get_stats():
+    """Cache counters for monitoring"""
+    return {
+        "scrape_cache": scraper.cache.stats() if scraper.cache else None,
+        "scraper": scraper.transfer_stats,
+        "scheduler": scraper.scheduler.stats(),
+        "search": dict(scraper.search_stats, last_errors=scraper.search_errors),
+        "near_duplicates": dupe_index.stats(),
+        "llm": ai_client.stats(),
+        "scoring": scoring_agent.batch_stats,
+        "llm_cache": ai_client.cache.stats() if ai_client.cache else None,
+        "single_flight": {"scrape": scraper.inflight.stats(), "analysis": analysis_flight.stats()},
+        "resume_digest": resume_stats,
+        "preferences": preferences_cache.stats(),
+        "preference_matchers": matcher_cache.stats(),
+        "application_writes": application_writer.stats(),
+    }
 
 @app.get("/api/dashboard", response_model=List[JobApplication])
-async def get_dashboard():
-    """Get all job applications from database"""
-    return get_all_applications()
+async def get_dashboard(response: Response, user_id: Optional[str] = None, sort: str = "date", order: str = "desc",
+                        status: Optional[str] = None, company: Optional[str] = None,
+                        limit: int = DASHBOARD_PAGE_SIZE, cursor: Optional[str] = None):
+    """
+    One page of a user's applications (anonymous ones without user_id), newest or best
+    scored first. Pass the X-Next-Cursor header of a page as `cursor` to get the next one,
+    it's absent on the last page.
+    """
+    if sort not in DASHBOARD_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(DASHBOARD_SORTS)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be asc or desc")
+    if not 1 <= limit <= DASHBOARD_MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {DASHBOARD_MAX_PAGE_SIZE}")
+    try:
+        rows, next_cursor = await run_db(get_applications, user_id, sort, order == "desc", status, company, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
+
+@app.get("/api/applications/{application_id}", response_model=StoredAnalysis)
+async def get_application(application_id: int, user_id: Optional[str] = None):
+    """
+    A saved analysis with its posting, straight from the database (no scraping, no LLM).
+    Only the owner's: user_id as for /api/dashboard, someone else's application is a 404.
+    """
+    stored = await run_db(get_stored_analysis, application_id, user_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Application not found")
+    return stored
 
 
 
 @app.post("/api/preferences")
 async def save_preferences(preferences: UserPreferences):
     """Save user preferences from onboarding"""
-    success = save_user_preferences(preferences.dict())
+    success = await run_db_write(save_user_preferences, preferences.dict())
     if success:
         return {"status": "success", "message": "Preferences saved successfully"}
     else:
@@ -204,7 +665,7 @@ async def save_preferences(preferences: UserPreferences):
 @app.get("/api/preferences/{user_id}")
 async def get_preferences(user_id: str):
     """Get user preferences by user_id"""
-    prefs = get_user_preferences(user_id)
+    prefs = await run_db(get_user_preferences, user_id)
     if prefs:
         return prefs
     else:
@@ -216,11 +677,39 @@ async def update_preferences(user_id: str, preferences: UserPreferences):
     if user_id != preferences.user_id:
         raise HTTPException(status_code=400, detail="User ID mismatch")
     
-    success = save_user_preferences(preferences.dict())
+    success = await run_db_write(save_user_preferences, preferences.dict())
     if success:
         return {"status": "success", "message": "Preferences updated successfully"}
     else:
         raise HTTPException(status_code=500, detail="Failed to update preferences")
 
+@app.post("/api/resume")
+async def upload_resume(
+    file: Optional[UploadFile] = File(None),
+    resume_text: Optional[str] = Form(None),
+    user_id: Optional[str] = Form(None)
+):
+    """Digest a resume (PDF or text) once, later analyses with the same resume reuse it"""
+    if file is not None:
+        try:
+            digest = await pdf_resume_digest(file, user_id)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"PDF Processing failed: {str(e)}")
+    elif resume_text and resume_text.strip():
+        digest = await resume_digest(resume_text, user_id)
+    else:
+        raise HTTPException(status_code=400, detail="Send a PDF file or resume_text.")
+    return digest.dict(exclude={"text"})
+
+@app.get("/api/resume/{user_id}")
+async def get_resume(user_id: str):
+    """The user's latest resume digest"""
+    stored = await run_db(get_resume_digest, user_id=user_id)
+    if not stored:
+        raise HTTPException(status_code=404, detail="No resume stored for this user")
+    return ResumeDigest(**stored).dict(exclude={"text"})
+
 
 app.mount("/", StaticFiles(directory="forntend", html=True), name="frontend")
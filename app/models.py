@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel, HttpUrl, Field
 
@@ -38,6 +39,15 @@ class ResumeMatch(BaseModel):
     missing_skills: List[str]
     tailoring_tips: List[str] = Field(..., description="Actionable advice to improve resume")
     fit_summary: str
+    estimated: bool = False  # True when scored locally by keyword overlap instead of the AI
+
+class ResumeDigest(BaseModel):
+    """Precomputed view of one resume, stored per user and reused by every analysis"""
+    content_hash: str  # sha256 of the text
+    text: str
+    skills: List[str] = []  # normalized names
+    titles: List[str] = []
+    summary: str = ""
 
 # --- Dashboard Model (To track progress) ---
 
@@ -49,6 +59,15 @@ class JobApplication(BaseModel):
     status: str = "Not Submitted" # e.g., Submitted, Interview Requested, Rejected
     match_score: int
     date_applied: Optional[str] = None
+    url: Optional[str] = None
+    user_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+class StoredAnalysis(BaseModel):
+    """An application with the full analysis and the posting it was scored against, as saved"""
+    application: JobApplication
+    analysis: Optional[ResumeMatch] = None  # None for applications saved before analyses were kept
+    job: Optional[JobDescription] = None
 
 # --- User Preferences Model (For Onboarding) ---
 
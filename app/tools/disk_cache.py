@@ -0,0 +1,159 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Sequence
+
+
+class DiskTier:
+    """
+    The SQLite half of a two tier cache: one table of key -> `columns` + expires_at, on its
+    own connection and lock. Every method blocks on the file, async callers run them with
+    asyncio.to_thread so the event loop never waits on a commit.
+
+    A read refreshes the row's accessed_at (the LRU clock pruning goes by) at most every
+    `touch_interval` seconds, so most hits are a plain SELECT. Every `prune_every` writes
+    rows expired longer than `stale_window` ago are dropped, then the least recently used
+    ones past `max_rows`. With `size_column` the summed size is kept under `max_bytes` on
+    every write.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table: str,
+        columns: Dict[str, str],
+        touch_interval: float = 600.0,
+        prune_every: int = 64,
+        stale_window: float = 0.0,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        size_column: Optional[str] = None,
+    ):
+        self.table = table
+        self.columns = list(columns)
+        self.touch_interval = touch_interval
+        self.prune_every = prune_every
+        self.stale_window = stale_window
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.size_column = size_column
+        self.used_bytes = 0
+        self._writes_since_prune = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        definitions = ", ".join(f"{name} {kind}" for name, kind in columns.items())
+        self._db.execute(
+            f"""CREATE TABLE IF NOT EXISTS {table} (
+                key TEXT PRIMARY KEY, {definitions}, expires_at REAL NOT NULL, accessed_at REAL NOT NULL
+            )"""
+        )
+        self._db.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_accessed ON {table} (accessed_at)")
+        self._prune()
+        if size_column:
+            self.used_bytes = self._db.execute(f"SELECT COALESCE(SUM({size_column}), 0) FROM {table}").fetchone()[0]
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[tuple]:
+        """The row's `columns` values followed by expires_at, expired or not, None when missing"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {', '.join(self.columns)}, expires_at, accessed_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[-1] >= self.touch_interval:
+                self._db.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+                self._db.commit()
+        return row[:-1]
+
+    def put(self, key: str, values: Sequence, expires_at: float) -> int:
+        """Stores `values` (in `columns` order) under key, returns how many rows were evicted to make room"""
+        placeholders = ", ".join("?" * (len(self.columns) + 3))
+        with self._lock:
+            if self.size_column:
+                old = self._db.execute(f"SELECT {self.size_column} FROM {self.table} WHERE key = ?", (key,)).fetchone()
+                self.used_bytes += values[self.columns.index(self.size_column)] - (old[0] if old else 0)
+            self._db.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, {', '.join(self.columns)}, expires_at, accessed_at) VALUES ({placeholders})",
+                (key, *values, expires_at, time.time()),
+            )
+            self._writes_since_prune += 1
+            evicted = self._shrink()
+            if self._writes_since_prune >= self.prune_every:
+                evicted += self._prune()
+            self._db.commit()
+        return evicted
+
+    def delete(self, key: str):
+        with self._lock:
+            if self.size_column:
+                old = self._db.execute(f"SELECT {self.size_column} FROM {self.table} WHERE key = ?", (key,)).fetchone()
+                self.used_bytes -= old[0] if old else 0
+            self._db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute(f"DELETE FROM {self.table}")
+            self._db.commit()
+            self.used_bytes = 0
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # --- internals, caller holds the lock (or is __init__) ---
+
+    def _prune(self) -> int:
+        """Drops rows too long expired, then caps by least recently used. Returns how many went"""
+        self._writes_since_prune = 0
+        before = self._db.total_changes
+        cutoff = time.time() - self.stale_window
+        if self.size_column:
+            # keep used_bytes right, only the rows about to go are summed
+            self.used_bytes -= self._db.execute(
+                f"SELECT COALESCE(SUM({self.size_column}), 0) FROM {self.table} WHERE expires_at < ?", (cutoff,)
+            ).fetchone()[0]
+        self._db.execute(f"DELETE FROM {self.table} WHERE expires_at < ?", (cutoff,))
+        if self.max_rows is not None:
+            if self.size_column:
+                self.used_bytes -= self._db.execute(
+                    f"SELECT COALESCE(SUM({self.size_column}), 0) FROM (SELECT {self.size_column} FROM {self.table} "
+                    f"ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_rows,),
+                ).fetchone()[0]
+            self._db.execute(
+                f"""DELETE FROM {self.table} WHERE key IN (
+                    SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_rows,),
+            )
+        return self._db.total_changes - before
+
+    def _shrink(self) -> int:
+        """Least recently used rows go until the size sum is under max_bytes, returns how many"""
+        evicted = 0
+        if not self.size_column or self.max_bytes is None:
+            return evicted
+        while self.used_bytes > self.max_bytes:
+            rows = self._db.execute(
+                f"SELECT key, {self.size_column} FROM {self.table} ORDER BY accessed_at LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self.used_bytes <= self.max_bytes:
+                    break
+                self._db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self.used_bytes -= size
+                evicted += 1
+        return evicted
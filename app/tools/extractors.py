@@ -0,0 +1,285 @@
+import html as html_lib
+import json
+import os
+import re
+from typing import Dict, Iterator, Optional
+
+from bs4 import BeautifulSoup
+from app.models import JobDescription
+
+# lxml is optional, we fall back to the BeautifulSoup html.parser backend without it
+try:
+    import lxml.html
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# "auto" picks the fastest installed backend
+SCRAPER_EXTRACTOR = os.getenv("SCRAPER_EXTRACTOR", "auto")
+
+# tags that never hold job description text
+JUNK_TAGS = ("script", "style", "nav", "footer", "header", "noscript", "iframe", "svg", "button", "input", "form")
+CONTENT_ID_RE = re.compile(r"content|job|desc", re.I)
+BODY_TAG_RE = re.compile(r"<body[\s>/]", re.I)
+
+# JSON-LD descriptions shorter than this are usually teasers, not the full posting
+JSONLD_MIN_DESCRIPTION = int(os.getenv("SCRAPER_JSONLD_MIN_DESCRIPTION", "200"))
+BLOCK_BREAK_RE = re.compile(r"<\s*(br|/p|/div|/li|/h[1-6]|/ul|/ol|/tr|li|p|div|h[1-6])\b[^>]*>", re.I)
+TAG_RE = re.compile(r"<[^>]+>")
+
+
+def find_job_posting(json_text: str) -> dict:
+    """
+    Returns the JobPosting object from one ld+json block, or {} if it isn't one.
+    """
+    try:
+        data = json.loads(json_text)
+
+        if isinstance(data, list):
+            data = data[0]
+
+        obj_type = data.get("@type", "")
+        if obj_type == "JobPosting" or (isinstance(obj_type, list) and "JobPosting" in obj_type):
+            return data
+    except:
+        pass
+    return {}
+
+
+def build_job(json_data: dict, title: Optional[str], company: Optional[str], raw_text: str, url: str) -> JobDescription:
+    """
+    Shared tail of every backend: JSON-LD wins, then page fallbacks, then placeholders.
+    `title` / `company` are the page fallbacks already resolved by the backend.
+    """
+    # 4. Extract Location
+    loc = json_data.get("jobLocation", {}).get("address", {})
+    if loc:
+         # Combine locality and region if available
+         location = f"{loc.get('addressLocality', '')}, {loc.get('addressRegion', '')}".strip(", ")
+    else:
+        location = "See Description"
+
+    # Normalize whitespace
+    raw_text = re.sub(r'\n+', '\n', raw_text).strip()
+
+    return JobDescription(
+        title=title.strip(),
+        company=company.strip(),
+        location=location,
+        raw_text=raw_text,
+        url=url
+    )
+
+
+def description_to_text(description: str) -> str:
+    """
+    Plain text of a JSON-LD description (HTML, often entity-escaped) without building a DOM.
+    One stripped line per block element, like get_text(separator="\n", strip=True).
+    """
+    text = html_lib.unescape(description)
+    text = BLOCK_BREAK_RE.sub("\n", text)
+    text = html_lib.unescape(TAG_RE.sub("", text))
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def job_from_json_ld(json_data: dict, url: str) -> Optional[JobDescription]:
+    """
+    Builds the JobDescription straight from a JobPosting block when it is complete
+    (title, company and a full description), else None so the page gets parsed.
+    """
+    try:
+        title = json_data.get("title")
+        company = json_data.get("hiringOrganization", {}).get("name")
+        description = json_data.get("description") or ""
+        if not title or not company or not isinstance(description, str):
+            return None
+        description = description.strip()
+        if len(description) < JSONLD_MIN_DESCRIPTION or description.endswith(("...", "\u2026")):
+            return None
+        return build_job(json_data, title, company, description_to_text(description), url)
+    except Exception:
+        # odd shapes (lists instead of objects etc.) go down the normal path
+        return None
+
+
+class HtmlExtractor:
+    """
+    Turns a downloaded job page into a JobDescription.
+    Backends must return exactly what SoupExtractor returns for the same page.
+    """
+    name = "base"
+
+    def extract(self, html: str, url: str) -> JobDescription:
+        raise NotImplementedError
+
+
+class SoupExtractor(HtmlExtractor):
+    """Reference backend: BeautifulSoup with the stdlib html.parser."""
+    name = "bs4"
+
+    def extract(self, html: str, url: str) -> JobDescription:
+        soup = BeautifulSoup(html, "html.parser")
+
+        # 1. Attempt to extract structured JSON-LD data (most reliable)
+        json_data = self._extract_json_ld(soup)
+
+        # 2. Extract Title
+        title = json_data.get("title") or (soup.title.string if soup.title else None)
+        if not title or title.strip() == "":
+            h1 = soup.find("h1")
+            title = h1.get_text(strip=True) if h1 else "Unknown Job Title"
+
+        # 3. Extract Company
+        company = json_data.get("hiringOrganization", {}).get("name")
+        if not company:
+            meta_company = soup.find("meta", property="og:site_name")
+            company = meta_company["content"] if meta_company else "Unknown Company"
+
+        # 5. Extract and Clean Text Description
+        # Remove non-content tags
+        for junk in soup(list(JUNK_TAGS)):
+            junk.decompose()
+
+        # Find the main content area - heuristics
+        content_area = soup.find("main") or soup.find("article") or soup.find("div", {"id": CONTENT_ID_RE}) or soup.body
+        raw_text = content_area.get_text(separator="\n", strip=True) if content_area else ""
+
+        return build_job(json_data, title, company, raw_text, url)
+
+    def _extract_json_ld(self, soup: BeautifulSoup) -> dict:
+        """
+        Helper method to look for structured 'JobPosting' data in the page's HTML.
+        """
+        scripts = soup.find_all("script", type="application/ld+json")
+        for script in scripts:
+            if not script.string: continue
+            data = find_job_posting(script.string)
+            if data:
+                return data
+        return {}
+
+
+class LxmlExtractor(HtmlExtractor):
+    """
+    Fast backend on lxml's C parser.
+    One walk over the tree collects JSON-LD, title, h1, og:site_name and the content
+    area candidates, a second walk over just the content area collects its text.
+    Junk subtrees are skipped while walking instead of being removed from the tree.
+    """
+    name = "lxml"
+
+    def __init__(self):
+        self._parser = lxml.html.HTMLParser(encoding="utf-8")
+        self._fallback = SoupExtractor()
+
+    def extract(self, html: str, url: str) -> JobDescription:
+        try:
+            root = lxml.html.document_fromstring(html.encode("utf-8"), parser=self._parser)
+        except (etree.ParserError, ValueError):
+            # empty or unparseable document, let the reference backend decide what to do
+            return self._fallback.extract(html, url)
+
+        json_data = {}
+        title_el = h1 = meta_company = None
+        main = article = content_div = body = None
+
+        for el, in_junk in self._walk(root):
+            tag = el.tag
+            if tag == "script":
+                if not json_data and el.get("type") == "application/ld+json" and el.text:
+                    json_data = find_job_posting(el.text)
+            elif tag == "title":
+                if title_el is None:
+                    title_el = el
+            elif tag == "h1":
+                if h1 is None:
+                    h1 = el
+            elif tag == "meta":
+                if meta_company is None and el.get("property") == "og:site_name":
+                    meta_company = el
+            elif in_junk:
+                continue
+            elif tag == "main":
+                if main is None:
+                    main = el
+            elif tag == "article":
+                if article is None:
+                    article = el
+            elif tag == "div":
+                if content_div is None and CONTENT_ID_RE.search(el.get("id") or ""):
+                    content_div = el
+            elif tag == "body":
+                # lxml always adds a <body>, html.parser only has one if the page does
+                if body is None and BODY_TAG_RE.search(html):
+                    body = el
+
+        # 2. Extract Title (same rules as SoupExtractor)
+        title = json_data.get("title") or (self._single_string(title_el) if title_el is not None else None)
+        if not title or title.strip() == "":
+            title = "".join(self._strings(h1, skip_junk=False)) if h1 is not None else "Unknown Job Title"
+
+        # 3. Extract Company
+        company = json_data.get("hiringOrganization", {}).get("name")
+        if not company:
+            company = meta_company.attrib["content"] if meta_company is not None else "Unknown Company"
+
+        # 5. Main content text, junk skipped
+        content_area = main if main is not None else article if article is not None else content_div if content_div is not None else body
+        raw_text = "\n".join(self._strings(content_area)) if content_area is not None else ""
+
+        return build_job(json_data, title, company, raw_text, url)
+
+    @staticmethod
+    def _walk(root) -> Iterator:
+        """Document order walk yielding (element, inside_junk_subtree)."""
+        stack = [(root, False)]
+        while stack:
+            el, in_junk = stack.pop()
+            if not isinstance(el.tag, str):
+                continue
+            in_junk = in_junk or el.tag in JUNK_TAGS
+            yield el, in_junk
+            stack.extend((child, in_junk) for child in reversed(el))
+
+    @staticmethod
+    def _strings(el, skip_junk: bool = True) -> Iterator[str]:
+        """Stripped non-empty text nodes under el, like get_text(strip=True) after junk removal."""
+        stack = [(el, False)]
+        while stack:
+            node, is_tail = stack.pop()
+            if is_tail:
+                text = node.tail
+            else:
+                # comments / PIs are skipped but their tail text is kept
+                if not isinstance(node.tag, str) or (skip_junk and node.tag in JUNK_TAGS):
+                    continue
+                text = node.text
+                for child in reversed(node):
+                    stack.append((child, True))
+                    stack.append((child, False))
+            if text:
+                text = text.strip()
+                if text:
+                    yield text
+
+    @staticmethod
+    def _single_string(el) -> Optional[str]:
+        # mirrors bs4's Tag.string: only defined when the tag holds a single text node
+        if len(el):
+            return None
+        return el.text
+
+
+EXTRACTORS: Dict[str, type] = {"bs4": SoupExtractor}
+if LXML_AVAILABLE:
+    EXTRACTORS["lxml"] = LxmlExtractor
+
+
+def get_extractor(name: str = SCRAPER_EXTRACTOR) -> HtmlExtractor:
+    """Extractor backend by name, "auto" picks lxml when installed."""
+    if name == "auto":
+        name = "lxml" if LXML_AVAILABLE else "bs4"
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown extractor '{name}', available: {', '.join(EXTRACTORS)}")
+    return EXTRACTORS[name]()
@@ -0,0 +1,144 @@
+import re
+from dataclasses import dataclass, field
+from typing import List, Sequence
+
+CHARS_PER_TOKEN = 4
+
+# section kinds, matched against short heading lines ("Requirements:", "## What you'll do", ...)
+# first match wins, so "about the role" is a summary before "about" makes it company blurb
+HEADINGS = [
+    ("summary", r"about (the|this) (role|job|position|opportunity)|(role|job|position) (overview|summary|description)|the (role|opportunity)|overview"),
+    ("responsibilities", r"responsibilit|what (you'?ll|you will) (do|be doing|work on)|you will$|you'?ll$|your (role|mission|impact)|duties|day[ -]to[ -]day|key accountabilit|in this role( you will)?"),
+    ("requirements", r"requirement|qualification|what (you'?ll |you will |you )?(bring|need)|what we'?re looking for|who you are|about you|(must|nice)[ -]to[ -]have|skills|experience|tech(nology)? stack|technologies|you (have|bring|might be)( a (good |great )?fit( if)?)?|ideal candidate"),
+    ("benefits", r"benefit|perks|what we offer|we offer|compensation|salary|pay range|why (join|work|you'?ll love)|our offer"),
+    ("about", r"about (us|the company|the team|[\w&.' -]{1,40})$|who we are|our (company|story|mission|team)|company (overview|description)|life at"),
+    ("boilerplate", r"equal (employment )?opportunit|eeo|diversity (and|&) inclusion statement|how to apply|application process|privacy|disclaimer|accommodation"),
+]
+QUALIFIER = r"(?:(?:required|preferred|basic|minimum|desired|additional|key|main|your|our|the|job)\s+)*"
+HEADING_PATTERNS = [(kind, re.compile(r"^" + QUALIFIER + r"(?:" + pattern + r")", re.I)) for kind, pattern in HEADINGS]
+HEADING_MAX_WORDS = 8
+
+# single lines dropped wherever they show up: page chrome and legal text
+BOILERPLATE_LINE = re.compile(
+    r"equal opportunity employer|without regard to (race|age|sex)|all rights reserved|privacy policy|cookie|"
+    r"^(apply( now| for this job)?|save( job)?|share( this job)?|report (this )?job|sign in|log in|back to (jobs|search))$",
+    re.I,
+)
+BULLET = re.compile(r"^[\s#*\-•·>]+|[*:\s]+$")
+
+# what each consumer wants first, sections not listed are dropped
+SCORING_PRIORITY = ("requirements", "responsibilities", "summary", "intro", "other", "about")
+ANSWER_PRIORITY = ("requirements", "responsibilities", "summary", "intro", "about", "other")
+PREFERENCE_PRIORITY = ("summary", "intro", "benefits", "about", "responsibilities", "requirements", "other")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count, good enough for budgeting prompts."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+@dataclass
+class Section:
+    kind: str  # one of the HEADINGS kinds, "intro" before the first heading, "other" for unknown headings
+    heading: str = ""
+    lines: List[str] = field(default_factory=list)
+
+
+def heading_kind(line: str) -> str:
+    """
+    Section kind of a heading line, "" when the line doesn't look like a heading.
+    Headings are short and end in ":", are markdown headings, are Title Cased or are
+    (mostly) just the heading phrase, so list items like "Experience with Kafka" stay content.
+    """
+    text = BULLET.sub("", line)
+    words = text.split()
+    if not words or len(words) > HEADING_MAX_WORDS or ":" in text or text.endswith((".", ",", ";")):
+        return ""
+    marked = line.rstrip().endswith(":") or line.lstrip().startswith(("#", "**"))
+    titled = all(w[0].isupper() or not w[0].isalpha() or len(w) <= 3 for w in words)
+    for kind, pattern in HEADING_PATTERNS:
+        match = pattern.search(text)
+        if match and (marked or titled or match.end() >= 0.6 * len(text)):
+            return kind
+    return "other" if marked or (text.isupper() and len(text) > 3) else ""
+
+
+def split_sections(text: str) -> List[Section]:
+    """
+    Scraped posting text -> sections, in document order. Lines are stripped, empty,
+    boilerplate and repeated lines (same text ignoring case / bullets) are dropped.
+    "Requirements: 5y Python" is read as a heading followed by one line.
+    """
+    sections = [Section("intro")]
+    seen = set()
+    for raw in (text or "").splitlines():
+        line = raw.strip()
+        if not line or BOILERPLATE_LINE.search(line):
+            continue
+
+        kind = heading_kind(line)
+        if kind:
+            sections.append(Section(kind, BULLET.sub("", line)))
+            continue
+        head, sep, rest = line.partition(":")
+        inline = heading_kind(head + ":") if sep and rest.strip() else ""
+        if inline and inline != "other":
+            # "Requirements: 5y Python", but not "Location: Remote"
+            sections.append(Section(inline, BULLET.sub("", head)))
+            line = rest.strip()
+
+        key = BULLET.sub("", line).lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        sections[-1].lines.append(line)
+    return [s for s in sections if s.lines]
+
+
+def _clip(line: str, tokens: int) -> str:
+    """First `tokens` worth of a line, cut at a word boundary."""
+    cut = line[:max(0, tokens - 1) * CHARS_PER_TOKEN]
+    if len(cut) < len(line) and " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut
+
+
+def compress_jd(text: str, token_budget: int, priority: Sequence[str] = SCORING_PRIORITY) -> str:
+    """
+    The most useful part of a job posting that fits `token_budget`: sections are taken in
+    `priority` order (kinds not listed are left out, boilerplate always is), line by line
+    until the budget runs out, then put back in document order with their headings.
+    Text without any recognisable heading degrades to a deduplicated head of the posting.
+    """
+    sections = split_sections(text)
+    rank = {kind: i for i, kind in enumerate(priority)}
+    taken = {}
+    used = 0
+    for index in sorted((i for i, s in enumerate(sections) if s.kind in rank), key=lambda i: rank[sections[i].kind]):
+        section = sections[index]
+        head_cost = estimate_tokens(section.heading) if section.heading else 0
+        lines = []
+        for line in section.lines:
+            cost = estimate_tokens(line)
+            if used + head_cost + cost <= token_budget:
+                lines.append(line)
+                used += cost
+                continue
+            # a long first line (one-paragraph postings) is clipped instead of skipped
+            room = token_budget - used - head_cost
+            if not lines and room > 16:
+                lines.append(_clip(line, room))
+                used += room
+            break
+        if lines:
+            taken[index] = lines
+            used += head_cost
+        if used >= token_budget:
+            break
+
+    out = []
+    for index in sorted(taken):
+        if sections[index].heading:
+            out.append(sections[index].heading + ":")
+        out.extend(taken[index])
+    return "\n".join(out)
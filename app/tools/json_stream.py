@@ -0,0 +1,99 @@
+import json
+from typing import Any, Dict, List, Tuple
+
+
+class JsonFieldStream:
+    """
+    Incremental parser for the top level fields of one JSON object that arrives in chunks
+    (an LLM token stream). feed() returns every (key, value) completed by that chunk:
+    strings, lists and objects as soon as they close, numbers / literals at the next
+    delimiter. Text before the first "{" (prose, ```json fences) is skipped.
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self._state = "before"  # before -> key_start -> key -> colon -> value -> after_value
+        self._buf: List[str] = []
+        self._key = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        completed = []
+        for ch in chunk:
+            state = self._state
+            if state == "done":
+                break
+
+            if state == "before":
+                if ch == "{":
+                    self._state = "key_start"
+            elif state == "key_start":
+                if ch == '"':
+                    self._state, self._buf = "key", []
+                elif ch == "}":
+                    self._finish()
+            elif state == "key":
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._key = json.loads('"' + "".join(self._buf) + '"')
+                    self._state = "colon"
+                    continue
+                self._buf.append(ch)
+            elif state == "colon":
+                if ch == ":":
+                    self._state, self._buf, self._depth = "value", [], 0
+            elif state == "after_value":
+                if ch == ",":
+                    self._state = "key_start"
+                elif ch == "}":
+                    self._finish()
+            elif self._in_string:
+                self._buf.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 0:
+                        self._emit(completed, "after_value")
+            elif self._depth == 0 and ch in ",}":
+                # end of a number / true / false / null
+                self._emit(completed, "key_start")
+                if ch == "}":
+                    self._finish()
+            else:
+                if ch == '"':
+                    self._in_string = True
+                elif ch in "[{":
+                    self._depth += 1
+                elif ch in "]}":
+                    self._depth -= 1
+                self._buf.append(ch)
+                if self._depth == 0 and ch in "]}":
+                    self._emit(completed, "after_value")
+        return completed
+
+    def _emit(self, completed: list, next_state: str):
+        text = "".join(self._buf).strip()
+        self._buf = []
+        self._state = next_state
+        if not text:
+            return
+        try:
+            value = json.loads(text)
+        except ValueError:
+            # not valid json, the final full-text parse decides what to do with it
+            return
+        self.fields[self._key] = value
+        completed.append((self._key, value))
+
+    def _finish(self):
+        self._state = "done"
+        self.done = True
@@ -0,0 +1,87 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, Set, Tuple
+
+Label = Hashable
+
+WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789+#")
+KEYWORD_WORDS = re.compile(r"[a-z0-9+#]+")
+
+
+class KeywordMatcher:
+    """
+    Many keyword lists compiled into one table, scan() finds every label whose keywords
+    occur in a text. Keywords only match whole words ("mid" not in "midnight"), case and
+    punctuation insensitive ("sr." matches "Sr", "work-life balance" matches "work life balance").
+
+    Each distinct keyword is looked for once, by its first word with str.find (memchr speed,
+    a single regex or tokenizing the text is several times slower in CPython), and only
+    occurrences of that word are checked for boundaries and the rest of the phrase.
+    """
+
+    def __init__(self, table: Iterable[Tuple[Label, Iterable[str]]]):
+        self.labels: Dict[Tuple[str, ...], Set[Label]] = {}
+        for label, keywords in table:
+            for keyword in keywords:
+                key = tuple(KEYWORD_WORDS.findall((keyword or "").lower()))
+                if key:
+                    self.labels.setdefault(key, set()).add(label)
+        # (first word, rest of the phrase as a regex anchored after that word, other words), per keyword
+        self.keys = [
+            (key[0], re.compile("".join(r"[^a-z0-9+#]+" + re.escape(w) for w in key[1:]) + r"(?![a-z0-9+#])") if key[1:] else None, key[1:], labels)
+            for key, labels in self.labels.items()
+        ]
+
+    def scan(self, text: str) -> Set[Label]:
+        """Every label with at least one keyword in `text`."""
+        found: Set[Label] = set()
+        text = (text or "").lower()
+        if not text:
+            return found
+        size = len(text)
+        for first, tail, rest, labels in self.keys:
+            if labels <= found:
+                continue
+            if rest and not all(word in text for word in rest):
+                continue
+            start = text.find(first)
+            while start >= 0:
+                end = start + len(first)
+                if (start == 0 or text[start - 1] not in WORD_CHARS) and (
+                    tail.match(text, end) if tail else end == size or text[end] not in WORD_CHARS
+                ):
+                    found |= labels
+                    break
+                start = text.find(first, end)
+        return found
+
+
+class MatcherCache:
+    """Small LRU of compiled matchers, rebuilt when the key's fingerprint changes."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[str, KeywordMatcher]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0}
+
+    def get(self, key: Hashable, fingerprint: str, build: Callable[[], KeywordMatcher]) -> KeywordMatcher:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                self._entries.move_to_end(key)
+                self.counters["hits"] += 1
+                return entry[1]
+            self.counters["misses"] += 1
+        matcher = build()
+        with self._lock:
+            self._entries[key] = (fingerprint, matcher)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return matcher
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters, entries=len(self._entries))
@@ -0,0 +1,342 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# --- Near Duplicate Config (override via env) ---
+NEAR_DUPES_PATH = os.getenv("NEAR_DUPES_PATH", os.path.join("./.data", "near_dupes.db"))
+NEAR_DUPES_THRESHOLD = float(os.getenv("NEAR_DUPES_THRESHOLD", "0.7"))  # estimated jaccard of 3-word shingles
+NEAR_DUPES_MAX_POSTINGS = int(os.getenv("NEAR_DUPES_MAX_POSTINGS", "100000"))  # oldest postings (and their analyses) go past this
+NEAR_DUPES_ANALYSIS_TTL = float(os.getenv("NEAR_DUPES_ANALYSIS_TTL", str(30 * 24 * 3600)))  # seconds a stored analysis is reused
+SHINGLE_SIZE = 3  # words per shingle
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SEED = 1337  # fixed so persisted signatures stay comparable across restarts
+MERGE_EVERY = 4096  # tail rows before the sorted band arrays are rebuilt
+PRUNE_TO = 0.9  # share of max_postings kept by a prune, so it doesn't run again on the next add
+ANALYSIS_PRUNE_EVERY = 64  # saved analyses between deletes of the expired ones
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64(0xFFFFFFFF)
+
+_rng = np.random.RandomState(SEED)
+PERM_A = _rng.randint(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+PERM_B = _rng.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+BAND_MIX = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0x27D4EB2F165667C5], dtype=np.uint64)[:ROWS]
+
+
+def posting_text(title: str, raw_text: str) -> str:
+    """What gets fingerprinted: the title matters, two roles can share a description."""
+    return f"{title or ''}\n{raw_text or ''}"
+
+
+def shingle_hashes(text: str) -> np.ndarray:
+    """crc32 of every SHINGLE_SIZE word window of the normalized text."""
+    tokens = TOKEN_RE.findall(text.lower())
+    if not tokens:
+        return np.empty(0, dtype=np.uint64)
+    if len(tokens) < SHINGLE_SIZE:
+        shingles = {" ".join(tokens)}
+    else:
+        shingles = {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def minhash(text: str) -> Optional[np.ndarray]:
+    """NUM_PERM uint32 MinHash signature, None for empty text."""
+    hashes = shingle_hashes(text)
+    if hashes.size == 0:
+        return None
+    with np.errstate(over="ignore"):
+        # (a*x + b) mod p with uint64 wraparound, same trick as datasketch
+        values = (np.outer(PERM_A, hashes) + PERM_B[:, None]) % MERSENNE_PRIME & MAX_HASH
+    return values.min(axis=1).astype(np.uint32)
+
+
+def band_keys(signatures: np.ndarray) -> np.ndarray:
+    """(n, NUM_PERM) signatures -> (n, BANDS) uint64 band hashes."""
+    bands = signatures.reshape(-1, BANDS, ROWS).astype(np.uint64)
+    with np.errstate(over="ignore"):
+        return (bands * BAND_MIX).sum(axis=2) ^ np.arange(BANDS, dtype=np.uint64)
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha1(" ".join(TOKEN_RE.findall(text.lower())).encode()).hexdigest()[:20]
+
+
+class NearDuplicateIndex:
+    """
+    MinHash + LSH index of job postings.
+    find() returns the id of a stored posting whose estimated Jaccard similarity is
+    above the threshold. Band hashes live in per band sorted arrays (binary search) plus
+    a small unsorted tail for recent adds, so lookups stay flat as the index grows
+    and adds are cheap. Signatures are persisted in SQLite and reloaded on start.
+    Analyses can be stored per (posting, context) so near copies reuse them for `analysis_ttl`.
+    Past `max_postings` the oldest postings are dropped together with their analyses.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = NEAR_DUPES_PATH,
+        threshold: float = NEAR_DUPES_THRESHOLD,
+        max_postings: int = NEAR_DUPES_MAX_POSTINGS,
+        analysis_ttl: float = NEAR_DUPES_ANALYSIS_TTL,
+    ):
+        self.threshold = threshold
+        self.max_postings = max_postings
+        self.analysis_ttl = analysis_ttl
+        self._lock = threading.Lock()
+        self._ids: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        self._sigs = np.empty((0, NUM_PERM), dtype=np.uint32)
+        self._keys = np.empty((0, BANDS), dtype=np.uint64)
+        self._n = 0
+        self._merged = 0
+        self._sorted_keys: List[np.ndarray] = []
+        self._sorted_rows: List[np.ndarray] = []
+        self._saves_since_prune = 0
+        self.counters = {"lookups": 0, "duplicates_found": 0, "analysis_reused": 0, "postings_pruned": 0}
+
+        self._db = None
+        if path:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS postings (row INTEGER PRIMARY KEY, doc_id TEXT UNIQUE, signature BLOB)")
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS analyses (
+                    doc_id TEXT, context_key TEXT, result_json TEXT, created_at REAL,
+                    PRIMARY KEY (doc_id, context_key)
+                )"""
+            )
+            self._load()
+
+    # --- postings ---
+
+    def find(self, text: str, signature: Optional[np.ndarray] = None) -> Optional[Tuple[str, float]]:
+        """(doc_id, similarity) of the closest stored near duplicate, or None."""
+        if signature is None:
+            signature = minhash(text)
+        if signature is None:
+            return None
+        with self._lock:
+            self.counters["lookups"] += 1
+            match = self._find(signature)
+            if match is not None:
+                self.counters["duplicates_found"] += 1
+            return match
+
+    def add(self, doc_id: str, text: str, signature: Optional[np.ndarray] = None) -> bool:
+        if signature is None:
+            signature = minhash(text)
+        if signature is None:
+            return False
+        with self._lock:
+            if doc_id in self._row_of:
+                return False
+            self._append(doc_id, signature)
+            if self._db is not None:
+                self._db.execute("INSERT OR IGNORE INTO postings (doc_id, signature) VALUES (?, ?)", (doc_id, signature.tobytes()))
+            if self._n > self.max_postings:
+                self._prune_postings()
+            if self._db is not None:
+                self._db.commit()
+            return True
+
+    def add_many(self, items: List[Tuple[str, str]]) -> int:
+        """Bulk add of (doc_id, text), one commit for all of them."""
+        signed = [(doc_id, minhash(text)) for doc_id, text in items]
+        added = []
+        with self._lock:
+            for doc_id, signature in signed:
+                if signature is None or doc_id in self._row_of:
+                    continue
+                self._append(doc_id, signature)
+                added.append((doc_id, signature.tobytes()))
+            if self._db is not None and added:
+                self._db.executemany("INSERT OR IGNORE INTO postings (doc_id, signature) VALUES (?, ?)", added)
+            if self._n > self.max_postings:
+                self._prune_postings()
+            if self._db is not None and added:
+                self._db.commit()
+        return len(added)
+
+    def canonical_id(self, text: str) -> Optional[str]:
+        """
+        Id of the stored posting this text is a (near) copy of, adding it as a new
+        posting when nothing matches. None for empty text.
+        """
+        signature = minhash(text)
+        if signature is None:
+            return None
+        match = self.find(text, signature)
+        if match is not None:
+            return match[0]
+        doc_id = text_key(text)
+        self.add(doc_id, text, signature)
+        return doc_id
+
+    def __len__(self):
+        return self._n
+
+    # --- stored analyses ---
+
+    def get_analysis(self, doc_id: str, context_key: str) -> Optional[dict]:
+        if self._db is None:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result_json FROM analyses WHERE doc_id = ? AND context_key = ? AND created_at >= ?",
+                (doc_id, context_key, time.time() - self.analysis_ttl),
+            ).fetchone()
+            if row:
+                self.counters["analysis_reused"] += 1
+                return json.loads(row[0])
+            return None
+
+    def save_analysis(self, doc_id: str, context_key: str, result: dict):
+        if self._db is None:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO analyses (doc_id, context_key, result_json, created_at) VALUES (?, ?, ?, ?)",
+                (doc_id, context_key, json.dumps(result), time.time()),
+            )
+            self._saves_since_prune += 1
+            if self._saves_since_prune >= ANALYSIS_PRUNE_EVERY:
+                self._prune_analyses()
+            self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters, postings=self._n)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    # --- internals (caller holds the lock) ---
+
+    def _find(self, signature: np.ndarray) -> Optional[Tuple[str, float]]:
+        if self._n == 0:
+            return None
+        qkeys = band_keys(signature[None, :])[0]
+        candidates = []
+        for b in range(len(self._sorted_keys)):
+            keys = self._sorted_keys[b]
+            lo = np.searchsorted(keys, qkeys[b], side="left")
+            hi = np.searchsorted(keys, qkeys[b], side="right")
+            if hi > lo:
+                candidates.append(self._sorted_rows[b][lo:hi])
+        if self._n > self._merged:
+            tail = self._keys[self._merged:self._n]
+            candidates.append(np.nonzero((tail == qkeys).any(axis=1))[0] + self._merged)
+        if not candidates:
+            return None
+        rows = np.unique(np.concatenate(candidates))
+        if rows.size == 0:
+            return None
+        similarity = (self._sigs[rows] == signature).mean(axis=1)
+        best = int(similarity.argmax())
+        if similarity[best] < self.threshold:
+            return None
+        return self._ids[rows[best]], float(similarity[best])
+
+    def _append(self, doc_id: str, signature: np.ndarray):
+        if self._n == len(self._sigs):
+            capacity = max(1024, self._n * 2)
+            self._sigs = np.resize(self._sigs, (capacity, NUM_PERM))
+            self._keys = np.resize(self._keys, (capacity, BANDS))
+        self._sigs[self._n] = signature
+        self._keys[self._n] = band_keys(signature[None, :])[0]
+        self._ids.append(doc_id)
+        self._row_of[doc_id] = self._n
+        self._n += 1
+        if self._n - self._merged >= MERGE_EVERY:
+            self._merge()
+
+    def _prune_postings(self):
+        """Drops the oldest postings down to PRUNE_TO of max_postings, with their analyses"""
+        drop = self._n - int(self.max_postings * PRUNE_TO)
+        self._ids = self._ids[drop:]
+        self._row_of = {doc_id: i for i, doc_id in enumerate(self._ids)}
+        self._sigs = self._sigs[drop:self._n].copy()
+        self._keys = self._keys[drop:self._n].copy()
+        self._n = len(self._ids)
+        self._merge()
+        self.counters["postings_pruned"] += drop
+        if self._db is not None:
+            # rows are in insertion order, same as in memory
+            self._db.execute("DELETE FROM postings WHERE row IN (SELECT row FROM postings ORDER BY row LIMIT ?)", (drop,))
+            self._db.execute("DELETE FROM analyses WHERE doc_id NOT IN (SELECT doc_id FROM postings)")
+
+    def _prune_analyses(self):
+        self._saves_since_prune = 0
+        self._db.execute("DELETE FROM analyses WHERE created_at < ?", (time.time() - self.analysis_ttl,))
+
+    def _merge(self):
+        """Rebuild the sorted band arrays over every row, the tail becomes empty."""
+        keys = self._keys[:self._n]
+        self._sorted_rows = [np.argsort(keys[:, b], kind="stable") for b in range(BANDS)]
+        self._sorted_keys = [keys[rows, b] for b, rows in enumerate(self._sorted_rows)]
+        self._merged = self._n
+
+    def _load(self):
+        meta = dict(self._db.execute("SELECT key, value FROM meta").fetchall())
+        layout = f"{NUM_PERM}:{BANDS}:{SHINGLE_SIZE}:{SEED}"
+        if meta.get("layout") != layout:
+            # signatures from another layout can't be compared, start over
+            self._db.execute("DELETE FROM postings")
+            self._db.execute("DELETE FROM analyses")
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('layout', ?)", (layout,))
+            self._db.commit()
+            return
+        rows = self._db.execute("SELECT doc_id, signature FROM postings ORDER BY row").fetchall()
+        if not rows:
+            return
+        self._ids = [r[0] for r in rows]
+        self._row_of = {doc_id: i for i, doc_id in enumerate(self._ids)}
+        self._sigs = np.frombuffer(b"".join(r[1] for r in rows), dtype=np.uint32).reshape(-1, NUM_PERM).copy()
+        self._keys = band_keys(self._sigs)
+        self._n = len(self._ids)
+        self._merge()
+        if self._n > self.max_postings:
+            self._prune_postings()
+        self._prune_analyses()
+        self._db.commit()
+
+
+def analysis_context_key(resume_text: str, preferences: Optional[dict]) -> str:
+    """An analysis is only reusable for the same resume and the same preferences."""
+    payload = json.dumps({"resume": resume_text.strip(), "prefs": preferences}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def near_duplicate_mask(texts: List[Optional[str]], threshold: float = NEAR_DUPES_THRESHOLD) -> List[bool]:
+    """True for every text that is a near copy of an earlier one in the list."""
+    index = NearDuplicateIndex(path=None, threshold=threshold)
+    mask = []
+    for i, text in enumerate(texts):
+        if not text:
+            mask.append(False)
+            continue
+        signature = minhash(text)
+        if signature is None:
+            mask.append(False)
+            continue
+        is_dup = index.find(text, signature) is not None
+        if not is_dup:
+            index.add(str(i), text, signature)
+        mask.append(is_dup)
+    return mask
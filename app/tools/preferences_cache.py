@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+# --- Preferences Cache Config (override via env) ---
+PREFERENCES_CACHE_MAX_ENTRIES = int(os.getenv("PREFERENCES_CACHE_MAX_ENTRIES", "1024"))
+PREFERENCES_CACHE_CHECK_INTERVAL = float(os.getenv("PREFERENCES_CACHE_CHECK_INTERVAL", "1.0"))  # seconds an entry is trusted without a version check
+
+Preferences = Optional[dict]
+
+
+class PreferencesCache:
+    """
+    Parsed user preferences kept in memory, LRU bounded. Every row carries a version
+    that each save bumps, so another worker's save is noticed with a one column lookup
+    (`version_of`) instead of re-reading and re-parsing the row. Entries checked within
+    the last `check_interval` seconds are served without even that.
+    Users without preferences are cached too (as None). Returned dicts are shared,
+    callers treat them as read-only.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[str], Tuple[Preferences, Optional[int]]],
+        version_of: Callable[[str], Optional[int]],
+        max_entries: int = PREFERENCES_CACHE_MAX_ENTRIES,
+        check_interval: float = PREFERENCES_CACHE_CHECK_INTERVAL,
+    ):
+        self.load = load
+        self.version_of = version_of
+        self.max_entries = max_entries
+        self.check_interval = check_interval
+        self._entries: "OrderedDict[str, Tuple[Preferences, Optional[int], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "stale": 0, "version_checks": 0, "writes": 0, "invalidations": 0}
+
+    def get(self, user_id: str) -> Preferences:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and time.monotonic() - entry[2] < self.check_interval:
+                self._entries.move_to_end(user_id)
+                self.counters["hits"] += 1
+                return entry[0]
+
+        if entry is not None:
+            version = self.version_of(user_id)
+            with self._lock:
+                self.counters["version_checks"] += 1
+                if version == entry[1]:
+                    self.counters["hits"] += 1
+                    self._store(user_id, entry[0], version)
+                    return entry[0]
+                self.counters["stale"] += 1
+        else:
+            with self._lock:
+                self.counters["misses"] += 1
+
+        preferences, version = self.load(user_id)
+        with self._lock:
+            self._store(user_id, preferences, version)
+        return preferences
+
+    def put(self, user_id: str, preferences: Preferences, version: Optional[int]):
+        """Write-through after a save, the saving worker never reads its own change back."""
+        with self._lock:
+            self.counters["writes"] += 1
+            self._store(user_id, preferences, version)
+
+    def invalidate(self, user_id: Optional[str] = None):
+        """Drops one user's entry, or everything."""
+        with self._lock:
+            self.counters["invalidations"] += 1
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def _store(self, user_id: str, preferences: Preferences, version: Optional[int]):
+        self._entries[user_id] = (preferences, version, time.monotonic())
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self.counters)
+            lookups = stats["hits"] + stats["misses"] + stats["stale"]
+            stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+            stats["entries"] = len(self._entries)
+            return stats
@@ -0,0 +1,177 @@
+import asyncio
+import random
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delay seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: Optional[float] = None) -> float:
+    """Retry-After wins (plus a little jitter), else full jitter exponential backoff."""
+    if retry_after is not None:
+        return min(cap, retry_after + random.uniform(0, 0.1 * retry_after + 0.05))
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class TokenBucket:
+    """Classic token bucket, `rate` tokens per second up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        """Waits for a token, returns how long it waited."""
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+    def try_acquire(self) -> bool:
+        """Takes a token only if one is free right now and nobody is queued for it."""
+        if self._lock.locked():
+            return False
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures, then every call is
+    refused for `reset_timeout` seconds. After that one trial call is let through
+    (half open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self.counters = {"opened": 0, "rejected": 0}
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def retry_in(self) -> float:
+        """Seconds until the next trial call is allowed."""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def available(self) -> bool:
+        """Whether allow() would let a call through, without taking the half open trial."""
+        state = self.state
+        if state == "closed" or (state == "half_open" and not self._trial_running):
+            return True
+        self.counters["rejected"] += 1
+        return False
+
+    def allow(self) -> bool:
+        """Lets a call through, in half open state it becomes the trial: end it with record_* or abandon()."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_running:
+            self._trial_running = True
+            return True
+        self.counters["rejected"] += 1
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def abandon(self):
+        """A call that ended without a verdict (cancelled, stream closed), lets the next trial through."""
+        self._trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial_running or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self._trial_running:
+                self.counters["opened"] += 1
+            self.opened_at = time.monotonic()
+        self._trial_running = False
+
+    def stats(self) -> Dict:
+        return dict(self.counters, state=self.state, failures=self.failures)
+
+
+class LatencyTracker:
+    """
+    Moving estimate of one upstream's health: EWMA latency and error rate plus a
+    window of recent latencies for percentiles (hedge delays).
+    """
+
+    def __init__(self, alpha: float = 0.2, window: int = 100, error_penalty: float = 10.0):
+        self.alpha = alpha
+        self.error_penalty = error_penalty  # seconds an always failing upstream costs on top of its latency
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds: Optional[float], ok: bool = True):
+        """`seconds` may be None for failures that say nothing about speed."""
+        if seconds is not None:
+            self.samples.append(seconds)
+            self.latency = seconds if self.latency is None else self.latency + self.alpha * (seconds - self.latency)
+        self.error_rate += self.alpha * ((0.0 if ok else 1.0) - self.error_rate)
+
+    def percentile(self, q: float, min_samples: int = 5) -> Optional[float]:
+        if len(self.samples) < min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def cost(self, in_flight: int = 0) -> float:
+        """
+        Expected seconds for one more request: latency grows with the requests already
+        queued there, errors add a flat penalty. Unmeasured upstreams cost 0 so they get tried.
+        """
+        return (self.latency or 0.0) * (1 + in_flight) + self.error_rate * self.error_penalty
+
+    def stats(self) -> Dict:
+        p95 = self.percentile(0.95)
+        return {
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "error_rate": round(self.error_rate, 4),
+            "samples": len(self.samples),
+        }
@@ -0,0 +1,159 @@
+import hashlib
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Union
+
+from app.models import ResumeDigest
+from app.tools.jd_sections import estimate_tokens
+
+Resume = Union[str, ResumeDigest]  # agents take either, a stored digest skips re-digesting
+
+RESUME_PROMPT_TOKENS = int(os.getenv("RESUME_PROMPT_TOKENS", "350"))  # digest budget in scoring prompts
+DIGEST_MAX_TITLES = 5
+DIGEST_SUMMARY_WORDS = 60
+
+# canonical skill -> spellings found in resumes (lowercase), matched on word boundaries
+SKILL_ALIASES: Dict[str, List[str]] = {
+    "Python": ["python"], "Java": ["java"], "JavaScript": ["javascript", "js", "es6"], "TypeScript": ["typescript", "ts"],
+    "Go": ["golang"], "Rust": ["rust"], "C": ["c"], "C++": ["c++", "cpp"], "C#": ["c#", "csharp"], "Ruby": ["ruby"],
+    "PHP": ["php"], "Kotlin": ["kotlin"], "Swift": ["swift"], "Scala": ["scala"], "R": ["r"], "MATLAB": ["matlab"],
+    "SQL": ["sql"], "PostgreSQL": ["postgresql", "postgres"], "MySQL": ["mysql"], "SQLite": ["sqlite"],
+    "MongoDB": ["mongodb", "mongo"], "Redis": ["redis"], "Elasticsearch": ["elasticsearch", "elastic search"],
+    "Snowflake": ["snowflake"], "BigQuery": ["bigquery"], "DynamoDB": ["dynamodb"],
+    "React": ["react", "react.js", "reactjs"], "Angular": ["angular"], "Vue": ["vue", "vue.js"], "Next.js": ["next.js", "nextjs"],
+    "Node.js": ["node.js", "nodejs", "node"], "Django": ["django"], "Flask": ["flask"], "FastAPI": ["fastapi"],
+    "Spring": ["spring", "spring boot"], "Rails": ["rails", "ruby on rails"], ".NET": [".net", "dotnet"],
+    "HTML": ["html", "html5"], "CSS": ["css", "css3"], "GraphQL": ["graphql"], "REST APIs": ["rest", "restful", "rest api", "rest apis"],
+    "AWS": ["aws", "amazon web services"], "GCP": ["gcp", "google cloud"], "Azure": ["azure"],
+    "Docker": ["docker"], "Kubernetes": ["kubernetes", "k8s"], "Terraform": ["terraform"], "Ansible": ["ansible"],
+    "CI/CD": ["ci/cd", "cicd", "continuous integration"], "Jenkins": ["jenkins"], "GitHub Actions": ["github actions"],
+    "Git": ["git"], "Linux": ["linux"], "Bash": ["bash", "shell scripting"],
+    "Spark": ["spark", "pyspark", "apache spark"], "Kafka": ["kafka", "apache kafka"], "Airflow": ["airflow", "apache airflow"],
+    "dbt": ["dbt"], "Hadoop": ["hadoop"], "ETL": ["etl", "elt"], "Pandas": ["pandas"], "NumPy": ["numpy"],
+    "scikit-learn": ["scikit-learn", "sklearn"], "TensorFlow": ["tensorflow"], "PyTorch": ["pytorch"],
+    "Machine Learning": ["machine learning", "ml"], "Deep Learning": ["deep learning"], "NLP": ["nlp", "natural language processing"],
+    "Computer Vision": ["computer vision"], "LLMs": ["llm", "llms", "large language models"], "Statistics": ["statistics"],
+    "Tableau": ["tableau"], "Power BI": ["power bi", "powerbi"], "Excel": ["excel"], "Figma": ["figma"],
+    "Agile": ["agile", "scrum"], "Jira": ["jira"], "Microservices": ["microservices"], "System Design": ["system design"],
+}
+_ALIAS_TO_SKILL = {alias: skill for skill, aliases in SKILL_ALIASES.items() for alias in aliases}
+# longest first so "spring boot" wins over "spring", no letter / + / # glued on either side
+SKILL_PATTERN = re.compile(
+    r"(?<![\w+#.])(" + "|".join(re.escape(a) for a in sorted(_ALIAS_TO_SKILL, key=len, reverse=True)) + r")(?![\w+#]|\.\w)",
+    re.I,
+)
+ROLE_WORDS = re.compile(
+    r"\b(engineer|developer|programmer|scientist|analyst|architect|manager|designer|consultant|administrator|"
+    r"specialist|lead|director|intern|researcher|technician|coordinator|officer)\b",
+    re.I,
+)
+SUMMARY_HEADING = re.compile(r"^(professional |career )?(summary|profile|objective|about me)\s*:?\s*$", re.I)
+CONTACT = re.compile(r"@|https?://|www\.|linkedin\.com|github\.com|\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}")
+TITLE_SPLIT = re.compile(r"\s+(?:at|@)\s+|\s*[|,(–—]\s*|\s+-\s+")
+
+
+def content_hash(data: Union[str, bytes]) -> str:
+    """sha256 of a resume's text (or of the uploaded file's bytes)."""
+    if isinstance(data, str):
+        data = data.strip().encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def resume_lines(text: str) -> List[str]:
+    """Non-empty, whitespace-collapsed, deduplicated lines."""
+    lines, seen = [], set()
+    for raw in (text or "").splitlines():
+        line = " ".join(raw.split())
+        if line and line.lower() not in seen:
+            seen.add(line.lower())
+            lines.append(line)
+    return lines
+
+
+def extract_skills(text: str) -> List[str]:
+    """Canonical names of the known skills mentioned, in order of first mention."""
+    found = dict.fromkeys(_ALIAS_TO_SKILL[m.group(1).lower()] for m in SKILL_PATTERN.finditer(text or ""))
+    # single letters only count as skills in a list ("R, Python"), not in prose
+    for letter in ("C", "R"):
+        if letter in found and not re.search(rf"(^|[,/|•;]\s*){letter}\s*([,/|•;]|$)", text, re.M):
+            del found[letter]
+    return list(found)
+
+
+def extract_titles(lines: List[str]) -> List[str]:
+    """Job titles held: short lines with a role word, cut before the company / dates."""
+    titles = []
+    for line in lines:
+        if len(line.split()) > 10 or CONTACT.search(line) or not ROLE_WORDS.search(line):
+            continue
+        title = next((part for part in TITLE_SPLIT.split(line) if ROLE_WORDS.search(part)), "").strip(" .:;")
+        if title and title.lower() not in (t.lower() for t in titles):
+            titles.append(title)
+        if len(titles) >= DIGEST_MAX_TITLES:
+            break
+    return titles
+
+
+def extract_summary(lines: List[str]) -> str:
+    """The resume's own summary / profile section, else its first real sentence(s)."""
+    for i, line in enumerate(lines):
+        if SUMMARY_HEADING.match(line):
+            # up to the next heading (a short line)
+            body = []
+            for following in lines[i + 1:i + 4]:
+                if len(following.split()) <= 3:
+                    break
+                body.append(following)
+            break
+    else:
+        body = [line for line in lines if len(line.split()) >= 8 and not CONTACT.search(line)][:2]
+    words = " ".join(body).split()
+    return " ".join(words[:DIGEST_SUMMARY_WORDS]) + ("..." if len(words) > DIGEST_SUMMARY_WORDS else "")
+
+
+def build_digest(text: str) -> ResumeDigest:
+    lines = resume_lines(text)
+    return ResumeDigest(
+        content_hash=content_hash(text),
+        text=text,
+        skills=extract_skills(text),
+        titles=extract_titles(lines),
+        summary=extract_summary(lines),
+    )
+
+
+@lru_cache(maxsize=64)
+def _digest_of_text(text: str) -> ResumeDigest:
+    return build_digest(text)
+
+
+def resume_prompt(resume: Resume, token_budget: int = RESUME_PROMPT_TOKENS) -> str:
+    """
+    Compact resume for prompts: titles, normalized skills and summary, then as many of
+    the resume's own lines (minus contact details) as fit the token budget.
+    Takes a stored digest or raw text (digested once per process).
+    """
+    digest = resume if isinstance(resume, ResumeDigest) else _digest_of_text(resume or "")
+    head = []
+    if digest.titles:
+        head.append("TITLES: " + "; ".join(digest.titles))
+    if digest.skills:
+        head.append("SKILLS: " + ", ".join(digest.skills))
+    if digest.summary:
+        head.append("SUMMARY: " + digest.summary)
+    out = "\n".join(head)
+    used = estimate_tokens(out)
+
+    details = []
+    for line in resume_lines(digest.text):
+        if CONTACT.search(line) or SUMMARY_HEADING.match(line) or (digest.summary and line in digest.summary):
+            continue
+        cost = estimate_tokens(line)
+        if used + cost > token_budget:
+            break
+        details.append(line)
+        used += cost
+    if details:
+        out += ("\n" if out else "") + "DETAILS:\n" + "\n".join(details)
+    return out
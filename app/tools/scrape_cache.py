@@ -0,0 +1,260 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from app.models import JobDescription
+from app.tools.disk_cache import DiskTier
+
+# --- Cache Config (override via env) ---
+SCRAPE_CACHE_PATH = os.getenv("SCRAPE_CACHE_PATH", os.path.join("./.data", "scrape_cache.db"))
+SCRAPE_CACHE_TTL = float(os.getenv("SCRAPE_CACHE_TTL", str(6 * 3600)))
+SCRAPE_CACHE_ERROR_TTL = float(os.getenv("SCRAPE_CACHE_ERROR_TTL", "120"))
+SCRAPE_CACHE_MAX_ENTRIES = int(os.getenv("SCRAPE_CACHE_MAX_ENTRIES", "512"))
+SCRAPE_CACHE_MAX_DISK_ENTRIES = int(os.getenv("SCRAPE_CACHE_MAX_DISK_ENTRIES", "20000"))
+SCRAPE_CACHE_PRUNE_EVERY = int(os.getenv("SCRAPE_CACHE_PRUNE_EVERY", "64"))  # disk writes between prunes, the cap is enforced that often
+SCRAPE_CACHE_TOUCH_INTERVAL = float(os.getenv("SCRAPE_CACHE_TOUCH_INTERVAL", "600"))  # seconds before a disk hit rewrites accessed_at
+# expired rows are kept this long so they can still be revalidated with etag/last-modified
+SCRAPE_CACHE_STALE_WINDOW = float(os.getenv("SCRAPE_CACHE_STALE_WINDOW", str(7 * 24 * 3600)))
+
+# query params that only track the click, never change the posting
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "msclkid", "trk", "trkinfo", "refid", "trackingid", "ref", "src", "source",
+    "from", "lipi", "position", "pagenum", "originalsubdomain",
+}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical cache key for a job URL: lowercase scheme/host, no fragment,
+    no tracking params, sorted query and no trailing slash.
+    """
+    parts = urlsplit(url.strip())
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        path,
+        urlencode(sorted(query)),
+        "",
+    ))
+
+
+def is_error_job(job: JobDescription) -> bool:
+    return job.title.startswith("Error")
+
+
+@dataclass
+class CacheEntry:
+    job: JobDescription
+    expires_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating a stale entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ScrapeCache:
+    """
+    Two tier cache of parsed JobDescriptions keyed by normalized URL.
+    Memory tier is a bounded LRU, disk tier is a small SQLite file (a DiskTier) so entries
+    survive restarts, capped at max_disk_entries every `prune_every` writes.
+    Failed scrapes are cached with a short TTL so dead URLs aren't hammered.
+    get/put/refresh block on the file, async code uses aget/aput/arefresh.
+    """
+
+    def __init__(
+        self,
+        path: str = SCRAPE_CACHE_PATH,
+        ttl: float = SCRAPE_CACHE_TTL,
+        error_ttl: float = SCRAPE_CACHE_ERROR_TTL,
+        max_entries: int = SCRAPE_CACHE_MAX_ENTRIES,
+        max_disk_entries: int = SCRAPE_CACHE_MAX_DISK_ENTRIES,
+        prune_every: int = SCRAPE_CACHE_PRUNE_EVERY,
+        touch_interval: float = SCRAPE_CACHE_TOUCH_INTERVAL,
+    ):
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()  # memory tier + counters, never held during disk i/o
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "revalidated": 0,
+            "stale_served": 0,
+            "error_hits": 0,
+            "evictions": 0,
+        }
+
+        self._disk = DiskTier(
+            path, "scrape_cache", {"job_json": "TEXT NOT NULL", "etag": "TEXT", "last_modified": "TEXT"},
+            touch_interval=touch_interval, prune_every=prune_every,
+            stale_window=SCRAPE_CACHE_STALE_WINDOW, max_rows=max_disk_entries,
+        )
+
+    # --- lookups ---
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """
+        Returns the entry for url (fresh or stale) or None.
+        Callers check entry.is_fresh and revalidate stale ones.
+        """
+        key = normalize_url(url)
+        entry = self._get_memory(key)
+        if entry is not None:
+            return self._found(key, entry, loaded=False)
+        return self._found(key, self._load(key), loaded=True)
+
+    async def aget(self, url: str) -> Optional[CacheEntry]:
+        """get() without blocking the event loop, a memory miss is looked up on a thread"""
+        key = normalize_url(url)
+        entry = self._get_memory(key)
+        if entry is not None:
+            return self._found(key, entry, loaded=False)
+        return self._found(key, await asyncio.to_thread(self._load, key), loaded=True)
+
+    def put(self, url: str, job: JobDescription, etag: Optional[str] = None, last_modified: Optional[str] = None) -> CacheEntry:
+        key, entry = self._put_memory(url, job, etag, last_modified)
+        self._store(key, entry)
+        return entry
+
+    async def aput(self, url: str, job: JobDescription, etag: Optional[str] = None, last_modified: Optional[str] = None) -> CacheEntry:
+        """put() without blocking the event loop, the memory copy is there before the disk write"""
+        key, entry = self._put_memory(url, job, etag, last_modified)
+        await asyncio.to_thread(self._store, key, entry)
+        return entry
+
+    def refresh(self, url: str) -> Optional[CacheEntry]:
+        """Server answered 304 Not Modified: extend the entry's ttl without re-parsing."""
+        key = normalize_url(url)
+        entry = self._extend(key, self._get_memory(key) or self._load(key))
+        if entry is not None:
+            self._store(key, entry)
+        return entry
+
+    async def arefresh(self, url: str) -> Optional[CacheEntry]:
+        """refresh() without blocking the event loop"""
+        key = normalize_url(url)
+        entry = self._get_memory(key) or await asyncio.to_thread(self._load, key)
+        entry = self._extend(key, entry)
+        if entry is not None:
+            await asyncio.to_thread(self._store, key, entry)
+        return entry
+
+    def keep_stale(self, url: str, entry: CacheEntry) -> CacheEntry:
+        """
+        Revalidating `entry` failed: keep serving it for error_ttl, then try again.
+        Memory only, the stored row keeps its validators.
+        """
+        entry.expires_at = time.time() + self.error_ttl
+        with self._lock:
+            self._counters["stale_served"] += 1
+            self._remember(normalize_url(url), entry)
+        return entry
+
+    def invalidate(self, url: str):
+        key = normalize_url(url)
+        with self._lock:
+            self._memory.pop(key, None)
+        self._disk.delete(key)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        self._disk.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._counters)
+            lookups = stats["hits"] + stats["error_hits"] + stats["misses"] + stats["stale"]
+            stats["hit_ratio"] = round((stats["hits"] + stats["error_hits"] + stats["revalidated"]) / lookups, 4) if lookups else 0.0
+            stats["memory_entries"] = len(self._memory)
+        stats["disk_entries"] = self._disk.count()
+        return stats
+
+    def close(self):
+        self._disk.close()
+
+    # --- memory tier ---
+
+    def _get_memory(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+            return entry
+
+    def _found(self, key: str, entry: Optional[CacheEntry], loaded: bool) -> Optional[CacheEntry]:
+        """Books a lookup, entries loaded from disk go to memory"""
+        with self._lock:
+            if loaded and entry is not None:
+                self._remember(key, entry)
+            if entry is None:
+                self._counters["misses"] += 1
+            elif not entry.is_fresh:
+                self._counters["stale"] += 1
+            elif is_error_job(entry.job):
+                self._counters["error_hits"] += 1
+            else:
+                self._counters["hits"] += 1
+            return entry
+
+    def _put_memory(self, url: str, job: JobDescription, etag: Optional[str], last_modified: Optional[str]):
+        key = normalize_url(url)
+        if is_error_job(job):
+            # never revalidate errors, just retry once the short ttl runs out
+            entry = CacheEntry(job=job, expires_at=time.time() + self.error_ttl)
+        else:
+            entry = CacheEntry(job=job, expires_at=time.time() + self.ttl, etag=etag, last_modified=last_modified)
+        with self._lock:
+            self._remember(key, entry)
+        return key, entry
+
+    def _extend(self, key: str, entry: Optional[CacheEntry]) -> Optional[CacheEntry]:
+        if entry is None:
+            return None
+        entry.expires_at = time.time() + self.ttl
+        with self._lock:
+            self._counters["revalidated"] += 1
+            self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry: CacheEntry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    # --- disk tier, blocking ---
+
+    def _load(self, key: str) -> Optional[CacheEntry]:
+        row = self._disk.get(key)  # (job_json, etag, last_modified, expires_at)
+        if row is None:
+            return None
+        return CacheEntry(job=JobDescription(**json.loads(row[0])), expires_at=row[3], etag=row[1], last_modified=row[2])
+
+    def _store(self, key: str, entry: CacheEntry):
+        self._disk.put(key, (json.dumps(entry.job.dict()), entry.etag, entry.last_modified), entry.expires_at)
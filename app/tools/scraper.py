@@ -1,73 +1,395 @@
-import json
+import asyncio
+import codecs
+import os
 import re
-from bs4 import BeautifulSoup
+import threading
+import time
 import httpx
 from jobspy import scrape_jobs
 import pandas as pd
-from typing import List, Dict, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from app.models import JobDescription
+from app.tools.scrape_cache import ScrapeCache, is_error_job, normalize_url
+from app.tools.single_flight import SingleFlight
+from app.tools.resilience import TokenBucket, backoff_delay, retry_after_seconds
+from app.tools.near_dupes import near_duplicate_mask, posting_text
+from app.tools.extractors import HtmlExtractor, get_extractor, find_job_posting, job_from_json_ld
+
+# http2 needs the optional `h2` package (httpx[http2]), fall back to http/1.1 without it
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# --- Pool Config (override via env) ---
+SCRAPER_TIMEOUT = float(os.getenv("SCRAPER_TIMEOUT", "15.0"))
+SCRAPER_MAX_CONNECTIONS = int(os.getenv("SCRAPER_MAX_CONNECTIONS", "100"))
+SCRAPER_MAX_KEEPALIVE = int(os.getenv("SCRAPER_MAX_KEEPALIVE", "20"))
+SCRAPER_KEEPALIVE_EXPIRY = float(os.getenv("SCRAPER_KEEPALIVE_EXPIRY", "30.0"))
+SCRAPER_HTTP2 = os.getenv("SCRAPER_HTTP2", "1") not in ("0", "false", "False")
+# hard cap on decoded body bytes read per page, the rest of a huge page is never downloaded
+SCRAPER_MAX_BYTES = int(os.getenv("SCRAPER_MAX_BYTES", str(2 * 1024 * 1024)))
+
+# --- Politeness Config (override via env) ---
+SCRAPER_GLOBAL_CONCURRENCY = int(os.getenv("SCRAPER_GLOBAL_CONCURRENCY", "32"))
+SCRAPER_HOST_CONCURRENCY = int(os.getenv("SCRAPER_HOST_CONCURRENCY", "4"))
+SCRAPER_HOST_RATE = float(os.getenv("SCRAPER_HOST_RATE", "2.0"))  # requests / second / domain
+SCRAPER_HOST_BURST = float(os.getenv("SCRAPER_HOST_BURST", "4"))
+SCRAPER_MAX_RETRIES = int(os.getenv("SCRAPER_MAX_RETRIES", "3"))
+SCRAPER_BACKOFF_BASE = float(os.getenv("SCRAPER_BACKOFF_BASE", "1.0"))
+SCRAPER_BACKOFF_MAX = float(os.getenv("SCRAPER_BACKOFF_MAX", "60.0"))
+
+# boards that throttle hard get stricter limits: (concurrency, rate, burst)
+HOST_OVERRIDES = {
+    "linkedin.com": (2, 0.5, 2),
+    "indeed.com": (2, 1.0, 2),
+    "glassdoor.com": (2, 1.0, 2),
+}
+RETRY_STATUSES = (429, 503)
+
+# --- JobSpy Search Config (override via env) ---
+SEARCH_SITES = ["linkedin", "indeed", "glassdoor", "ziprecruiter"]
+SEARCH_SITE_TIMEOUT = float(os.getenv("SEARCH_SITE_TIMEOUT", "25.0"))
+SEARCH_SITE_WORKERS = int(os.getenv("SEARCH_SITE_WORKERS", "2"))  # jobspy threads per board, a board with all of them stuck is skipped
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "600"))
+SEARCH_CACHE_PARTIAL_TTL = float(os.getenv("SEARCH_CACHE_PARTIAL_TTL", "60"))  # some boards failed
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "128"))
+
+NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([\w.:-]+)""", re.I)
+SCRIPT_OPEN_RE = re.compile(r"<script\b", re.I)
+LD_JSON_RE = re.compile(r"<script\b[^>]*application/ld\+json[^>]*>(.*?)</script\s*>", re.I | re.S)
+SNIFF_BYTES = 1024
+
+
+@dataclass
+class FetchReport:
+    """What one scrape cost on the wire."""
+    bytes_downloaded: int = 0
+    bytes_avoided: Optional[int] = None  # None when the server sent no content-length
+    truncated: bool = False  # hit SCRAPER_MAX_BYTES
+    short_circuit: bool = False  # JSON-LD had everything, rest of page skipped
+    from_cache: bool = False
+    encoding: Optional[str] = None
+
+
+def host_key(url: str) -> str:
+    """
+    Politeness bucket for a URL: the registrable domain, so www.linkedin.com and
+    uk.linkedin.com share one set of limits.
+    """
+    host = (httpx.URL(url).host or "").lower().rstrip(".")
+    labels = host.split(".")
+    if len(labels) <= 2 or host.replace(".", "").isdigit():
+        return host
+    # example.co.uk / example.com.au style second level domains
+    if len(labels[-1]) == 2 and labels[-2] in ("co", "com", "ac", "org", "net", "gov", "edu"):
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+@dataclass
+class HostState:
+    semaphore: asyncio.Semaphore
+    bucket: TokenBucket
+    cooldown_until: float = 0.0  # set by 429/503, every request to the host waits it out
+    counters: Dict[str, float] = field(default_factory=lambda: {
+        "requests": 0, "throttled": 0, "retries": 0, "wait_seconds": 0.0,
+    })
+
+
+class HostScheduler:
+    """
+    Every outbound fetch goes through here.
+    Per domain: a concurrency cap, a token bucket and a shared cooldown after 429/503.
+    Globally: one in-flight cap, only taken once the host is ready so a busy
+    domain never starves the others.
+    """
+
+    def __init__(
+        self,
+        global_concurrency: int = SCRAPER_GLOBAL_CONCURRENCY,
+        host_concurrency: int = SCRAPER_HOST_CONCURRENCY,
+        host_rate: float = SCRAPER_HOST_RATE,
+        host_burst: float = SCRAPER_HOST_BURST,
+        max_retries: int = SCRAPER_MAX_RETRIES,
+        backoff_base: float = SCRAPER_BACKOFF_BASE,
+        backoff_max: float = SCRAPER_BACKOFF_MAX,
+        host_overrides: Optional[Dict[str, Tuple[int, float, float]]] = None,
+    ):
+        self.global_concurrency = global_concurrency
+        self.host_concurrency = host_concurrency
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.host_overrides = HOST_OVERRIDES if host_overrides is None else host_overrides
+        self._global: Optional[asyncio.Semaphore] = None
+        self._hosts: Dict[str, HostState] = {}
+        self.in_flight = 0
+
+    def _host(self, key: str) -> HostState:
+        state = self._hosts.get(key)
+        if state is None:
+            concurrency, rate, burst = self.host_overrides.get(key, (self.host_concurrency, self.host_rate, self.host_burst))
+            state = HostState(semaphore=asyncio.Semaphore(concurrency), bucket=TokenBucket(rate, burst))
+            self._hosts[key] = state
+        return state
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        return backoff_delay(attempt, self.backoff_base, self.backoff_max, retry_after)
+
+    @asynccontextmanager
+    async def stream(self, client: httpx.AsyncClient, url: str, headers: Dict[str, str]) -> AsyncIterator[httpx.Response]:
+        """
+        Drop-in for client.stream("GET", ...) with politeness and retries.
+        The host and global slots stay held while the caller reads the body.
+        """
+        if self._global is None:
+            # created lazily so it binds to the running loop
+            self._global = asyncio.Semaphore(self.global_concurrency)
+        state = self._host(host_key(url))
+
+        attempt = 0
+        while True:
+            async with state.semaphore:
+                wait = state.cooldown_until - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    state.counters["wait_seconds"] += wait
+                state.counters["wait_seconds"] += await state.bucket.acquire()
+
+                async with self._global:
+                    self.in_flight += 1
+                    state.counters["requests"] += 1
+                    try:
+                        async with client.stream("GET", url, headers=headers) as response:
+                            if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                                yield response
+                                return
+                            state.counters["throttled"] += 1
+                            delay = self.backoff_delay(attempt, retry_after_seconds(response.headers.get("retry-after")))
+                            state.cooldown_until = max(state.cooldown_until, time.monotonic() + delay)
+                    finally:
+                        self.in_flight -= 1
+
+            attempt += 1
+            state.counters["retries"] += 1
+
+    def stats(self) -> Dict:
+        return {
+            "in_flight": self.in_flight,
+            "hosts": {key: dict(state.counters) for key, state in self._hosts.items()},
+        }
+
+
+def dedupe_key(title, company) -> Optional[str]:
+    """Normalized title+company, None when either is missing."""
+    if not isinstance(title, str) or not isinstance(company, str):
+        return None
+    title = NON_ALNUM_RE.sub(" ", title.lower()).strip()
+    company = NON_ALNUM_RE.sub(" ", company.lower()).strip()
+    if not title or not company:
+        return None
+    return f"{title}|{company}"
+
+
+def merge_search_results(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concats per-board results (in board priority order) and drops duplicates,
+    first by job url then by normalized title+company. First board wins.
+    """
+    frames = [f for f in frames if f is not None and not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    jobs = pd.concat(frames, ignore_index=True)
+
+    if "job_url" in jobs.columns:
+        has_url = jobs["job_url"].notna()
+        jobs = jobs[~(has_url & jobs.duplicated(subset="job_url"))]
+
+    if "title" in jobs.columns and "company" in jobs.columns:
+        keys = pd.Series([dedupe_key(t, c) for t, c in zip(jobs["title"], jobs["company"])], index=jobs.index)
+        jobs = jobs[~(keys.notna() & keys.duplicated())]
+
+    return jobs.reset_index(drop=True)
+
+
+def collapse_near_duplicates(jobs: pd.DataFrame) -> pd.DataFrame:
+    """
+    Drops postings whose title+description is a near copy (MinHash/LSH) of an earlier
+    row, e.g. the same role reworded by a recruiter on another board.
+    Rows without a description are kept, there is nothing to compare.
+    """
+    if jobs.empty or "description" not in jobs.columns:
+        return jobs
+    titles = jobs["title"] if "title" in jobs.columns else pd.Series("", index=jobs.index)
+    texts = [
+        posting_text(t if isinstance(t, str) else "", d) if isinstance(d, str) and d.strip() else None
+        for t, d in zip(titles, jobs["description"])
+    ]
+    mask = near_duplicate_mask(texts)
+    if not any(mask):
+        return jobs
+    return jobs[[not m for m in mask]].reset_index(drop=True)
+
+
+def sniff_encoding(content_type: str, head: bytes) -> str:
+    """
+    Charset from the content-type header, then a BOM, then <meta charset> in the
+    first bytes of the page, then utf-8 (same default as httpx).
+    """
+    candidates = []
+    if "charset=" in content_type.lower():
+        candidates.append(content_type.lower().split("charset=")[-1].split(";")[0].strip(" \"'"))
+    if head.startswith(codecs.BOM_UTF8):
+        candidates.append("utf-8-sig")
+    elif head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        candidates.append("utf-16")
+    meta = CHARSET_RE.search(head)
+    if meta:
+        candidates.append(meta.group(1).decode("ascii", "ignore"))
+    for name in candidates:
+        try:
+            return codecs.lookup(name).name
+        except LookupError:
+            continue
+    return "utf-8"
+
 
 class JobScraper:
-    def __init__(self):
+    def __init__(
+        self,
+        max_connections: int = SCRAPER_MAX_CONNECTIONS,
+        max_keepalive_connections: int = SCRAPER_MAX_KEEPALIVE,
+        keepalive_expiry: float = SCRAPER_KEEPALIVE_EXPIRY,
+        http2: bool = SCRAPER_HTTP2,
+        timeout: float = SCRAPER_TIMEOUT,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        cache: Optional[ScrapeCache] = None,
+        extractor: Optional[HtmlExtractor] = None,
+        max_bytes: int = SCRAPER_MAX_BYTES,
+        scheduler: Optional[HostScheduler] = None,
+    ):
         # Using a reliable, modern user agent
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
         }
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.timeout = timeout
+        self._transport = transport  # tests pass a mock/stub transport here
+        self._client: Optional[httpx.AsyncClient] = None
+        self.cache = cache
+        self.extractor = extractor or get_extractor()
+        self.max_bytes = max_bytes
+        self.scheduler = scheduler or HostScheduler()
+        self.inflight = SingleFlight()
+        self.search_sites = list(SEARCH_SITES)
+        self.search_site_timeout = SEARCH_SITE_TIMEOUT
+        self.search_site_workers = SEARCH_SITE_WORKERS
+        self._search_pools: Dict[str, ThreadPoolExecutor] = {}
+        self._search_running: Dict[str, int] = {}  # jobspy calls still running per board, timed out ones included
+        self._search_lock = threading.Lock()
+        self.search_errors: Dict[str, str] = {}  # last failure per board
+        self._search_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.search_stats = {"cache_hits": 0, "cache_misses": 0, "site_errors": 0, "site_timeouts": 0, "duplicates_removed": 0, "near_duplicates_removed": 0}
+        self.transfer_stats = {
+            "fetches": 0,
+            "bytes_downloaded": 0,
+            "bytes_avoided": 0,
+            "truncated": 0,
+            "short_circuits": 0,
+        }
+
+    async def start(self):
+        """Open the shared connection pool. Called once from the app lifespan."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                follow_redirects=True,
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                transport=self._transport,
+            )
+
+    async def close(self):
+        """Close the shared connection pool on shutdown."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        # lazy start so the scraper still works outside the app lifespan (scripts, tests)
+        if self._client is None or self._client.is_closed:
+            await self.start()
+        return self._client
+
+    async def scrape(self, url: str) -> JobDescription:
+        """
+        Scrapes a job URL using the shared pooled httpx.AsyncClient.
+        The network wait is awaited and the HTML parsing runs in a worker thread,
+        so a slow job board never blocks the event loop.
+        With a cache attached, fresh entries skip the network entirely and stale ones
+        are revalidated with a conditional GET (etag / last-modified).
+        """
+        job, _ = await self.scrape_with_report(url)
+        return job
 
-    def scrape(self, url: str) -> JobDescription:
+    async def scrape_with_report(self, url: str) -> Tuple[JobDescription, FetchReport]:
         """
-        Scrapes a job URL using httpx (Standard HTTP Request) instead of Playwright.
-        This is faster and more lightweight but essentially does the same parsing.
+        Same as scrape() but also returns the FetchReport (bytes downloaded / avoided).
+        Concurrent scrapes of the same normalized URL share one fetch.
+        """
+        return await self.inflight.do(normalize_url(url), lambda: self._scrape_with_report(url))
+
+    async def _scrape_with_report(self, url: str) -> Tuple[JobDescription, FetchReport]:
+        entry = await self.cache.aget(url) if self.cache else None
+        if entry is not None and entry.is_fresh:
+            return entry.job, FetchReport(from_cache=True)
+
+        job, etag, last_modified, report = await self._fetch(url, entry.validators() if entry else {})
+        if job is None:
+            # 304 Not Modified, the cached copy is still good
+            return (await self.cache.arefresh(url) or entry).job, report
+
+        if entry is not None and is_error_job(job):
+            # a stale posting beats an error, and keeps its etag for the next try
+            return self.cache.keep_stale(url, entry).job, report
+        if self.cache:
+            await self.cache.aput(url, job, etag=etag, last_modified=last_modified)
+        return job, report
+
+    async def _fetch(self, url: str, headers: Dict[str, str]):
         """
+        Returns (job, etag, last_modified, report). job is None when the server answered 304.
+        """
+        report = FetchReport()
         try:
-            with httpx.Client(headers=self.headers, follow_redirects=True, timeout=15.0) as client:
-                response = client.get(url)
+            client = await self._get_client()
+            async with self.scheduler.stream(client, url, headers) as response:
+                if response.status_code == 304 and headers:
+                    return None, None, None, report
                 response.raise_for_status()
-                
-                soup = BeautifulSoup(response.text, "html.parser")
-                
-                # 1. Attempt to extract structured JSON-LD data (most reliable)
-                json_data = self._extract_json_ld(soup)
-                
-                # 2. Extract Title
-                title = json_data.get("title") or (soup.title.string if soup.title else None)
-                if not title or title.strip() == "":
-                    h1 = soup.find("h1")
-                    title = h1.get_text(strip=True) if h1 else "Unknown Job Title"
-                
-                # 3. Extract Company
-                company = json_data.get("hiringOrganization", {}).get("name")
-                if not company:
-                    meta_company = soup.find("meta", property="og:site_name")
-                    company = meta_company["content"] if meta_company else "Unknown Company"
-
-                # 4. Extract Location
-                loc = json_data.get("jobLocation", {}).get("address", {})
-                if loc:
-                     # Combine locality and region if available
-                     location = f"{loc.get('addressLocality', '')}, {loc.get('addressRegion', '')}".strip(", ")
-                else:
-                    location = "See Description"
-
-                # 5. Extract and Clean Text Description
-                # Remove non-content tags
-                for junk in soup(["script", "style", "nav", "footer", "header", "noscript", "iframe", "svg", "button", "input", "form"]):
-                    junk.decompose()
-                    
-                # Find the main content area - heuristics
-                content_area = soup.find("main") or soup.find("article") or soup.find("div", {"id": re.compile(r"content|job|desc", re.I)}) or soup.body
-                raw_text = content_area.get_text(separator="\n", strip=True) if content_area else ""
-                
-                # Normalize whitespace
-                raw_text = re.sub(r'\n+', '\n', raw_text).strip()
-
-                return JobDescription(
-                    title=title.strip(),
-                    company=company.strip(),
-                    location=location,
-                    raw_text=raw_text,
-                    url=url
-                )
+
+                text, json_job = await self._read_body(response, url, report)
+                etag, last_modified = response.headers.get("etag"), response.headers.get("last-modified")
+
+            if json_job is None:
+                json_job = await asyncio.to_thread(self.extractor.extract, text, url)
+            return json_job, etag, last_modified, report
 
         except httpx.RequestError as e:
             return JobDescription(
@@ -75,54 +397,176 @@ class JobScraper:
                 company="System",
                 raw_text=f"Could not connect to the URL: {str(e)}",
                 url=url
-            )
+            ), None, None, report
         except Exception as e:
             return JobDescription(
                 title="Error: Scraping Failed",
                 company="System",
                 raw_text=f"An error occurred while scraping: {str(e)}",
                 url=url
-            )
+            ), None, None, report
+        finally:
+            self._record(report)
 
-    def search_jobs(self, query: str, location: str = "", limit: int = 10) -> List[Dict]:
+    async def _read_body(self, response: httpx.Response, url: str, report: FetchReport):
+        """
+        Streams the body up to max_bytes, decoding incrementally.
+        Returns (text, job). job is set when a complete JSON-LD JobPosting showed up
+        before the end of the page, in that case reading stops and no DOM is built.
+        """
+        head = b""
+        decoder = None
+        text = ""
+        scan_pos = 0
+        read = 0
+
+        async for chunk in response.aiter_bytes():
+            if read + len(chunk) > self.max_bytes:
+                chunk = chunk[:self.max_bytes - read]
+                report.truncated = True
+            read += len(chunk)
+
+            if decoder is None:
+                # wait for enough bytes to spot a <meta charset> before decoding anything
+                head += chunk
+                if len(head) < SNIFF_BYTES and not report.truncated:
+                    continue
+                report.encoding = sniff_encoding(response.headers.get("content-type", ""), head)
+                decoder = codecs.getincrementaldecoder(report.encoding)(errors="replace")
+                chunk = head
+
+            text += decoder.decode(chunk)
+
+            job, scan_pos = self._scan_json_ld(text, scan_pos, url)
+            if job is not None:
+                report.short_circuit = True
+                break
+            if report.truncated:
+                break
+        else:
+            if decoder is None:
+                # tiny page, never reached SNIFF_BYTES
+                report.encoding = sniff_encoding(response.headers.get("content-type", ""), head)
+                decoder = codecs.getincrementaldecoder(report.encoding)(errors="replace")
+                text = decoder.decode(head)
+            text += decoder.decode(b"", final=True)
+            job = None
+
+        report.bytes_downloaded = response.num_bytes_downloaded
+        content_length = response.headers.get("content-length")
+        if content_length and content_length.isdigit():
+            report.bytes_avoided = max(0, int(content_length) - report.bytes_downloaded)
+        return text, job
+
+    def _scan_json_ld(self, text: str, scan_pos: int, url: str):
+        """
+        Looks for complete ld+json blocks after scan_pos.
+        Returns (job or None, next scan_pos), the next scan starts at the last
+        unclosed <script so already scanned text isn't searched again.
+        """
+        for match in LD_JSON_RE.finditer(text, scan_pos):
+            scan_pos = match.end()
+            job = job_from_json_ld(find_job_posting(match.group(1)), url)
+            if job is not None:
+                return job, scan_pos
+
+        last_open = None
+        for last_open in SCRIPT_OPEN_RE.finditer(text, scan_pos):
+            pass
+        if last_open is not None:
+            return None, last_open.start()
+        # keep a small overlap in case "<script" is split across chunks
+        return None, max(scan_pos, len(text) - 16)
+
+    def _record(self, report: FetchReport):
+        self.transfer_stats["fetches"] += 1
+        self.transfer_stats["bytes_downloaded"] += report.bytes_downloaded
+        self.transfer_stats["bytes_avoided"] += report.bytes_avoided or 0
+        self.transfer_stats["truncated"] += int(report.truncated)
+        self.transfer_stats["short_circuits"] += int(report.short_circuit)
+
+    async def search_jobs(self, query: str, location: str = "", limit: int = 10) -> List[Dict]:
         """
         Uses JobSpy to search for jobs across multiple boards.
         """
+        jobs, _ = await self.search_jobs_df(query, location, limit)
+        # Convert DataFrame to list of dicts
+        return jobs.to_dict(orient="records")
+
+    async def search_jobs_df(self, query: str, location: str = "", limit: int = 10) -> Tuple[pd.DataFrame, Dict[str, str]]:
+        """
+        Queries every board at the same time in the thread pool, each with its own timeout.
+        Returns the merged, deduplicated DataFrame and a per board status
+        ("ok" / "timeout" / "error"). Failed boards just contribute nothing.
+        Whole results are cached per (query, location, limit).
+        """
+        key = (query.strip().lower(), location.strip().lower(), limit)
+        cached = self._search_cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self._search_cache.move_to_end(key)
+            self.search_stats["cache_hits"] += 1
+            return cached[1], cached[2]
+        self.search_stats["cache_misses"] += 1
+
+        results = await asyncio.gather(*(self._search_site(site, query, location, limit) for site in self.search_sites))
+        status = {site: result_status for site, (_, result_status) in zip(self.search_sites, results)}
+        frames = [frame for frame, _ in results]
+
+        jobs = await asyncio.to_thread(merge_search_results, frames)
+        self.search_stats["duplicates_removed"] += sum(len(f) for f in frames if f is not None) - len(jobs)
+        deduped = await asyncio.to_thread(collapse_near_duplicates, jobs)
+        self.search_stats["near_duplicates_removed"] += len(jobs) - len(deduped)
+        jobs = deduped
+
+        ok = sum(1 for v in status.values() if v == "ok")
+        if ok:
+            ttl = SEARCH_CACHE_TTL if ok == len(status) else SEARCH_CACHE_PARTIAL_TTL
+            self._search_cache[key] = (time.monotonic() + ttl, jobs, status)
+            self._search_cache.move_to_end(key)
+            while len(self._search_cache) > SEARCH_CACHE_MAX_ENTRIES:
+                self._search_cache.popitem(last=False)
+        return jobs, status
+
+    async def _search_site(self, site: str, query: str, location: str, limit: int) -> Tuple[Optional[pd.DataFrame], str]:
+        """
+        One board on its own threads. A timed out jobspy call can't be killed and keeps its
+        thread, so a call only goes in when one of the board's threads is free: its timeout
+        runs from when it starts, and a board whose threads are all stuck is a timeout right away.
+        """
+        with self._search_lock:
+            free = self._search_running.get(site, 0) < self.search_site_workers
+            if free:
+                self._search_running[site] = self._search_running.get(site, 0) + 1
+        if not free:
+            self.search_stats["site_timeouts"] += 1
+            self.search_errors[site] = "skipped, earlier searches are still running"
+            return None, "timeout"
+
+        if site not in self._search_pools:
+            self._search_pools[site] = ThreadPoolExecutor(max_workers=self.search_site_workers, thread_name_prefix=f"jobspy-{site}")
+        future = self._search_pools[site].submit(
+            scrape_jobs,
+            site_name=[site],
+            search_term=query,
+            location=location,
+            results_wanted=limit,
+            country_indeed='USA'  # Default to USA, can be parameterized if needed
+        )
+        future.add_done_callback(lambda _: self._search_finished(site))
         try:
-            # JobSpy supports: linkedin, indeed, glassdoor, ziprecruiter
-            site_names = ["linkedin", "indeed", "glassdoor", "ziprecruiter"]
-            
-            jobs: pd.DataFrame = scrape_jobs(
-                site_name=site_names,
-                search_term=query,
-                location=location,
-                results_wanted=limit,
-                country_indeed='USA'  # Default to USA, can be parameterized if needed
-            )
-            
-            # Convert DataFrame to list of dicts
-            return jobs.to_dict(orient="records")
-            
+            # on timeout we just stop waiting, the thread stays counted until the call returns
+            jobs = await asyncio.wait_for(asyncio.wrap_future(future), self.search_site_timeout)
+            return jobs, "ok"
+        except asyncio.TimeoutError:
+            self.search_stats["site_timeouts"] += 1
+            self.search_errors[site] = f"timed out after {self.search_site_timeout}s"
+            return None, "timeout"
         except Exception as e:
-            print(f"JobSpy Search Error: {e}")
-            return []
-
-    def _extract_json_ld(self, soup: BeautifulSoup) -> dict:
-        """
-        Helper method to look for structured 'JobPosting' data in the page's HTML.
-        """
-        scripts = soup.find_all("script", type="application/ld+json")
-        for script in scripts:
-            try:
-                if not script.string: continue
-                data = json.loads(script.string)
-                
-                if isinstance(data, list): 
-                    data = data[0]
-                
-                obj_type = data.get("@type", "")
-                if obj_type == "JobPosting" or (isinstance(obj_type, list) and "JobPosting" in obj_type):
-                    return data
-            except:
-                continue
-        return {}
\ No newline at end of file
+            self.search_stats["site_errors"] += 1
+            self.search_errors[site] = f"{type(e).__name__}: {e}"
+            return None, "error"
+
+    def _search_finished(self, site: str):
+        # runs on the jobspy thread
+        with self._search_lock:
+            self._search_running[site] -= 1
@@ -0,0 +1,87 @@
+import datetime
+import io
+import json
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+# arrow output is optional (pip install pyarrow)
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+FORMATS = ("records", "columns", "arrow")
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def project(jobs: pd.DataFrame, fields: Optional[List[str]]) -> pd.DataFrame:
+    """Keeps only the requested columns (in the requested order), unknown names are ignored."""
+    if not fields:
+        return jobs
+    return jobs[[f for f in dict.fromkeys(fields) if f in jobs.columns]]
+
+
+def prepare(jobs: pd.DataFrame) -> pd.DataFrame:
+    """
+    Column level fixups before serializing, no per-row python.
+    JobSpy puts datetime.date objects in object columns, pandas would write them as
+    full timestamps, so they are formatted as plain ISO dates like the API always returned.
+    """
+    date_cols = [
+        col for col in jobs.columns
+        if jobs[col].dtype == object and isinstance(_first_valid(jobs[col]), datetime.date)
+        and not isinstance(_first_valid(jobs[col]), datetime.datetime)
+    ]
+    if not date_cols:
+        return jobs
+    jobs = jobs.copy()
+    for col in date_cols:
+        jobs[col] = pd.to_datetime(jobs[col], errors="coerce").dt.strftime("%Y-%m-%d")
+    return jobs
+
+
+def records_json(jobs: pd.DataFrame) -> str:
+    """[{col: value}, ...] with NaN -> null, serialized by pandas in C."""
+    if jobs.empty:
+        return "[]"
+    return jobs.to_json(orient="records", date_format="iso", default_handler=str)
+
+
+def columns_json(jobs: pd.DataFrame) -> str:
+    """Compact columnar form: {"columns": [...], "data": {col: [values...]}, "count": n}."""
+    parts = [
+        f"{json.dumps(str(col))}:{jobs[col].to_json(orient='values', date_format='iso', default_handler=str)}"
+        for col in jobs.columns
+    ]
+    return '{"columns":%s,"data":{%s},"count":%d}' % (json.dumps([str(c) for c in jobs.columns]), ",".join(parts), len(jobs))
+
+
+def search_payload(jobs: pd.DataFrame, sites: Dict[str, str], fields: Optional[List[str]] = None, fmt: str = "records") -> str:
+    """JSON body for /api/search-jobs built without going through per-cell jsonable_encoder."""
+    jobs = prepare(project(jobs, fields))
+    results = columns_json(jobs) if fmt == "columns" else records_json(jobs)
+    return '{"results":%s,"sites":%s}' % (results, json.dumps(sites))
+
+
+def arrow_ipc(jobs: pd.DataFrame, fields: Optional[List[str]] = None) -> bytes:
+    """Arrow IPC stream of the (projected) results."""
+    jobs = project(jobs, fields)
+    arrays = {}
+    for col in jobs.columns:
+        try:
+            arrays[str(col)] = pa.array(jobs[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # mixed python objects in one column, ship them as strings
+            arrays[str(col)] = pa.array(jobs[col].map(str, na_action="ignore"), from_pandas=True)
+    table = pa.table(arrays) if arrays else pa.table({})
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def _first_valid(col: pd.Series):
+    idx = col.first_valid_index()
+    return None if idx is None else col[idx]
@@ -0,0 +1,58 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key onto one in-flight task.
+    Every caller gets the shared result (or the shared exception). A caller that is
+    cancelled only stops waiting, the work is cancelled once nobody waits for it anymore.
+    Keys are forgotten as soon as the work finishes, so this is not a cache.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self.counters = {"calls": 0, "executed": 0, "coalesced": 0, "errors": 0, "cancelled": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.counters["calls"] += 1
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task, key=key, call=call: self._finished(key, call))
+            self.counters["executed"] += 1
+        else:
+            self.counters["coalesced"] += 1
+
+        call.waiters += 1
+        try:
+            # shield: one caller going away must not cancel the others' result
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counters, in_flight=len(self._calls))
+
+    def _finished(self, key: str, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if call.task.cancelled():
+            self.counters["cancelled"] += 1
+        elif call.task.exception() is not None:
+            # also marks the exception as retrieved when every waiter is gone
+            self.counters["errors"] += 1
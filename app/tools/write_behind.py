@@ -0,0 +1,159 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# --- Write Behind Config (override via env) ---
+APPLICATION_WRITE_BATCH = int(os.getenv("APPLICATION_WRITE_BATCH", "256"))  # records per commit at most
+APPLICATION_WRITE_DELAY = float(os.getenv("APPLICATION_WRITE_DELAY", "0.05"))  # seconds the first record of a group waits for company
+APPLICATION_WRITE_DURABLE = os.getenv("APPLICATION_WRITE_DURABLE", "false").lower() == "true"  # requests wait for the commit
+
+
+class _Pending:
+    __slots__ = ("records", "done")
+
+    def __init__(self, records: list, done: Optional[asyncio.Future]):
+        self.records = records
+        self.done = done
+
+
+class WriteBehindQueue:
+    """
+    Collects records and writes them in groups from one background task, one `write`
+    call (one transaction, one fsync) per group. A group is written once it holds
+    `max_batch` records or `max_delay` seconds after its first record arrived, whichever
+    comes first; records arriving while a group is being written form the next one.
+    `submit` returns as soon as the records are queued, or once they are committed with
+    wait=True (`durable` sets the default). A group somebody waits for doesn't wait out
+    the delay, it's written with whatever is queued at that moment. close() writes
+    whatever is still queued. Before start() / after close() submits are written straight away.
+    A group whose write fails is retried once, `max_delay` later. If that fails too its records
+    are dropped: waiters get the error, submits that didn't wait never hear of it, so without
+    `durable` a persistently failing database loses records.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[list], Awaitable[Any]],
+        max_batch: int = APPLICATION_WRITE_BATCH,
+        max_delay: float = APPLICATION_WRITE_DELAY,
+        durable: bool = APPLICATION_WRITE_DURABLE,
+    ):
+        self.write = write
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.durable = durable
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._queued = 0
+        self.counters = {"records": 0, "groups": 0, "committed": 0, "failed": 0, "retries": 0, "durable_waits": 0, "direct": 0, "largest_group": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if not self.running:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stops taking records and waits until everything queued is committed"""
+        if not self.running:
+            return
+        task, self._task = self._task, None
+        self._queue.put_nowait(None)
+        await task
+
+    async def submit(self, records: List[dict], wait: Optional[bool] = None) -> int:
+        """Queues records for the next group, returns how many were taken"""
+        if not records:
+            return 0
+        self.counters["records"] += len(records)
+        if not self.running:
+            self.counters["direct"] += 1
+            await self.write(records)
+            self.counters["committed"] += len(records)
+            return len(records)
+        if not (self.durable if wait is None else wait):
+            self._put(_Pending(records, None))
+            return len(records)
+        done = asyncio.get_running_loop().create_future()
+        self._put(_Pending(records, done))
+        self.counters["durable_waits"] += 1
+        # shield: a caller going away must not pull its records out of the group
+        await asyncio.shield(done)
+        return len(records)
+
+    def submit_nowait(self, records: List[dict]) -> bool:
+        """submit without awaiting anything, False when nothing is running to take them"""
+        if not self.running:
+            return False
+        if records:
+            self.counters["records"] += len(records)
+            self._put(_Pending(records, None))
+        return True
+
+    def _put(self, item: _Pending):
+        self._queued += len(item.records)
+        self._queue.put_nowait(item)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            group, size = [item], len(item.records)
+            waited_on = item.done is not None
+            deadline = loop.time() + self.max_delay
+            while size < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    # someone waits for this group: take what's queued and go, whatever
+                    # arrives during the commit makes the next group
+                    if timeout <= 0 or waited_on:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is None:
+                    stopping = True
+                    break
+                group.append(item)
+                size += len(item.records)
+                waited_on = waited_on or item.done is not None
+            self._queued -= size
+            await self._commit(group)
+
+    async def _commit(self, group: List[_Pending]):
+        records = [record for item in group for record in item.records]
+        try:
+            await self.write(records)
+        except Exception as e:
+            print(f"Error writing {len(records)} queued records, retrying: {e}")
+            self.counters["retries"] += 1
+            await asyncio.sleep(self.max_delay)
+            try:
+                await self.write(records)
+            except Exception as e:
+                self.counters["failed"] += len(records)
+                print(f"Error writing {len(records)} queued records, dropped: {e}")
+                for item in group:
+                    if item.done is not None and not item.done.done():
+                        item.done.set_exception(e)
+                return
+        self.counters["groups"] += 1
+        self.counters["committed"] += len(records)
+        self.counters["largest_group"] = max(self.counters["largest_group"], len(records))
+        for item in group:
+            if item.done is not None and not item.done.done():
+                item.done.set_result(len(item.records))
+
+    def stats(self) -> Dict[str, float]:
+        stats = dict(self.counters, pending=self._queued, running=self.running)
+        stats["records_per_group"] = round(stats["committed"] / stats["groups"], 2) if stats["groups"] else 0.0
+        return stats
@@ -0,0 +1,81 @@
+"""
+Dashboard page latency as the applications table grows.
+
+    python -m benchmarks.bench_dashboard [--sizes 10000,100000,300000] [--users 100]
+
+Fills a temporary SQLite file with applications spread over `users` users, then times
+get_all_applications (what /api/dashboard used to return), the first page of one
+user's applications and the page after following 20 cursors, for each sort and with a
+status filter.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+
+STATUSES = ["Not Submitted", "Submitted", "Interview Requested", "Rejected"]
+
+
+def fill(count: int, users: int, rnd: random.Random):
+    start = datetime(2025, 1, 1)
+    rows = [
+        {
+            "job_title": f"Engineer {i}", "company": f"Company {rnd.randrange(500)}", "status": rnd.choice(STATUSES),
+            "match_score": rnd.randrange(101), "url": f"https://jobs/{i}", "user_id": f"user{rnd.randrange(users)}",
+            "created_at": start + timedelta(seconds=i * 30),
+        }
+        for i in range(count)
+    ]
+    with database.engine.begin() as conn:
+        conn.execute(database.JobApplicationTable.__table__.insert(), rows)
+
+
+def timed(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def page_after(pages: int, **query):
+    cursor = None
+    for _ in range(pages):
+        _, cursor = database.get_applications(cursor=cursor, **query)
+    return lambda: database.get_applications(cursor=cursor, **query)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,300000")
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8s} {'all rows':>10s} {'date p1':>8s} {'date p21':>9s} {'score p21':>10s} {'status+score p21':>17s}   (ms)")
+    for size in (int(s) for s in args.sizes.split(",")):
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        database.engine = database.make_engine(f"sqlite:///{path}")
+        database.Base.metadata.create_all(bind=database.engine)
+        database.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=database.engine)
+        fill(size, args.users, random.Random(size))
+
+        everything = timed(database.get_all_applications, repeat=1)
+        first = timed(lambda: database.get_applications("user7"))
+        by_date = timed(page_after(20, user_id="user7", limit=10))
+        by_score = timed(page_after(20, user_id="user7", sort="score", limit=10))
+        by_status = timed(page_after(20, user_id="user7", sort="score", status="Submitted", limit=2))
+        print(f"{size:8d} {everything * 1e3:10.1f} {first * 1e3:8.2f} {by_date * 1e3:9.2f} {by_score * 1e3:10.2f} {by_status * 1e3:17.2f}")
+        database.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
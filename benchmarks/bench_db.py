@@ -0,0 +1,106 @@
+"""
+Dashboard reads during a burst of analysis writes.
+
+    python -m benchmarks.bench_db [--rows 500] [--writers 16] [--writes 50]
+
+Runs the app's CRUD functions against a temporary SQLite file three ways:
+blocking calls on the event loop with SQLite's default rollback journal (how
+the endpoints used to call them), the same database through the db threads
+(run_db / run_db_write), and the db threads with WAL + the tuned pragmas. Each run fires
+`writers` concurrent tasks saving `writes` applications each while one task
+keeps reading the dashboard, and reports read latency, write throughput and
+the longest event loop stall.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+
+DEFAULT_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL"}
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+async def run(mode: str, pragmas: dict, args) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = database.make_engine(f"sqlite:///{path}", pragmas)
+    database.Base.metadata.create_all(bind=engine)
+    database.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    database.add_applications([
+        {"job_title": f"Engineer {i}", "company": "Acme", "score": i % 100, "url": f"https://jobs/{i}"} for i in range(args.rows)
+    ])
+
+    async def call(func, *a, write=False, **kw):
+        if mode == "blocking":
+            return func(*a, **kw)
+        return await (database.run_db_write if write else database.run_db)(func, *a, **kw)
+
+    done = asyncio.Event()
+    reads, stalls = [], []
+
+    async def reader():
+        while not done.is_set():
+            start = time.perf_counter()
+            await call(database.get_all_applications)
+            reads.append(time.perf_counter() - start)
+            await asyncio.sleep(0)
+
+    async def ticker():
+        # how late a 1ms sleep wakes up = how long something held the event loop
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stalls.append(time.perf_counter() - start - 0.001)
+
+    async def writer(w):
+        for i in range(args.writes):
+            await call(database.add_application, write=True, job_title=f"Burst {w}.{i}", company="Globex", score=50, url=f"https://burst/{w}/{i}")
+            await asyncio.sleep(0)
+
+    background = [asyncio.create_task(reader()), asyncio.create_task(ticker())]
+    start = time.perf_counter()
+    await asyncio.gather(*(writer(w) for w in range(args.writers)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await asyncio.gather(*background)
+    engine.dispose()
+    return {
+        "reads": len(reads),
+        "read_p50": percentile(reads, 0.5),
+        "read_p95": percentile(reads, 0.95),
+        "writes_per_s": args.writers * args.writes / elapsed,
+        "max_stall": max(stalls, default=0.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--writes", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{args.rows} rows, {args.writers} writers x {args.writes} applications")
+    print(f"{'':28s} {'reads':>6s} {'read p50':>9s} {'read p95':>9s} {'writes/s':>9s} {'loop stall':>11s}")
+    for label, mode, pragmas in (
+        ("on the loop, rollback jrnl", "blocking", DEFAULT_PRAGMAS),
+        ("db threads, rollback jrnl", "threads", DEFAULT_PRAGMAS),
+        ("db threads, WAL + pragmas", "threads", database.SQLITE_PRAGMAS),
+    ):
+        r = asyncio.run(run(mode, pragmas, args))
+        print(f"  {label:26s} {r['reads']:6d} {r['read_p50'] * 1e3:7.1f}ms {r['read_p95'] * 1e3:7.1f}ms"
+              f" {r['writes_per_s']:9.0f} {r['max_stall'] * 1e3:9.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
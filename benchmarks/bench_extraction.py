@@ -0,0 +1,79 @@
+"""
+Parity + speed benchmark for the HTML extraction backends.
+
+    python -m benchmarks.bench_extraction [--repeat 50]
+
+Runs every backend over the saved job pages in tests/fixtures/job_pages plus an
+inflated "large ATS page" version of each (lots of inline JS and repeated markup),
+checks every backend returns the same JobDescription as the bs4 reference and
+prints mean time per page.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.tools.extractors import EXTRACTORS, SoupExtractor
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures", "job_pages")
+
+INLINE_JS = "<script>window.__state = " + "{\"k\": [1, 2, 3, \"<div>x</div>\"]}, " * 4000 + "{};</script>\n"
+FILLER = "<div class='related'><nav><a href='#'>Similar job</a></nav><p>Related posting teaser text.</p></div>\n" * 400
+
+
+def load_corpus():
+    corpus = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html"))):
+        name = os.path.basename(path)
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        corpus[name] = html
+        # ~180KB page: big inline state blob in <head> and lots of markup before </body>
+        big = html.replace("</head>", INLINE_JS + "</head>", 1).replace("</body>", FILLER + "</body>", 1)
+        corpus["large:" + name] = big
+    return corpus
+
+
+def bench(extractor, corpus, repeat):
+    timings = {}
+    for name, html in corpus.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            extractor.extract(html, "https://jobs.example.com/1")
+        timings[name] = (time.perf_counter() - start) / repeat
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    reference = SoupExtractor()
+    expected = {name: reference.extract(html, "https://jobs.example.com/1") for name, html in corpus.items()}
+
+    results = {}
+    for backend, cls in EXTRACTORS.items():
+        extractor = cls()
+        mismatches = [name for name, html in corpus.items() if extractor.extract(html, "https://jobs.example.com/1") != expected[name]]
+        results[backend] = bench(extractor, corpus, args.repeat)
+        print(f"{backend}: parity {len(corpus) - len(mismatches)}/{len(corpus)}" + (f"  MISMATCH: {mismatches}" if mismatches else ""))
+
+    print()
+    print(f"{'page':<42} {'size':>9} " + " ".join(f"{b + ' ms':>10}" for b in results))
+    for name, html in corpus.items():
+        row = " ".join(f"{results[b][name] * 1000:>10.2f}" for b in results)
+        print(f"{name:<42} {len(html):>9} {row}")
+
+    print()
+    for backend, timings in results.items():
+        total = sum(timings.values())
+        speedup = sum(results["bs4"].values()) / total
+        print(f"{backend}: total {total * 1000:.1f} ms per corpus pass ({speedup:.1f}x vs bs4)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Lookup latency of the near-duplicate posting index.
+
+    python -m benchmarks.bench_near_dupes [--n 100000] [--probes 1000] [--disk]
+
+Fills a NearDuplicateIndex with n synthetic postings, then times find() for
+near copies (a few words reworded, a recruiter footer added) and for unrelated
+postings, and reports recall / false positives. --disk also times persisting
+and reloading the index from SQLite.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.tools.near_dupes import NearDuplicateIndex, minhash, posting_text
+
+VOCAB = [f"w{i}" for i in range(5000)]
+WEIGHTS = 1.0 / np.arange(1, len(VOCAB) + 1)  # zipf-ish like real text
+WEIGHTS /= WEIGHTS.sum()
+
+
+def make_postings(rng: np.random.Generator, count: int, words: int = 300):
+    drawn = rng.choice(len(VOCAB), size=(count, words), p=WEIGHTS)
+    return [" ".join(VOCAB[w] for w in row) for row in drawn]
+
+
+def reword(text: str, rnd: random.Random, fraction: float = 0.03) -> str:
+    words = text.split()
+    for i in rnd.sample(range(len(words)), int(len(words) * fraction)):
+        words[i] = rnd.choice(VOCAB)
+    return " ".join(words) + " Apply now via our recruiting partner."
+
+
+def percentile(values, p):
+    return float(np.percentile(np.array(values) * 1000, p))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--probes", type=int, default=1000)
+    parser.add_argument("--disk", action="store_true")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    rnd = random.Random(7)
+
+    tmpdir = tempfile.mkdtemp() if args.disk else None
+    path = os.path.join(tmpdir, "near_dupes.db") if tmpdir else None
+    index = NearDuplicateIndex(path=path)
+
+    print(f"building {args.n} postings...")
+    texts = [posting_text(f"Role {i % 997}", body) for i, body in enumerate(make_postings(rng, args.n))]
+    start = time.perf_counter()
+    for lo in range(0, args.n, 5000):
+        index.add_many([(f"job-{i}", texts[i]) for i in range(lo, min(args.n, lo + 5000))])
+    build = time.perf_counter() - start
+    print(f"  built in {build:.1f}s ({build / args.n * 1e6:.0f} us / add incl. minhash)")
+
+    sample_every = max(1, args.n // args.probes)
+    samples = {f"job-{i}": texts[i] for i in range(0, args.n, sample_every)}
+    near = [(doc_id, minhash(reword(text, rnd))) for doc_id, text in list(samples.items())[:args.probes]]
+    novel = [minhash(posting_text("Role x", body)) for body in make_postings(rng, args.probes)]
+
+    hits, timings = 0, []
+    for doc_id, sig in near:
+        t = time.perf_counter()
+        match = index.find("", sig)
+        timings.append(time.perf_counter() - t)
+        hits += int(match is not None and match[0] == doc_id)
+
+    false_pos, novel_timings = 0, []
+    for sig in novel:
+        t = time.perf_counter()
+        match = index.find("", sig)
+        novel_timings.append(time.perf_counter() - t)
+        false_pos += int(match is not None)
+
+    print(f"near copies : recall {hits}/{len(near)}  p50 {percentile(timings, 50):.3f} ms  p99 {percentile(timings, 99):.3f} ms")
+    print(f"unrelated   : false positives {false_pos}/{len(novel)}  p50 {percentile(novel_timings, 50):.3f} ms  p99 {percentile(novel_timings, 99):.3f} ms")
+
+    if path:
+        index.close()
+        start = time.perf_counter()
+        reloaded = NearDuplicateIndex(path=path)
+        print(f"reload from disk: {time.perf_counter() - start:.2f}s for {len(reloaded)} postings")
+        reloaded.close()
+
+
+if __name__ == "__main__":
+    main()
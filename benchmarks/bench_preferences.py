@@ -0,0 +1,139 @@
+"""
+Preference boost: the compiled single-pass matcher against the old substring scans.
+
+    python -m benchmarks.bench_preferences [--jobs 2000] [--words 1500]
+
+Scores synthetic postings (preference keywords sprinkled into everyday posting words,
+plus a few words that only contain them: "midnight", "misleading", "remotely") for a
+few users, reports the time per posting for both implementations and how often they disagree.
+Then ranks search results of growing size job by job vs in bulk (rank_by_preferences).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.agents.preference_matcher import LEVEL_KEYWORDS, REMOTE_KEYWORDS, VALUE_KEYWORDS, PreferenceMatcher, rank_by_preferences
+from app.models import JobDescription
+
+# everyday posting vocabulary, plus words that only contain keywords ("midnight", "misleading", "remotely")
+FILLER = """
+we are looking for a software engineer to join our growing platform team you will design build and operate
+services that handle millions of requests per day working closely with product design and data partners
+responsibilities include writing clean tested code reviewing pull requests mentoring teammates improving
+reliability and observability owning features end to end from proposal through rollout and monitoring
+requirements years of experience with python java go or typescript cloud infrastructure databases sql apis
+strong communication skills ability to break down ambiguous problems bachelor degree in computer science or
+equivalent practical experience nice to have kubernetes terraform kafka spark machine learning pipelines
+about us founded in our customers include retailers banks hospitals and governments across regions
+""".split()
+TRAPS = "midnight misleading remotely leadership stability learnings impactful insecurity establishment".split()
+KEYWORDS = [k for ks in LEVEL_KEYWORDS.values() for k in ks] + REMOTE_KEYWORDS + [k for ks in VALUE_KEYWORDS.values() for k in ks]
+USERS = [
+    {"user_id": "u1", "values": ["Work-Life Balance", "Career Growth"], "field": "Data", "subfield": "Data Engineering",
+     "specialization": "Streaming", "locations": ["Austin", "Remote"], "remote_preference": True, "role_level": "Mid-Level"},
+    {"user_id": "u2", "values": ["Job Security", "Making Impact", "Benefits & Perks"], "field": "Software", "subfield": "Backend",
+     "specialization": "Payments", "locations": ["New York"], "remote_preference": False, "role_level": "Senior"},
+    {"user_id": "u3", "values": ["Flexibility"], "field": "AI", "subfield": "ML", "specialization": "NLP",
+     "locations": ["Berlin", "London"], "remote_preference": True, "role_level": "Lead/Principal"},
+]
+
+
+def legacy_boost(job_description: JobDescription, preferences: dict) -> dict:
+    """calculate_preference_boost before the compiled matcher: one substring scan per keyword"""
+    boost, insights, warnings = 0, [], []
+    job_text = job_description.raw_text.lower()
+    job_title = job_description.title.lower()
+    job_location = job_description.location.lower() if job_description.location else ""
+    for key, points in (("field", 3), ("subfield", 3), ("specialization", 2)):
+        value = preferences.get(key, "").lower()
+        if value and value in job_text:
+            boost += points
+            insights.append(key)
+    location_matched = False
+    for loc in [loc.lower() for loc in preferences.get("locations", [])]:
+        if loc in job_location or loc in job_text:
+            boost += 3
+            insights.append(loc)
+            location_matched = True
+            break
+    remote_preference = preferences.get("remote_preference", False)
+    is_remote_job = any(keyword in job_text for keyword in REMOTE_KEYWORDS)
+    if remote_preference and is_remote_job:
+        boost += 2
+    elif remote_preference and not is_remote_job and not location_matched:
+        warnings.append("on-site")
+    role_level = preferences.get("role_level", "").lower()
+    if role_level in LEVEL_KEYWORDS:
+        if any(keyword in job_title or keyword in job_text for keyword in LEVEL_KEYWORDS[role_level]):
+            boost += 4
+        else:
+            for level, kws in LEVEL_KEYWORDS.items():
+                if level != role_level and any(kw in job_title for kw in kws):
+                    warnings.append(level)
+                    break
+    values_matched = sum(
+        1 for value in (v.lower() for v in preferences.get("values", []))
+        if value in VALUE_KEYWORDS and any(keyword in job_text for keyword in VALUE_KEYWORDS[value])
+    )
+    boost += min(3, values_matched)
+    return {"preference_boost": min(20, boost), "preference_warnings": warnings}
+
+
+def make_jobs(rnd: random.Random, count: int, words: int):
+    jobs = []
+    for i in range(count):
+        body = [rnd.choice(FILLER) for _ in range(words)]
+        for _ in range(rnd.randint(0, 6)):
+            body.insert(rnd.randrange(len(body)), rnd.choice(KEYWORDS))
+        for _ in range(rnd.randint(0, 3)):
+            body.insert(rnd.randrange(len(body)), rnd.choice(TRAPS))
+        jobs.append(JobDescription(title=rnd.choice(["Data Engineer", "Senior Backend Engineer", "ML Lead", "Engineer"]),
+                                   company="Acme", location=rnd.choice(["Austin, TX", "Berlin", "New York, NY"]),
+                                   raw_text=" ".join(body)))
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=1500)
+    args = parser.parse_args()
+
+    jobs = make_jobs(random.Random(7), args.jobs, args.words)
+    matcher = PreferenceMatcher()
+
+    start = time.perf_counter()
+    old = [legacy_boost(job, prefs) for prefs in USERS for job in jobs]
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new = [matcher.calculate_preference_boost(job, prefs) for prefs in USERS for job in jobs]
+    compiled = time.perf_counter() - start
+
+    scored = len(old)
+    differ = sum(1 for a, b in zip(old, new) if a["preference_boost"] != b["preference_boost"])
+    print(f"{scored} postings x {args.words} words")
+    print(f"  substring scans   {legacy / scored * 1e6:8.1f} us / posting")
+    print(f"  compiled matcher  {compiled / scored * 1e6:8.1f} us / posting")
+    print(f"  boosts differing  {differ} ({differ / scored:.0%}), from keywords inside other words (\"lead\" in \"leadership\")")
+
+    print("ranking search results (ms)   per job      bulk")
+    for limit in (10, 100, 500):
+        rows = jobs[:limit]
+        start = time.perf_counter()
+        sorted((matcher.calculate_preference_boost(job, USERS[0])["preference_boost"] for job in rows), reverse=True)
+        per_job = time.perf_counter() - start
+        frame = pd.DataFrame([{"title": j.title, "location": j.location, "description": j.raw_text} for j in rows])
+        start = time.perf_counter()
+        rank_by_preferences(frame, USERS[0])
+        bulk = time.perf_counter() - start
+        print(f"  {limit:4d} results               {per_job * 1e3:7.1f}   {bulk * 1e3:7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Speed of the local TF-IDF pre-ranker on a large set of postings.
+
+    python -m benchmarks.bench_prerank [--n 10000] [--relevant 50] [--repeat 5]
+
+Builds n synthetic postings (a few skills from a shared pool plus zipf-ish filler
+text) with `relevant` of them written around the resume's skills, then times
+tokenizing + building the sparse matrix, scoring and gating, and reports how many
+of the planted relevant postings land in the top `relevant`.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.tools.prerank import TfidfRanker, select_for_llm
+
+SKILLS = [f"skill{i}" for i in range(400)]
+FILLER = [f"word{i}" for i in range(5000)]
+FILLER_WEIGHTS = 1.0 / np.arange(1, len(FILLER) + 1)
+FILLER_WEIGHTS /= FILLER_WEIGHTS.sum()
+
+
+def make_posting(rng: np.random.Generator, skills, words: int = 250) -> str:
+    filler = rng.choice(len(FILLER), size=words, p=FILLER_WEIGHTS)
+    parts = [FILLER[w] for w in filler] + list(skills)
+    rng.shuffle(parts)
+    return "Senior Engineer\n" + " ".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=10_000)
+    parser.add_argument("--relevant", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    resume_skills = list(rng.choice(SKILLS, size=12, replace=False))
+    resume = "Experienced engineer. " + " ".join(resume_skills * 2)
+
+    postings = []
+    relevant = set(rng.choice(args.n, size=args.relevant, replace=False).tolist())
+    for i in range(args.n):
+        if i in relevant:
+            skills = list(rng.choice(resume_skills, size=8, replace=False)) + list(rng.choice(SKILLS, size=2))
+        else:
+            skills = list(rng.choice(SKILLS, size=10))
+        postings.append(make_posting(rng, skills))
+
+    build, score, gate = [], [], []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        ranker = TfidfRanker(postings, resume)
+        build.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        similarity = ranker.similarities()
+        coverage = ranker.coverage()
+        score.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        mask = select_for_llm(similarity, top_n=args.relevant)
+        gate.append(time.perf_counter() - start)
+
+    found = len(relevant & set(np.nonzero(mask)[0].tolist()))
+    print(f"postings: {args.n}, vocabulary: {len(ranker.terms)}, nonzeros: {ranker.matrix.nnz}")
+    print(f"tokenize + build matrix: {np.median(build) * 1000:.1f} ms")
+    print(f"similarity + coverage:   {np.median(score) * 1000:.2f} ms")
+    print(f"top-{args.relevant} gate:            {np.median(gate) * 1000:.2f} ms")
+    print(f"planted relevant postings in top {args.relevant}: {found}/{args.relevant}")
+    print(f"LLM calls avoided: {args.n - int(mask.sum())}/{args.n}")
+    print(f"coverage of relevant vs other postings: {coverage[list(relevant)].mean():.2f} vs {np.delete(coverage, list(relevant)).mean():.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Saving analyses one commit each vs through the write-behind queue.
+
+    python -m benchmarks.bench_write_behind [--analyses 2000] [--concurrency 64] [--synchronous FULL]
+
+`concurrency` tasks save `analyses` applications between them against a temporary
+SQLite file (WAL, `synchronous` as given). Reports how long a request waits for its
+save and the overall throughput: one add_application + refresh per analysis (how the
+endpoints used to save), the queue with requests waiting for the commit, and the queue
+returning right away.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+from app.tools.write_behind import WriteBehindQueue
+
+
+def add_application_refreshed(job_title, company, score, url, user_id=None):
+    db = database.SessionLocal()
+    try:
+        new_app = database.JobApplicationTable(job_title=job_title, company=company, match_score=score, url=url, user_id=user_id)
+        db.add(new_app)
+        db.commit()
+        db.refresh(new_app)
+        return new_app
+    finally:
+        db.close()
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+async def run(mode: str, args) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = database.make_engine(f"sqlite:///{path}", dict(database.SQLITE_PRAGMAS, synchronous=args.synchronous))
+    database.Base.metadata.create_all(bind=engine)
+    database.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    queue = WriteBehindQueue(lambda records: database.run_db_write(database.add_applications, records), durable=mode == "durable")
+    await queue.start()
+
+    waits = []
+    todo = iter(range(args.analyses))
+
+    async def worker():
+        for i in todo:
+            record = {"job_title": f"Engineer {i}", "company": "Acme", "score": i % 100, "url": f"https://jobs/{i}"}
+            start = time.perf_counter()
+            if mode == "per row":
+                await database.run_db_write(add_application_refreshed, **record)
+            else:
+                await queue.submit([record])
+            waits.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    await queue.close()
+    elapsed = time.perf_counter() - start
+    saved = len(database.get_all_applications())
+    engine.dispose()
+    return {"wait_p50": percentile(waits, 0.5), "wait_p99": percentile(waits, 0.99), "per_s": saved / elapsed,
+            "saved": saved, "groups": queue.stats()["groups"]}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--analyses", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--synchronous", default="FULL")
+    args = parser.parse_args()
+
+    print(f"{args.analyses} analyses, {args.concurrency} concurrent, synchronous={args.synchronous}")
+    print(f"{'':22s} {'wait p50':>9s} {'wait p99':>9s} {'saved/s':>8s} {'commits':>8s}")
+    for label, mode in (("commit per analysis", "per row"), ("queue, durable", "durable"), ("queue, write-behind", "behind")):
+        r = asyncio.run(run(mode, args))
+        commits = r["saved"] if mode == "per row" else r["groups"]
+        print(f"  {label:20s} {r['wait_p50'] * 1e3:7.2f}ms {r['wait_p99'] * 1e3:7.2f}ms {r['per_s']:8.0f} {commits:8d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,632 @@
+import asyncio
+import hashlib
+import json
 import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+import openai
 from openai import AsyncOpenAI
 from dotenv import load_dotenv
 
+from app.tools.disk_cache import DiskTier
+from app.tools.resilience import CircuitBreaker, LatencyTracker, TokenBucket, backoff_delay, retry_after_seconds
+
 load_dotenv()
 
-class AIClient:
-    def __init__(self):
+LLM_MODEL = os.getenv("LLM_MODEL", "nvidia/nemotron-3-nano-30b-a3b:free")
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://openrouter.ai/api/v1")
+
+# --- Response Cache Config (override via env) ---
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") not in ("0", "false", "False")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join("./.data", "llm_cache.db"))
+LLM_CACHE_MEMORY_BYTES = int(os.getenv("LLM_CACHE_MEMORY_BYTES", str(16 * 1024 * 1024)))
+LLM_CACHE_DISK_BYTES = int(os.getenv("LLM_CACHE_DISK_BYTES", str(256 * 1024 * 1024)))
+LLM_CACHE_TOUCH_INTERVAL = float(os.getenv("LLM_CACHE_TOUCH_INTERVAL", "600"))  # seconds before a disk hit rewrites accessed_at
+# seconds a cached completion is served, per calling agent
+LLM_CACHE_TTLS = {
+    "scoring": 7 * 24 * 3600,
+    "preferences": 7 * 24 * 3600,
+    "answer": 24 * 3600,
+    "default": 24 * 3600,
+}
+
+# --- Resilience Config (override via env) ---
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60.0"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_RPM = float(os.getenv("LLM_RPM", "20"))  # openrouter free models allow 20 requests / minute
+LLM_RPM_BURST = float(os.getenv("LLM_RPM_BURST", "5"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30.0"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))  # consecutive failures that open the circuit
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30.0"))  # seconds before a trial request
+
+# --- Routing Config (override via env) ---
+# JSON list of OpenAI-compatible endpoints, e.g.
+# [{"name": "cheap", "model": "...", "tasks": ["preferences"]},
+#  {"name": "strong", "model": "...", "base_url": "https://...", "api_key_env": "OTHER_KEY", "tasks": ["scoring", "answer"]}]
+# empty = the single LLM_BASE_URL / LLM_MODEL endpoint
+LLM_ENDPOINTS = json.loads(os.getenv("LLM_ENDPOINTS") or "[]")
+LLM_HEDGE_TASKS = {t.strip() for t in os.getenv("LLM_HEDGE_TASKS", "").split(",") if t.strip()}  # agents whose calls get hedged
+LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "3.0"))  # hedge after this until the endpoint has a p95
+
+
+def cache_key(model: str, system_prompt: str, prompt: str, temperature: float) -> str:
+    """Content address of one completion request."""
+    payload = json.dumps([model, system_prompt, prompt, temperature], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Two tier completion cache: a byte bounded in-memory LRU in front of a byte bounded
+    SQLite file (a DiskTier). Entries carry the TTL of the agent that made them.
+    get/put block on the file, async code uses aget/aput.
+    """
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        memory_bytes: int = LLM_CACHE_MEMORY_BYTES,
+        disk_bytes: int = LLM_CACHE_DISK_BYTES,
+        ttls: Optional[Dict[str, float]] = None,
+        touch_interval: float = LLM_CACHE_TOUCH_INTERVAL,
+    ):
+        self.memory_bytes = memory_bytes
+        self.ttls = dict(LLM_CACHE_TTLS, **(ttls or {}))
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (response, expires_at)
+        self._memory_used = 0
+        self._lock = threading.Lock()  # memory tier + counters, never held during disk i/o
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "bypassed": 0, "stores": 0, "evictions": 0}
+        self._disk = DiskTier(
+            path, "llm_cache", {"agent": "TEXT", "response": "TEXT NOT NULL", "size": "INTEGER NOT NULL"},
+            touch_interval=touch_interval, max_bytes=disk_bytes, size_column="size",
+        )
+
+    def ttl_for(self, agent: str) -> float:
+        return self.ttls.get(agent, self.ttls["default"])
+
+    def get(self, key: str) -> Optional[str]:
+        hit = self._get_memory(key)
+        return hit if hit is not None else self._get_disk(key)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """get() without blocking the event loop: memory hits right away, the disk lookup on a thread"""
+        hit = self._get_memory(key)
+        return hit if hit is not None else await asyncio.to_thread(self._get_disk, key)
+
+    def put(self, key: str, response: str, agent: str = "default"):
+        if is_cacheable(response):
+            self._put_disk(key, response, agent, self._put_memory(key, response, agent))
+
+    async def aput(self, key: str, response: str, agent: str = "default"):
+        """put() without blocking the event loop, the memory copy is there before the disk write"""
+        if is_cacheable(response):
+            await asyncio.to_thread(self._put_disk, key, response, agent, self._put_memory(key, response, agent))
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self.counters)
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+            stats["hit_ratio"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+            stats["memory_entries"] = len(self._memory)
+            stats["memory_bytes"] = self._memory_used
+            stats["disk_bytes"] = self._disk.used_bytes
+            return stats
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_used = 0
+        self._disk.clear()
+
+    def close(self):
+        self._disk.close()
+
+    # --- internals ---
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                if hit[1] > time.time():
+                    self._memory.move_to_end(key)
+                    self.counters["memory_hits"] += 1
+                    return hit[0]
+                self._forget(key)
+            return None
+
+    def _get_disk(self, key: str) -> Optional[str]:
+        row = self._disk.get(key)  # (agent, response, size, expires_at)
+        with self._lock:
+            if row and row[3] > time.time():
+                self._remember(key, row[1], row[3])
+                self.counters["disk_hits"] += 1
+                return row[1]
+            self.counters["misses"] += 1
+            return None
+
+    def _put_memory(self, key: str, response: str, agent: str) -> float:
+        expires_at = time.time() + self.ttl_for(agent)
+        with self._lock:
+            self._remember(key, response, expires_at)
+            self.counters["stores"] += 1
+        return expires_at
+
+    def _put_disk(self, key: str, response: str, agent: str, expires_at: float):
+        evicted = self._disk.put(key, (agent, response, len(response.encode("utf-8"))), expires_at)
+        if evicted:
+            with self._lock:
+                self.counters["evictions"] += evicted
+
+    # memory tier, caller holds _lock
+
+    def _remember(self, key: str, response: str, expires_at: float):
+        self._forget(key)
+        self._memory[key] = (response, expires_at)
+        self._memory_used += len(response)
+        while self._memory_used > self.memory_bytes and len(self._memory) > 1:
+            old_key, _ = next(iter(self._memory.items()))
+            self._forget(old_key)
+            self.counters["evictions"] += 1
+
+    def _forget(self, key: str):
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_used -= len(old[0])
+
+
+def is_cacheable(response) -> bool:
+    """Only real completions are cached, never empty replies."""
+    return isinstance(response, str) and bool(response.strip())
+
+
+class LLMError(Exception):
+    """Base of every failure talking to the model provider. Endpoints turn it into `status_code`."""
+    status_code = 502
+    retryable = False
+    endpoint = None  # the LLMEndpoint that failed, when there was one
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LLMRateLimitError(LLMError):
+    status_code = 503
+    retryable = True
+
+
+class LLMTimeoutError(LLMError):
+    status_code = 504
+    retryable = True
+
+
+class LLMUnavailableError(LLMError):
+    """5xx or the connection failed"""
+    status_code = 503
+    retryable = True
+
+
+class LLMCircuitOpenError(LLMError):
+    """Provider marked down, the call was refused without touching the network"""
+    status_code = 503
+
+
+class LLMResponseError(LLMError):
+    """Provider rejected the request (4xx) or sent back nothing usable"""
+    status_code = 502
+
+
+def llm_error(e: Exception) -> LLMError:
+    """Maps openai / transport exceptions onto the typed errors above."""
+    if isinstance(e, LLMError):
+        return e
+    retry_after = None
+    response = getattr(e, "response", None)
+    if response is not None:
+        retry_after = retry_after_seconds(response.headers.get("retry-after"))
+    if isinstance(e, openai.APITimeoutError):
+        return LLMTimeoutError("LLM request timed out.")
+    if isinstance(e, openai.RateLimitError):
+        return LLMRateLimitError("LLM provider is rate limiting us.", retry_after)
+    if isinstance(e, openai.APIConnectionError):
+        return LLMUnavailableError(f"Could not reach the LLM provider: {e}")
+    if isinstance(e, openai.APIStatusError):
+        if e.status_code >= 500:
+            return LLMUnavailableError(f"LLM provider error {e.status_code}.", retry_after)
+        return LLMResponseError(f"LLM provider rejected the request ({e.status_code}): {e.message}")
+    return LLMResponseError(f"Unexpected LLM response: {e}")
+
+
+class LLMEndpoint:
+    """
+    One OpenAI-compatible endpoint + model: its own client, requests-per-minute bucket,
+    circuit breaker and moving latency / error estimate. `tasks` limits which agents
+    it serves (None = any).
+    """
+
+    def __init__(
+        self,
+        model: str,
+        base_url: str = LLM_BASE_URL,
+        api_key: Optional[str] = None,
+        name: Optional[str] = None,
+        tasks: Optional[Iterable[str]] = None,
+        rpm: float = LLM_RPM,
+        burst: float = LLM_RPM_BURST,
+        timeout: float = LLM_TIMEOUT,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.name = name or model
+        self.model = model
+        self.tasks = set(tasks) if tasks else None
         self.client = AsyncOpenAI(
-            api_key=os.getenv("OPENROUTER_API_KEY"),
-            base_url="https://openrouter.ai/api/v1",
+            api_key=api_key or os.getenv("OPENROUTER_API_KEY"),
+            base_url=base_url,
+            timeout=timeout,
+            max_retries=0,  # retries are AIClient's, see _after_failure
+        )
+        self.bucket = TokenBucket(rpm / 60.0, burst)
+        self.breaker = breaker or CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_RESET)
+        self.latency = LatencyTracker()
+        self.in_flight = 0
+        self.counters = {"requests": 0, "errors": 0}
+
+    def cost(self) -> float:
+        return self.latency.cost(self.in_flight)
+
+    def record_success(self, seconds: Optional[float]):
+        self.latency.record(seconds, ok=True)
+        self.breaker.record_success()
+
+    def record_failure(self, error: LLMError, seconds: Optional[float]):
+        self.counters["errors"] += 1
+        # a timeout is a (lower bound) latency sample, other failures say nothing about speed
+        self.latency.record(seconds if isinstance(error, LLMTimeoutError) else None, ok=False)
+        if error.retryable:
+            self.breaker.record_failure()
+        else:
+            # the provider answered, it is up
+            self.breaker.record_success()
+
+    def stats(self) -> dict:
+        return dict(self.counters, model=self.model, in_flight=self.in_flight, breaker=self.breaker.stats(), **self.latency.stats())
+
+
+class AIClient:
+    """
+    OpenAI-compatible chat client (OpenRouter by default) over one or more endpoints.
+    Each agent ("scoring", "preferences", ...) is routed to the endpoint of its route
+    with the lowest moving latency / error estimate whose circuit isn't open.
+    Every request waits for a concurrency slot and the endpoint's requests-per-minute
+    token, retryable failures (429, 5xx, timeouts, connection errors) are retried with
+    jittered exponential backoff, preferably on another endpoint. Agents in
+    `hedge_tasks` send a duplicate request once the first one is slower than the
+    endpoint's p95 and take whichever answers first. Failures raise LLMError subclasses.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        model: Optional[str] = None,
+        cache: Optional[LLMCache] = None,
+        use_cache: bool = LLM_CACHE_ENABLED,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        rpm: float = LLM_RPM,
+        burst: float = LLM_RPM_BURST,
+        max_retries: int = LLM_MAX_RETRIES,
+        backoff_base: float = LLM_BACKOFF_BASE,
+        backoff_max: float = LLM_BACKOFF_MAX,
+        timeout: float = LLM_TIMEOUT,
+        breaker: Optional[CircuitBreaker] = None,
+        endpoints: Optional[List[dict]] = None,
+        hedge_tasks: Iterable[str] = LLM_HEDGE_TASKS,
+        hedge_delay: float = LLM_HEDGE_DELAY,
+    ):
+        """
+        endpoints: dicts like LLM_ENDPOINTS entries ({"model", "base_url", "name", "tasks",
+        "api_key_env", "rpm", "burst"}). Without them (or an explicit base_url / model)
+        it is the single LLM_BASE_URL / LLM_MODEL endpoint.
+        `breaker` is used for the first endpoint, the others get their own.
+        """
+        if endpoints is None:
+            endpoints = LLM_ENDPOINTS if LLM_ENDPOINTS and base_url is None and model is None else [{}]
+        self.endpoints: List[LLMEndpoint] = []
+        for i, config in enumerate(endpoints):
+            key = os.getenv(config["api_key_env"]) if config.get("api_key_env") else api_key
+            self.endpoints.append(LLMEndpoint(
+                model=config.get("model") or model or LLM_MODEL,
+                base_url=config.get("base_url") or base_url or LLM_BASE_URL,
+                api_key=key,
+                name=config.get("name"),
+                tasks=config.get("tasks"),
+                rpm=config.get("rpm", rpm),
+                burst=config.get("burst", burst),
+                timeout=timeout,
+                breaker=breaker if i == 0 else None,
+            ))
+        # the first endpoint is the default one
+        self.client = self.endpoints[0].client
+        self.model = self.endpoints[0].model
+        self.temperature = 0.1
+        self.cache = cache if cache is not None else (LLMCache() if use_cache else None)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_tasks = set(hedge_tasks)
+        self.hedge_delay = hedge_delay
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.counters = {"requests": 0, "retries": 0, "errors": 0, "rate_limited": 0, "wait_seconds": 0.0, "hedged": 0, "hedge_wins": 0}
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self.endpoints[0].breaker
+
+    def route(self, agent: str) -> List[LLMEndpoint]:
+        """Endpoints configured for this agent, else the ones serving any agent, else all."""
+        return (
+            [e for e in self.endpoints if e.tasks and agent in e.tasks]
+            or [e for e in self.endpoints if e.tasks is None]
+            or self.endpoints
         )
 
-    async def chat(self, prompt: str, system_prompt: str = "You are a professional career assistant."):
+    async def chat(self, prompt: str, system_prompt: str = "You are a professional career assistant.", agent: str = "default", bypass_cache: bool = False, hedge: Optional[bool] = None) -> str:
+        """
+        One completion. Identical requests are served from the cache (TTL per `agent`),
+        bypass_cache=True always asks the model and refreshes the cached copy.
+        hedge overrides whether this call may send a hedged duplicate (default: agent in hedge_tasks).
+        Raises LLMError when the model can't be reached.
+        """
+        route = self.route(agent)
+        key = None
+        if self.cache is not None:
+            key = cache_key(self._route_model(route), system_prompt, prompt, self.temperature)
+            if bypass_cache:
+                self.cache.counters["bypassed"] += 1
+            else:
+                cached = await self.cache.aget(key)
+                if cached is not None:
+                    return cached
+
+        if hedge is None:
+            hedge = agent in self.hedge_tasks
+        attempt = 0
+        failed = None
+        skip = set()  # endpoints whose half open trial another call took
+        while True:
+            try:
+                if hedge:
+                    content = await self._hedged_attempt(route, prompt, system_prompt, failed, skip)
+                else:
+                    content = await self._attempt(self._pick(route, failed, skip), prompt, system_prompt)
+                break
+            except LLMCircuitOpenError as error:
+                if error.endpoint is None:
+                    raise  # from _pick, every endpoint is open
+                skip.add(error.endpoint)
+                continue
+            except LLMError as error:
+                failed = error.endpoint
+                await asyncio.sleep(self._after_failure(error, attempt, route))
+            attempt += 1
+
+        if key is not None:
+            await self.cache.aput(key, content, agent)
+        return content
+
+    async def chat_stream(self, prompt: str, system_prompt: str = "You are a professional career assistant.", agent: str = "default", bypass_cache: bool = False) -> AsyncIterator[str]:
+        """
+        Same as chat() but yields the completion as it is generated (never hedged).
+        A cached completion comes out as one chunk. Failures before the first token
+        are retried like chat(), a failure mid-stream raises LLMError.
+        Only complete streams are cached.
+        """
+        route = self.route(agent)
+        key = None
+        if self.cache is not None:
+            key = cache_key(self._route_model(route), system_prompt, prompt, self.temperature)
+            if bypass_cache:
+                self.cache.counters["bypassed"] += 1
+            else:
+                cached = await self.cache.aget(key)
+                if cached is not None:
+                    yield cached
+                    return
+
+        attempt = 0
+        parts = []
+        failed = None
+        skip = set()
+        while True:
+            endpoint = self._pick(route, failed, skip)
+            self.counters["wait_seconds"] += await endpoint.bucket.acquire()
+            try:
+                async with self._slot(endpoint), self._admit(endpoint):
+                    start = time.monotonic()
+                    try:
+                        stream = await endpoint.client.chat.completions.create(**self._request(endpoint.model, prompt, system_prompt), stream=True)
+                        async for chunk in stream:
+                            if not chunk.choices:
+                                continue
+                            delta = chunk.choices[0].delta.content
+                            if delta:
+                                parts.append(delta)
+                                yield delta
+                    except Exception as e:
+                        error = llm_error(e)
+                        error.endpoint = endpoint
+                        endpoint.record_failure(error, time.monotonic() - start)
+                    else:
+                        # whole-stream time isn't comparable with chat() latencies, only the verdict counts
+                        endpoint.record_success(None)
+                        break
+            except LLMCircuitOpenError:
+                # lost its half open trial to another call while waiting, the body never raises it
+                skip.add(endpoint)
+                continue
+            if parts:
+                # tokens already went out, a retry would repeat them
+                self._after_failure(error, self.max_retries, route)
+            failed = endpoint
+            await asyncio.sleep(self._after_failure(error, attempt, route))
+            attempt += 1
+
+        if key is not None:
+            await self.cache.aput(key, "".join(parts), agent)
+
+    def stats(self) -> dict:
+        return dict(
+            self.counters,
+            in_flight=self.in_flight,
+            breaker=self.breaker.stats(),
+            endpoints={e.name: e.stats() for e in self.endpoints},
+        )
+
+    # --- internals ---
+
+    def _route_model(self, route: List[LLMEndpoint]) -> str:
+        """Cache identity of a route: any of its models may answer."""
+        return ",".join(e.model for e in route)
+
+    def _pick(self, route: List[LLMEndpoint], avoid: Optional[LLMEndpoint] = None, skip=()) -> LLMEndpoint:
+        """
+        Cheapest endpoint whose circuit lets a request through, `avoid` (just failed) last,
+        never one in `skip`. Doesn't take a half open trial yet, _admit does right before the request.
+        """
+        ordered = sorted((e for e in route if e not in skip), key=lambda e: (e is avoid, e.cost()))
+        for endpoint in ordered:
+            if endpoint.breaker.available():
+                return endpoint
+        retry_in = min(e.breaker.retry_in() for e in route)
+        raise LLMCircuitOpenError(f"LLM provider is unavailable, retrying in {retry_in:.0f}s.", retry_after=retry_in)
+
+    async def _attempt(self, endpoint: LLMEndpoint, prompt: str, system_prompt: str, admitted: bool = False) -> str:
+        """One request to one endpoint, books latency / errors on it. Raises LLMError (with .endpoint set)."""
+        if not admitted:
+            self.counters["wait_seconds"] += await endpoint.bucket.acquire()
+        async with self._slot(endpoint), self._admit(endpoint):
+            start = time.monotonic()
+            try:
+                response = await endpoint.client.chat.completions.create(**self._request(endpoint.model, prompt, system_prompt))
+                content = response.choices[0].message.content
+                if not content:
+                    raise LLMResponseError("LLM returned an empty completion.")
+            except asyncio.CancelledError:
+                # lost a hedge race: at least this slow, no verdict for the breaker (_admit frees a trial)
+                endpoint.latency.record(time.monotonic() - start)
+                raise
+            except Exception as e:
+                error = llm_error(e)
+                error.endpoint = endpoint
+                endpoint.record_failure(error, time.monotonic() - start)
+                raise error
+            endpoint.record_success(time.monotonic() - start)
+            return content
+
+    async def _hedged_attempt(self, route: List[LLMEndpoint], prompt: str, system_prompt: str, avoid: Optional[LLMEndpoint] = None, skip=()) -> str:
+        """
+        _attempt, plus a duplicate on the next best endpoint when the first one is still
+        running after its p95 latency (hedge_delay until it has enough samples).
+        The duplicate is only sent if a rate limit token is free right away.
+        First success wins, the other request is cancelled.
+        """
+        primary_endpoint = self._pick(route, avoid, skip)
+        primary = asyncio.ensure_future(self._attempt(primary_endpoint, prompt, system_prompt))
+        tasks = [primary]
         try:
-            response = await self.client.chat.completions.create(
-                model="nvidia/nemotron-3-nano-30b-a3b:free",
-                extra_headers={
-                    "HTTP-Referer": "http://localhost:8000", 
-                    "X-Title": "AI Job Assistant",          
-                },
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.1,
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            return f"OpenRouter Error: {str(e)}"
\ No newline at end of file
+            delay = primary_endpoint.latency.percentile(0.95) or self.hedge_delay
+            done, _ = await asyncio.wait([primary], timeout=delay)
+            if done:
+                return primary.result()
+
+            others = [e for e in route if e is not primary_endpoint and e not in skip] or [primary_endpoint]
+            backup = min(others, key=lambda e: e.cost())
+            if not backup.breaker.available() or not backup.bucket.try_acquire():
+                return await primary
+            self.counters["hedged"] += 1
+            tasks.append(asyncio.ensure_future(self._attempt(backup, prompt, system_prompt, admitted=True)))
+
+            first_error = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.counters["hedge_wins"] += 1
+                        return task.result()
+                    first_error = first_error or task.exception()
+            raise first_error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            # the loser releases its slot before we return
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @asynccontextmanager
+    async def _slot(self, endpoint: LLMEndpoint):
+        async with self._semaphore:
+            self.in_flight += 1
+            endpoint.in_flight += 1
+            self.counters["requests"] += 1
+            endpoint.counters["requests"] += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+                endpoint.in_flight -= 1
+
+    @asynccontextmanager
+    async def _admit(self, endpoint: LLMEndpoint):
+        """
+        Takes the breaker's go ahead right before the request, after the rate limit and
+        slot waits. A half open trial that ends without record_* (cancelled while running,
+        stream closed by the client) is given back so the next call can try.
+        """
+        trial = endpoint.breaker.state == "half_open"
+        if not endpoint.breaker.allow():
+            # another call took the trial while this one waited
+            retry_in = endpoint.breaker.retry_in()
+            error = LLMCircuitOpenError(f"LLM provider is unavailable, retrying in {retry_in:.0f}s.", retry_after=retry_in)
+            error.endpoint = endpoint
+            raise error
+        try:
+            yield
+        finally:
+            if trial:
+                # no-op after a verdict, record_* already ended the trial
+                endpoint.breaker.abandon()
+
+    def _after_failure(self, error: LLMError, attempt: int, route: List[LLMEndpoint]) -> float:
+        """Books the failure, raises it when it can't be retried, else returns the backoff delay."""
+        self.counters["errors"] += 1
+        if isinstance(error, LLMRateLimitError):
+            self.counters["rate_limited"] += 1
+        if not error.retryable or attempt >= self.max_retries or all(e.breaker.state == "open" for e in route):
+            raise error
+        self.counters["retries"] += 1
+        if any(e is not error.endpoint and e.breaker.state != "open" for e in route):
+            # another endpoint can take it right away
+            return 0.0
+        return backoff_delay(attempt, self.backoff_base, self.backoff_max, error.retry_after)
+
+    def _request(self, model: str, prompt: str, system_prompt: str) -> dict:
+        return dict(
+            model=model,
+            extra_headers={
+                "HTTP-Referer": "http://localhost:8000",
+                "X-Title": "AI Job Assistant",
+            },
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=self.temperature,
+        )
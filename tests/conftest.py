@@ -0,0 +1,196 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# tests never touch ./.data: every sqlite file the app opens at import goes to a throwaway dir
+TEST_DATA_DIR = tempfile.mkdtemp(prefix="job-assistant-tests-")
+for name, filename in (("DB_PATH", "job_assistant.db"), ("SCRAPE_CACHE_PATH", "scrape_cache.db"),
+                       ("NEAR_DUPES_PATH", "near_dupes.db"), ("LLM_CACHE_PATH", "llm_cache.db")):
+    os.environ[name] = os.path.join(TEST_DATA_DIR, filename)
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import database
+
+
+@pytest.fixture(autouse=True)
+def memory_db(monkeypatch):
+    """app.database on a private in-memory SQLite, for every test"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    database.Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    return engine
+
+
+class StubJobBoard:
+    """
+    Tiny local job board for scraper tests.
+    Tracks concurrent requests per Host header and can answer the first
+    `throttle_first` requests with 429 + Retry-After like a real board does.
+    """
+
+    def __init__(self, delay: float = 0.0, throttle_first: int = 0, retry_after: str = "0.2"):
+        self.delay = delay
+        self.throttle_first = throttle_first
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.requests = []  # (host, path, monotonic time, status)
+        self.active = {}
+        self.max_active = {}
+        self.max_active_total = 0
+
+    def handle(self, handler: BaseHTTPRequestHandler):
+        host = handler.headers.get("Host", "").split(":")[0]
+        with self.lock:
+            self.active[host] = self.active.get(host, 0) + 1
+            self.max_active[host] = max(self.max_active.get(host, 0), self.active[host])
+            self.max_active_total = max(self.max_active_total, sum(self.active.values()))
+            throttled = len(self.requests) < self.throttle_first
+            self.requests.append((host, handler.path, time.monotonic(), 429 if throttled else 200))
+        try:
+            time.sleep(self.delay)
+            if throttled:
+                handler.send_response(429)
+                handler.send_header("Retry-After", self.retry_after)
+                handler.send_header("Content-Length", "0")
+                handler.end_headers()
+                return
+            body = f"<html><head><title>Job {handler.path}</title></head><body><main>Posting {handler.path}</main></body></html>".encode()
+            handler.send_response(200)
+            handler.send_header("Content-Type", "text/html; charset=utf-8")
+            handler.send_header("Content-Length", str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+        finally:
+            with self.lock:
+                self.active[host] -= 1
+
+
+@pytest.fixture
+def stub_board():
+    """Starts a StubJobBoard on a free port, yields (board, port)."""
+    board = StubJobBoard()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            board.handle(self)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield board, server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+class StubLLM:
+    """
+    Local OpenAI-compatible /chat/completions endpoint.
+    The first len(`failures`) requests get those HTTP statuses (429 comes with
+    Retry-After), every other request gets `reply` after `delay` seconds,
+    as SSE chunks when the request asks for stream=true.
+    """
+
+    def __init__(self, reply: str = "stub reply", delay: float = 0.0, failures=(), retry_after: str = "0"):
+        self.reply = reply
+        self.delay = delay
+        self.failures = list(failures)
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.requests = []  # parsed request bodies
+        self.active = 0
+        self.max_active = 0
+
+    def handle(self, handler: BaseHTTPRequestHandler):
+        body = json.loads(handler.rfile.read(int(handler.headers.get("Content-Length", 0))) or b"{}")
+        with self.lock:
+            index = len(self.requests)
+            self.requests.append(body)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if index < len(self.failures):
+                status = self.failures[index]
+                payload = json.dumps({"error": {"message": f"stub failure {status}", "code": status}}).encode()
+                handler.send_response(status)
+                if status == 429:
+                    handler.send_header("Retry-After", self.retry_after)
+                handler.send_header("Content-Type", "application/json")
+                handler.send_header("Content-Length", str(len(payload)))
+                handler.end_headers()
+                handler.wfile.write(payload)
+                return
+
+            model = body.get("model", "stub")
+            if body.get("stream"):
+                handler.send_response(200)
+                handler.send_header("Content-Type", "text/event-stream")
+                handler.end_headers()
+                for i in range(0, len(self.reply), 4):
+                    chunk = {"id": "stub", "object": "chat.completion.chunk", "created": 0, "model": model,
+                             "choices": [{"index": 0, "delta": {"content": self.reply[i:i + 4]}, "finish_reason": None}]}
+                    handler.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    handler.wfile.flush()
+                handler.wfile.write(b"data: [DONE]\n\n")
+                return
+
+            payload = json.dumps({
+                "id": "stub", "object": "chat.completion", "created": 0, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": self.reply}, "finish_reason": "stop"}],
+            }).encode()
+            handler.send_response(200)
+            handler.send_header("Content-Type", "application/json")
+            handler.send_header("Content-Length", str(len(payload)))
+            handler.end_headers()
+            handler.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client gave up (timeout tests)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def stub_llm_factory():
+    """Starts StubLLMs on free ports, make(**kwargs) returns (stub, base_url)."""
+    servers = []
+
+    def make(**kwargs):
+        stub = StubLLM(**kwargs)
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.0"
+
+            def do_POST(self):
+                stub.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return stub, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    yield make
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def stub_llm(stub_llm_factory):
+    """Starts a StubLLM on a free port, yields (stub, base_url)."""
+    return stub_llm_factory()
@@ -0,0 +1,79 @@
+import asyncio
+import json
+import os
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test-key")
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.models import JobDescription
+from app.tools.near_dupes import NearDuplicateIndex
+
+
+@pytest.fixture
+def client(monkeypatch):
+    saved = []
+
+    async def fake_scrape(url):
+        await asyncio.sleep(0.2 if url.endswith("/slow") else 0)
+        if "dead" in url:
+            return JobDescription(title="Error: Connection Failed", company="System", raw_text="x", url=url)
+        return JobDescription(title=f"Job {url[-4:]}", company="Acme", raw_text="Python SQL", url=url)
+
+    def fake_add_applications(records):
+        saved.append(list(records))
+        return len(records)
+
+    monkeypatch.setattr(main.scraper, "scrape", fake_scrape)
+    monkeypatch.setattr(main, "add_applications", fake_add_applications)
+    monkeypatch.setattr(main.application_writer, "durable", True)  # saved as soon as a response is back
+    monkeypatch.setattr(main, "get_user_preferences", lambda user_id: None)
+    monkeypatch.setattr(main, "dupe_index", NearDuplicateIndex(path=":memory:"))
+    # no llm: ScoringAgent falls back to its mock analysis
+    monkeypatch.setattr(main.scoring_agent, "llm_provider", None)
+    with TestClient(main.app) as c:
+        c.saved = saved
+        yield c
+
+
+def test_batch_streams_ndjson_and_saves_once(client):
+    body = {
+        "resume_text": "Python developer",
+        "jobs": [
+            {"url": "https://jobs.example.com/slow"},
+            {"url": "https://jobs.example.com/fast"},
+            {"url": "https://dead.example.com/gone"},
+            {"job_title": "Data Engineer", "company": "Globex", "job_description": "Spark and SQL"},
+        ],
+    }
+    response = client.post("/api/analyze-batch", json=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines() if line]
+    items, done = lines[:-1], lines[-1]
+    assert done == {"done": True, "total": 4, "saved": 3}
+    # slow job finishes last even though it was first in the list
+    assert items[-1]["index"] == 0
+    assert {i["index"] for i in items} == {0, 1, 2, 3}
+    assert next(i for i in items if i["index"] == 2)["error"] == "Scraping failed."
+    assert next(i for i in items if i["index"] == 3)["result"]["match_score"] == 75
+
+    assert len(client.saved) == 1
+    assert sorted(r["url"] for r in client.saved[0]) == ["Manual Entry", "https://jobs.example.com/fast", "https://jobs.example.com/slow"]
+
+
+def test_batch_sse(client):
+    body = {"resume_text": "r", "jobs": [{"url": "https://jobs.example.com/abcd"}]}
+    response = client.post("/api/analyze-batch", json=body, headers={"Accept": "text/event-stream"})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [json.loads(e[len("data: "):]) for e in response.text.split("\n\n") if e]
+    assert events[0]["job_title"] == "Job abcd"
+    assert events[-1]["done"] is True
+
+
+def test_batch_rejects_incomplete_jobs(client):
+    response = client.post("/api/analyze-batch", json={"resume_text": "r", "jobs": [{"job_title": "x"}]})
+    assert response.status_code == 400
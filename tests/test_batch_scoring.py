@@ -0,0 +1,117 @@
+import json
+import os
+import re
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test-key")
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.agents.scoring_agent import ScoringAgent
+from app.models import JobDescription
+from app.tools.near_dupes import NearDuplicateIndex
+
+
+def analysis(score, **extra):
+    return dict({"match_score": score, "matched_skills": ["Python"], "missing_skills": ["Go"],
+                 "tailoring_tips": ["a", "b", "c"], "fit_summary": f"Scored {score}."}, **extra)
+
+
+class BatchLLM:
+    """Answers batched prompts with one entry per JOB (minus `drop`), single prompts with one object."""
+
+    def __init__(self, malformed=False, drop=()):
+        self.malformed = malformed
+        self.drop = set(drop)
+        self.prompts = []
+
+    async def chat(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        jobs = re.findall(r"^JOB (\d+)$", prompt, re.M)
+        if not jobs:
+            return json.dumps(analysis(50))
+        if self.malformed:
+            return "Here are your results: [{\"job\": 1, \"match_score\": 80,"
+        entries = [analysis(60 + int(n), job=int(n)) for n in reversed(jobs) if int(n) not in self.drop]
+        return "```json\n" + json.dumps(entries) + "\n```"
+
+
+def make_jobs(n, text_len=200):
+    return [JobDescription(title=f"Engineer {i}", company="Acme", raw_text="Python SQL " * (text_len // 11), url=None) for i in range(n)]
+
+
+def test_plan_batches_respects_budget_and_max_jobs():
+    agent = ScoringAgent(llm_provider=BatchLLM())
+    agent.max_batch_jobs = 3
+    assert agent.plan_batches("resume", make_jobs(7)) == [[0, 1, 2], [3, 4, 5], [6]]
+
+    # long postings: only two fit the budget at a time
+    agent.max_batch_jobs, agent.token_budget = 8, 1900
+    long_jobs = make_jobs(5, text_len=1500)
+    batches = agent.plan_batches("resume", long_jobs)
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert all(agent.fits_batch("resume", [long_jobs[i] for i in b]) for b in batches)
+
+
+@pytest.mark.asyncio
+async def test_one_round_trip_for_a_batch():
+    llm = BatchLLM()
+    agent = ScoringAgent(llm_provider=llm)
+    results = await agent.generate_scores("Python dev", make_jobs(4))
+
+    assert len(llm.prompts) == 1
+    assert llm.prompts[0].count("Python dev") == 1  # resume sent once
+    # answers came back out of order but are matched by job number
+    assert [r["match_score"] for r in results] == [61, 62, 63, 64]
+    assert all("job" not in r for r in results)
+    assert agent.batch_stats == {"batches": 1, "jobs_batched": 4, "fallbacks": 0}
+
+
+@pytest.mark.asyncio
+async def test_malformed_batch_falls_back_to_single_calls():
+    llm = BatchLLM(malformed=True)
+    agent = ScoringAgent(llm_provider=llm)
+    results = await agent.generate_scores("Python dev", make_jobs(3))
+
+    assert [r["match_score"] for r in results] == [50, 50, 50]
+    assert len(llm.prompts) == 4
+    assert agent.batch_stats["fallbacks"] == 3
+
+
+@pytest.mark.asyncio
+async def test_only_missing_entries_are_rescored_and_prefs_apply():
+    llm = BatchLLM(drop={2})
+    agent = ScoringAgent(llm_provider=llm)
+    jobs = make_jobs(3)
+    jobs[0].raw_text += " remote"
+    prefs = {"remote_preference": True}
+
+    results = await agent.generate_scores("Python dev", jobs, prefs)
+    expected_first = await ScoringAgent(llm_provider=BatchLLM()).generate_scores("Python dev", jobs, prefs)
+
+    assert len(llm.prompts) == 2  # the batch + job 2 alone
+    assert results[1]["match_score"] == expected_first[1]["match_score"] - 62 + 50
+    assert results[0] == expected_first[0]
+    assert agent.batch_stats["fallbacks"] == 1
+
+
+def test_batch_endpoint_packs_jobs_into_one_prompt(monkeypatch):
+    llm = BatchLLM()
+    saved = []
+    monkeypatch.setattr(main, "scoring_agent", ScoringAgent(llm_provider=llm))
+    monkeypatch.setattr(main, "add_applications", lambda records: saved.extend(records) or len(records))
+    monkeypatch.setattr(main, "get_user_preferences", lambda user_id: None)
+    monkeypatch.setattr(main, "dupe_index", NearDuplicateIndex(path=":memory:"))
+
+    body = {
+        "resume_text": "Python developer",
+        "jobs": [{"job_title": f"Role {i}", "company": "Globex", "job_description": f"Spark SQL team {i} " * 20} for i in range(3)],
+    }
+    with TestClient(main.app) as client:
+        response = client.post("/api/analyze-batch", json=body)
+
+    lines = [json.loads(line) for line in response.text.splitlines() if line]
+    assert lines[-1] == {"done": True, "total": 3, "saved": 3}
+    assert sorted(l["result"]["match_score"] for l in lines[:-1]) == [61, 62, 63]
+    assert len(llm.prompts) == 1
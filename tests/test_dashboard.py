@@ -0,0 +1,111 @@
+import os
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test-key")
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.main as main
+from app import database
+
+
+@pytest.fixture
+def memory_db(memory_db):
+    """conftest's in-memory database with 30 applications of two users and 3 anonymous ones"""
+    start = datetime(2026, 1, 1)
+    db = database.SessionLocal()
+    for i in range(33):
+        db.add(database.JobApplicationTable(
+            job_title=f"Job {i}",
+            company="Acme" if i % 3 == 0 else "Globex",
+            status="Submitted" if i % 4 == 0 else "Not Submitted",
+            match_score=(i * 7) % 10 * 10,  # plenty of ties
+            url=f"https://jobs/{i}",
+            user_id=None if i >= 30 else ("u1" if i % 2 == 0 else "u2"),
+            created_at=start + timedelta(hours=i // 2),  # ties on date too
+        ))
+    db.commit()
+    db.close()
+    return memory_db
+
+
+def all_pages(client, **params):
+    rows, cursor, pages = [], None, 0
+    while True:
+        response = client.get("/api/dashboard", params=dict(params, **({"cursor": cursor} if cursor else {})))
+        assert response.status_code == 200
+        rows += response.json()
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return rows, pages
+        assert pages < 20, "cursor doesn't advance"
+
+
+def test_pages_cover_users_rows_in_order(memory_db):
+    with TestClient(main.app) as client:
+        by_date, pages = all_pages(client, user_id="u1", limit=4)
+        by_score, _ = all_pages(client, user_id="u1", sort="score", limit=4)
+        oldest, _ = all_pages(client, user_id="u1", order="asc", limit=7)
+
+    assert pages == 4 and len(by_date) == 15 and {r["user_id"] for r in by_date} == {"u1"}
+    assert [(r["created_at"], r["id"]) for r in by_date] == sorted(((r["created_at"], r["id"]) for r in by_date), reverse=True)
+    assert [(r["match_score"], r["id"]) for r in by_score] == sorted(((r["match_score"], r["id"]) for r in by_score), reverse=True)
+    assert [r["id"] for r in oldest] == [r["id"] for r in reversed(by_date)]
+
+
+def test_filters_and_anonymous_rows(memory_db):
+    with TestClient(main.app) as client:
+        submitted, _ = all_pages(client, user_id="u1", status="Submitted", sort="score", limit=3)
+        acme = client.get("/api/dashboard", params={"user_id": "u1", "company": "Acme"}).json()
+        anonymous = client.get("/api/dashboard").json()
+
+    assert len(submitted) == 8 and {r["status"] for r in submitted} == {"Submitted"}
+    assert [r["job_title"] for r in acme] == ["Job 24", "Job 18", "Job 12", "Job 6", "Job 0"]
+    assert [r["job_title"] for r in anonymous] == ["Job 32", "Job 31", "Job 30"]
+
+
+def test_bad_parameters_are_rejected(memory_db):
+    with TestClient(main.app) as client:
+        assert client.get("/api/dashboard", params={"sort": "company"}).status_code == 400
+        assert client.get("/api/dashboard", params={"limit": 0}).status_code == 400
+        assert client.get("/api/dashboard", params={"cursor": "not-a-cursor"}).status_code == 400
+        score_cursor = database.encode_cursor(50, 3)
+        assert client.get("/api/dashboard", params={"cursor": score_cursor}).status_code == 400  # date sort
+
+
+def test_pages_are_index_range_scans(memory_db):
+    rows, _ = database.get_applications("u1", limit=2)
+    assert len(rows) == 2
+    # the keyset query for the next page: index search, no sort step
+    with memory_db.connect() as conn:
+        plan = " ".join(row[-1] for row in conn.exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT * FROM applications WHERE user_id = 'u1' AND status = 'Submitted' "
+            "AND (match_score, id) < (50, 10) ORDER BY match_score DESC, id DESC LIMIT 51"
+        ))
+    assert "ix_applications_user_status_score" in plan and "TEMP B-TREE" not in plan
+
+
+def test_rows_from_before_the_migration_page_through(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with engine.begin() as conn:
+        # the applications table as it was before user_id / created_at
+        conn.exec_driver_sql("CREATE TABLE applications (id INTEGER PRIMARY KEY, job_title VARCHAR, company VARCHAR, "
+                             "status VARCHAR, match_score INTEGER, url VARCHAR)")
+        for i in range(7):
+            conn.exec_driver_sql(f"INSERT INTO applications (job_title, company, status, match_score, url) "
+                                 f"VALUES ('Old {i}', 'Acme', 'Not Submitted', {i * 10}, 'https://old/{i}')")
+    database.migrate_schema(engine)
+    database.migrate_schema(engine)  # the next start leaves it alone
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    database.add_application(job_title="New", company="Acme", score=50, url="https://new")
+
+    with TestClient(main.app) as client:
+        rows, pages = all_pages(client, limit=3)
+    assert pages == 3
+    assert [r["job_title"] for r in rows] == ["New"] + [f"Old {i}" for i in reversed(range(7))]
@@ -0,0 +1,36 @@
+import threading
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+
+
+def test_engine_uses_wal_and_tuned_pragmas(tmp_path):
+    engine = database.make_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql("PRAGMA cache_size").scalar() == -database.DB_CACHE_KB
+    engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_crud_runs_off_the_event_loop(tmp_path, monkeypatch):
+    engine = database.make_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    database.Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine))
+
+    threads = []
+
+    def record(func):
+        def wrapper(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return func(*args, **kwargs)
+        return wrapper
+
+    await database.run_db_write(record(database.add_application), job_title="Data Engineer", company="Acme", score=80, url="https://jobs/1")
+    apps = await database.run_db(record(database.get_all_applications))
+    assert [a.job_title for a in apps] == ["Data Engineer"]
+    assert threads[0].startswith("db-write") and threads[1].startswith("db_")
+    engine.dispose()
@@ -0,0 +1,33 @@
+import time
+
+from app.tools.disk_cache import DiskTier
+
+COLUMNS = {"value": "TEXT NOT NULL", "size": "INTEGER NOT NULL"}
+
+
+def test_rows_capped_every_few_writes_least_recently_used_first(tmp_path):
+    tier = DiskTier(str(tmp_path / "t.db"), "t", COLUMNS, touch_interval=0, prune_every=3, max_rows=2)
+    later = time.time() + 60
+    tier.put("a", ("A", 1), later)
+    tier.put("b", ("B", 1), later)
+    tier.get("a")  # b is now the least recently used
+    assert tier.put("c", ("C", 1), later) == 1
+    assert tier.count() == 2 and tier.get("b") is None
+    assert tier.get("a") == ("A", 1, later)
+    tier.close()
+
+
+def test_size_budget_and_expired_rows(tmp_path):
+    path = str(tmp_path / "t.db")
+    tier = DiskTier(path, "t", COLUMNS, prune_every=2, max_bytes=25, size_column="size")
+    tier.put("old", ("x", 10), time.time() - 1)
+    tier.put("a", ("y", 10), time.time() + 60)  # second write prunes the expired row
+    assert tier.used_bytes == 10 and tier.get("old") is None
+    assert tier.put("b", ("z", 10), time.time() + 60) == 0
+    assert tier.put("c", ("w", 10), time.time() + 60) == 1  # over 25 bytes, "a" goes
+    assert tier.used_bytes == 20 and tier.get("a") is None
+    tier.close()
+
+    reopened = DiskTier(path, "t", COLUMNS, size_column="size")
+    assert reopened.used_bytes == 20
+    reopened.close()
@@ -0,0 +1,38 @@
+import glob
+import os
+import pytest
+from app.tools.extractors import SoupExtractor, LXML_AVAILABLE, get_extractor
+
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "fixtures", "job_pages", "*.html")))
+
+
+def _extract(extractor, html):
+    # compare the exception type too, both backends must fail the same way
+    try:
+        return extractor.extract(html, "https://jobs.example.com/1")
+    except Exception as e:
+        return type(e)
+
+
+@pytest.mark.skipif(not LXML_AVAILABLE, reason="lxml not installed")
+@pytest.mark.parametrize("path", FIXTURES, ids=os.path.basename)
+def test_lxml_matches_soup_on_fixtures(path):
+    with open(path, encoding="utf-8") as f:
+        html = f.read()
+    assert _extract(get_extractor("lxml"), html) == _extract(SoupExtractor(), html)
+
+
+@pytest.mark.skipif(not LXML_AVAILABLE, reason="lxml not installed")
+@pytest.mark.parametrize("html", [
+    "",
+    "<p>no body tag</p>",
+    "<html><body><p>a<!-- note -->b</p><nav><main>hidden</main></nav><article>shown</article></body></html>",
+    '<html><head><meta property="og:site_name"></head><body>x</body></html>',
+])
+def test_lxml_matches_soup_on_edge_cases(html):
+    assert _extract(get_extractor("lxml"), html) == _extract(SoupExtractor(), html)
+
+
+def test_unknown_extractor_rejected():
+    with pytest.raises(ValueError):
+        get_extractor("selectolax")
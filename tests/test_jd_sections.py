@@ -0,0 +1,96 @@
+import os
+
+import pytest
+
+from app.agents.answer_agent import AnswerAgent
+from app.agents.scoring_agent import ScoringAgent
+from app.models import JobDescription, PersonalInfo, UserProfile
+from app.tools.extractors import SoupExtractor
+from app.tools.jd_sections import PREFERENCE_PRIORITY, compress_jd, estimate_tokens, heading_kind, split_sections
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "job_pages")
+
+BOILERPLATE = "\n".join(f"Globex has been a trusted partner to Fortune 500 companies since {1990 + i}, with offices worldwide." for i in range(30))
+POSTING = f"""Senior Data Engineer
+About Us
+{BOILERPLATE}
+What you'll do
+- Build Spark pipelines
+- Build Spark pipelines
+- Own Airflow DAGs
+Requirements:
+- 5+ years of Python
+- Experience with Kafka
+Benefits
+Unlimited PTO
+Apply now
+Globex is an equal opportunity employer and considers applicants without regard to race, religion or age.
+"""
+
+
+def sections_of(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        job = SoupExtractor().extract(f.read(), "https://jobs.example.com/1")
+    return [(s.kind, s.heading) for s in split_sections(job.raw_text)]
+
+
+@pytest.mark.parametrize("line,kind", [
+    ("Requirements:", "requirements"),
+    ("## What you'll do", "responsibilities"),
+    ("About the role", "summary"),
+    ("About Globex", "about"),
+    ("What We Offer", "benefits"),
+    ("Location:", "other"),
+    ("Experience with Kafka", ""),
+    ("You will train perception models in PyTorch.", ""),
+])
+def test_heading_kind(line, kind):
+    assert heading_kind(line) == kind
+
+
+def test_fixture_pages_are_segmented():
+    assert sections_of("linkedin_guest.html")[1:] == [
+        ("about", "About Globex"), ("responsibilities", "Responsibilities"),
+        ("requirements", "Qualifications"), ("benefits", "Benefits"),
+    ]
+    assert [k for k, _ in sections_of("workday_heavy_js.html")] == ["intro", "summary", "responsibilities", "requirements"]
+    assert [k for k, _ in sections_of("article_blog_style.html")] == ["intro", "responsibilities", "requirements", "benefits"]
+
+
+def test_split_drops_boilerplate_and_repeats():
+    sections = {s.kind: s for s in split_sections(POSTING)}
+    assert sections["responsibilities"].lines == ["- Build Spark pipelines", "- Own Airflow DAGs"]
+    assert sections["benefits"].lines == ["Unlimited PTO"]
+
+    inline = split_sections("Hooli\nRequirements: Linux, Go\nLocation: Remote")
+    assert [(s.kind, s.lines) for s in inline] == [("intro", ["Hooli"]), ("requirements", ["Linux, Go", "Location: Remote"])]
+
+
+def test_compress_keeps_requirements_within_budget():
+    assert "Kafka" not in POSTING[:2000]  # what the old truncation sent
+    compressed = compress_jd(POSTING, 120)
+    assert estimate_tokens(compressed) <= 120
+    assert "Requirements:\n- 5+ years of Python\n- Experience with Kafka" in compressed
+    assert "Own Airflow DAGs" in compressed
+    assert compressed.startswith("Senior Data Engineer\n")
+    assert "Unlimited PTO" not in compressed and "equal opportunity" not in compressed
+
+    # the preference summary cares about the perks instead
+    assert "Unlimited PTO" in compress_jd(POSTING, 120, PREFERENCE_PRIORITY)
+
+
+def test_compress_without_headings_is_a_clipped_head():
+    text = "python " * 1000
+    compressed = compress_jd(text, 100)
+    assert text.startswith(compressed) and 300 < len(compressed) <= 400
+    assert compress_jd("", 100) == ""
+
+
+def test_agent_prompts_use_compressed_posting():
+    job = JobDescription(title="Senior Data Engineer", company="Globex", raw_text=POSTING)
+    scoring_prompt = ScoringAgent()._build_prompt("resume", job)
+    assert "Experience with Kafka" in scoring_prompt and "since 2019" not in scoring_prompt
+
+    profile = UserProfile(personal_info=PersonalInfo(name="Ada", email="ada@example.com"), skills=["Python"])
+    answer_prompt = AnswerAgent()._build_prompt("Why us?", job, profile)
+    assert "Experience with Kafka" in answer_prompt and "Unlimited PTO" not in answer_prompt
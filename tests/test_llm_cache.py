@@ -0,0 +1,130 @@
+import os
+import time
+import pytest
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test-key")
+from llm_client import AIClient, LLMCache, LLMError, cache_key
+
+
+class FakeCompletions:
+    """Stands in for client.chat.completions, counts calls."""
+
+    def __init__(self, reply="A tailored answer."):
+        self.reply = reply
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        if isinstance(self.reply, Exception):
+            raise self.reply
+        message = type("Message", (), {"content": f"{self.reply} #{self.calls}"})
+        choice = type("Choice", (), {"message": message})
+        return type("Response", (), {"choices": [choice]})
+
+
+def make_client(cache, reply="A tailored answer."):
+    client = AIClient(api_key="test-key", cache=cache)
+    fake = FakeCompletions(reply)
+    client.client.chat.completions = fake
+    return client, fake
+
+
+def test_key_covers_model_prompts_and_temperature():
+    base = cache_key("m", "sys", "prompt", 0.1)
+    assert base == cache_key("m", "sys", "prompt", 0.1)
+    assert base != cache_key("m2", "sys", "prompt", 0.1)
+    assert base != cache_key("m", "sys2", "prompt", 0.1)
+    assert base != cache_key("m", "sys", "prompt2", 0.1)
+    assert base != cache_key("m", "sys", "prompt", 0.7)
+
+
+@pytest.mark.asyncio
+async def test_identical_prompt_served_from_cache_and_survives_restart(tmp_path):
+    path = str(tmp_path / "llm.db")
+    client, fake = make_client(LLMCache(path=path))
+
+    first = await client.chat("score this", agent="scoring")
+    assert await client.chat("score this", agent="scoring") == first
+    assert fake.calls == 1
+    assert client.cache.stats()["memory_hits"] == 1
+    client.cache.close()
+
+    restarted, fake = make_client(LLMCache(path=path))
+    assert await restarted.chat("score this", agent="scoring") == first
+    assert fake.calls == 0
+    assert restarted.cache.stats()["disk_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_bypass_asks_model_and_refreshes_cache():
+    client, fake = make_client(LLMCache(path=":memory:"))
+    first = await client.chat("answer this", agent="answer")
+    fresh = await client.chat("answer this", agent="answer", bypass_cache=True)
+    assert fresh != first and fake.calls == 2
+    assert await client.chat("answer this", agent="answer") == fresh
+    assert client.cache.stats()["bypassed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_errors_are_never_cached():
+    client, fake = make_client(LLMCache(path=":memory:"), reply=RuntimeError("bad payload"))
+    for _ in range(2):
+        with pytest.raises(LLMError):
+            await client.chat("x")
+    assert fake.calls == 2
+    assert client.cache.stats()["stores"] == 0
+
+    cache = LLMCache(path=":memory:")
+    cache.put("k", "   ")
+    assert cache.get("k") is None
+
+
+def test_per_agent_ttl_expiry():
+    cache = LLMCache(path=":memory:", ttls={"answer": -1, "scoring": 3600})
+    cache.put("a", "old answer", agent="answer")
+    cache.put("s", '{"match_score": 80}', agent="scoring")
+    assert cache.get("a") is None
+    assert cache.get("s") == '{"match_score": 80}'
+    assert cache.ttl_for("unknown") == cache.ttls["default"]
+
+
+def test_size_based_eviction(tmp_path):
+    cache = LLMCache(path=str(tmp_path / "llm.db"), memory_bytes=250, disk_bytes=350)
+    for i in range(5):
+        cache.put(f"k{i}", str(i) * 100)
+        time.sleep(0.001)
+    stats = cache.stats()
+    assert stats["memory_bytes"] <= 250 and stats["memory_entries"] == 2
+    assert stats["disk_bytes"] <= 350
+    # oldest rows are gone from both tiers, newest still served
+    assert cache.get("k0") is None
+    assert cache.get("k4") == "4" * 100
+    assert cache.get("k2") == "2" * 100  # evicted from memory, still on disk
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_stays_off_the_loop_and_hits_rarely_write(tmp_path):
+    import threading
+
+    path = str(tmp_path / "llm.db")
+    LLMCache(path=path).put("k", "cached answer")
+    cache = LLMCache(path=path, touch_interval=600)
+    threads = []
+    get_disk = cache._get_disk
+    cache._get_disk = lambda key: threads.append(threading.current_thread()) or get_disk(key)
+
+    accessed = cache._disk._db.execute("SELECT accessed_at FROM llm_cache").fetchone()[0]
+    for _ in range(3):
+        assert await cache.aget("k") == "cached answer"
+        cache._forget("k")  # next one from disk again
+    assert threading.main_thread() not in threads and len(threads) == 3
+    # fresh enough: no UPDATE + commit per hit
+    assert cache._disk._db.execute("SELECT accessed_at FROM llm_cache").fetchone()[0] == accessed
+    assert cache.stats()["disk_hits"] == 3
+
+    cache._disk.touch_interval = 0
+    await cache.aget("k")
+    assert cache._disk._db.execute("SELECT accessed_at FROM llm_cache").fetchone()[0] > accessed
+
+    await cache.aput("k2", "another answer", agent="answer")
+    assert LLMCache(path=path).get("k2") == "another answer"
@@ -0,0 +1,183 @@
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test-key")
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.agents.scoring_agent import ScoringAgent
+from app.tools.near_dupes import NearDuplicateIndex
+from app.tools.resilience import CircuitBreaker
+from llm_client import (
+    AIClient, LLMCircuitOpenError, LLMResponseError, LLMTimeoutError, LLMUnavailableError,
+)
+
+
+def make_client(base_url, **kwargs):
+    kwargs.setdefault("use_cache", False)
+    kwargs.setdefault("backoff_base", 0.01)
+    kwargs.setdefault("rpm", 6000)
+    return AIClient(api_key="test-key", base_url=base_url, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_retries_rate_limits_and_server_errors(stub_llm):
+    stub, base_url = stub_llm
+    stub.failures = [429, 503]
+    client = make_client(base_url)
+
+    assert await client.chat("hello") == "stub reply"
+    assert len(stub.requests) == 3
+    stats = client.stats()
+    assert stats["retries"] == 2 and stats["rate_limited"] == 1
+    assert stats["breaker"]["state"] == "closed"
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(stub_llm):
+    stub, base_url = stub_llm
+    stub.failures = [400]
+    client = make_client(base_url)
+
+    with pytest.raises(LLMResponseError):
+        await client.chat("hello")
+    assert len(stub.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries(stub_llm):
+    stub, base_url = stub_llm
+    stub.failures = [500] * 10
+    client = make_client(base_url, max_retries=2)
+
+    with pytest.raises(LLMUnavailableError):
+        await client.chat("hello")
+    assert len(stub.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_timeout_is_typed(stub_llm):
+    stub, base_url = stub_llm
+    stub.delay = 0.5
+    client = make_client(base_url, timeout=0.1, max_retries=0)
+
+    with pytest.raises(LLMTimeoutError):
+        await client.chat("hello")
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_fails_fast_then_recovers(stub_llm):
+    stub, base_url = stub_llm
+    stub.failures = [500, 500]
+    client = make_client(base_url, max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.3))
+
+    for _ in range(2):
+        with pytest.raises(LLMUnavailableError):
+            await client.chat("hello")
+    with pytest.raises(LLMCircuitOpenError) as refused:
+        await client.chat("hello")
+    assert refused.value.retry_after > 0
+    assert len(stub.requests) == 2  # refused without touching the network
+
+    await asyncio.sleep(0.35)
+    assert await client.chat("hello") == "stub reply"  # half open trial
+    assert client.breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_abandoned_half_open_trial_lets_the_next_call_through(stub_llm):
+    stub, base_url = stub_llm
+    stub.reply = "I shipped the Airflow migration."
+    client = make_client(base_url, max_retries=0, rpm=60, burst=1, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.1))
+    endpoint = client.endpoints[0]
+
+    # cancelled while it waits for a rate limit token: never became the trial
+    client.breaker.record_failure()
+    await asyncio.sleep(0.15)
+    endpoint.bucket.tokens = 0
+    waiting = asyncio.ensure_future(client.chat("hello"))
+    await asyncio.sleep(0.05)
+    waiting.cancel()
+    await asyncio.gather(waiting, return_exceptions=True)
+    assert client.breaker.state == "half_open" and client.breaker.available()
+
+    # the trial is a stream the client stops reading
+    endpoint.bucket.tokens = 1
+    stream = client.chat_stream("hello")
+    await stream.__anext__()
+    await stream.aclose()
+    assert client.breaker.state == "half_open" and client.breaker.available()
+
+    endpoint.bucket.tokens = 1
+    assert await client.chat("hello") == stub.reply
+    assert client.breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_concurrency_and_requests_per_minute(stub_llm):
+    stub, base_url = stub_llm
+    stub.delay = 0.1
+    client = make_client(base_url, max_concurrency=2)
+    await asyncio.gather(*(client.chat(f"prompt {i}") for i in range(6)))
+    assert stub.max_active == 2
+
+    stub.delay = 0
+    client = make_client(base_url, rpm=600, burst=1)  # 10 / second
+    start = time.monotonic()
+    await asyncio.gather(*(client.chat(f"prompt {i}") for i in range(4)))
+    assert time.monotonic() - start >= 0.28
+
+
+@pytest.mark.asyncio
+async def test_stream_retries_before_first_token(stub_llm):
+    stub, base_url = stub_llm
+    stub.failures = [503]
+    stub.reply = "I shipped the Airflow migration."
+    client = make_client(base_url)
+
+    chunks = [c async for c in client.chat_stream("hello")]
+    assert len(chunks) > 1 and "".join(chunks) == stub.reply
+    assert len(stub.requests) == 2 and stub.requests[-1]["stream"] is True
+
+
+def test_endpoint_reports_provider_outage(stub_llm, monkeypatch):
+    stub, base_url = stub_llm
+    stub.failures = [429] * 10
+    stub.retry_after = "7"
+    saved = []
+    monkeypatch.setattr(main, "scoring_agent", ScoringAgent(llm_provider=make_client(base_url, max_retries=1, backoff_max=0.05)))
+    monkeypatch.setattr(main, "add_applications", lambda records: saved.extend(records))
+    monkeypatch.setattr(main, "dupe_index", NearDuplicateIndex(path=":memory:"))
+
+    body = {"job_title": "Data Engineer", "company": "Globex", "job_description": "Spark", "resume_text": "Python"}
+    with TestClient(main.app) as client:
+        response = client.post("/api/analyze-manual", json=body)
+
+    assert response.status_code == 503
+    assert response.json()["error_type"] == "LLMRateLimitError"
+    assert response.headers["retry-after"] == "7"
+    # no more fake 0% matches in the dashboard
+    assert saved == []
+
+
+def test_pdf_endpoint_reports_provider_outage(stub_llm, monkeypatch):
+    stub, base_url = stub_llm
+    stub.failures = [504] * 10
+
+    async def extract_text_from_pdf(file, user_id=None):
+        return "Python"
+
+    monkeypatch.setattr(main, "scoring_agent", ScoringAgent(llm_provider=make_client(base_url, max_retries=0)))
+    monkeypatch.setattr(main, "extract_text_from_pdf", extract_text_from_pdf)
+    monkeypatch.setattr(main, "dupe_index", NearDuplicateIndex(path=":memory:"))
+
+    form = {"job_title": "Data Engineer", "company": "Globex", "job_description": "Spark"}
+    with TestClient(main.app) as client:
+        response = client.post("/api/analyze-manual-pdf", data=form, files={"file": ("cv.pdf", b"%PDF-1.4", "application/pdf")})
+
+    # the provider's failure, not "PDF Processing failed"
+    assert response.status_code == 503
+    assert response.json()["error_type"] == "LLMUnavailableError"
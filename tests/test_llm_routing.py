@@ -0,0 +1,157 @@
+import asyncio
+import time
+
+import pytest
+
+from app.tools.resilience import CircuitBreaker, LatencyTracker
+from llm_client import AIClient, LLMCircuitOpenError
+
+
+def make_client(endpoints, **kwargs):
+    kwargs.setdefault("use_cache", False)
+    kwargs.setdefault("backoff_base", 0.01)
+    kwargs.setdefault("rpm", 6000)
+    return AIClient(api_key="test-key", endpoints=endpoints, **kwargs)
+
+
+def test_latency_tracker():
+    tracker = LatencyTracker(alpha=0.5)
+    assert tracker.cost() == 0 and tracker.percentile(0.95) is None
+    for seconds in (0.1, 0.1, 0.1, 0.1, 0.9):
+        tracker.record(seconds)
+    assert tracker.percentile(0.95) == 0.9
+    assert tracker.latency == pytest.approx(0.5)
+    assert tracker.cost(in_flight=1) == pytest.approx(1.0)
+
+    tracker.record(None, ok=False)
+    assert tracker.error_rate == 0.5
+    assert tracker.cost() == pytest.approx(0.5 + 0.5 * tracker.error_penalty)
+
+
+@pytest.mark.asyncio
+async def test_routes_each_agent_to_its_endpoints(stub_llm_factory):
+    cheap, cheap_url = stub_llm_factory(reply="cheap")
+    strong, strong_url = stub_llm_factory(reply="strong")
+    client = make_client([
+        {"name": "cheap", "model": "small-model", "base_url": cheap_url, "tasks": ["preferences"]},
+        {"name": "strong", "model": "big-model", "base_url": strong_url, "tasks": ["scoring", "answer"]},
+    ])
+
+    assert await client.chat("summary", agent="preferences") == "cheap"
+    assert await client.chat("score", agent="scoring") == "strong"
+    assert await client.chat("other", agent="default") in ("cheap", "strong")  # nothing generic: any endpoint
+    assert cheap.requests[0]["model"] == "small-model" and strong.requests[0]["model"] == "big-model"
+
+
+@pytest.mark.asyncio
+async def test_prefers_the_faster_endpoint(stub_llm_factory):
+    slow, slow_url = stub_llm_factory(reply="slow", delay=0.2)
+    fast, fast_url = stub_llm_factory(reply="fast")
+    client = make_client([{"name": "slow", "model": "m", "base_url": slow_url}, {"name": "fast", "model": "m", "base_url": fast_url}])
+
+    replies = [await client.chat(f"prompt {i}") for i in range(8)]
+    # each is tried once while unmeasured, then the fast one takes the traffic
+    assert replies[:2] == ["slow", "fast"] and set(replies[2:]) == {"fast"}
+    stats = client.stats()["endpoints"]
+    assert stats["slow"]["latency_ms"] > stats["fast"]["latency_ms"]
+
+
+@pytest.mark.asyncio
+async def test_fails_over_to_another_endpoint(stub_llm_factory):
+    broken, broken_url = stub_llm_factory(failures=[503] * 10)
+    healthy, healthy_url = stub_llm_factory(reply="healthy")
+    client = make_client(
+        [{"name": "broken", "model": "m", "base_url": broken_url}, {"name": "healthy", "model": "m", "base_url": healthy_url}],
+        max_retries=1, backoff_base=10,  # no backoff sleep when another endpoint can take the retry
+    )
+
+    start = time.monotonic()
+    assert await client.chat("hello") == "healthy"
+    assert time.monotonic() - start < 1
+    assert len(broken.requests) == 1 and len(healthy.requests) == 1
+    # the error estimate keeps later calls away from it
+    await client.chat("again")
+    assert len(broken.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_refuses_when_every_circuit_is_open(stub_llm_factory):
+    _, url_a = stub_llm_factory(failures=[500])
+    _, url_b = stub_llm_factory(failures=[500])
+    client = make_client([{"model": "a", "base_url": url_a}, {"model": "b", "base_url": url_b}], max_retries=0)
+    for endpoint in client.endpoints:
+        endpoint.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+
+    for _ in range(2):
+        with pytest.raises(Exception):
+            await client.chat("hello")
+    with pytest.raises(LLMCircuitOpenError):
+        await client.chat("hello")
+
+
+@pytest.mark.asyncio
+async def test_lost_half_open_trial_falls_through_to_a_healthy_endpoint(stub_llm_factory):
+    recovering, recovering_url = stub_llm_factory(reply="recovering", delay=0.2)
+    healthy, healthy_url = stub_llm_factory(reply="healthy")
+    client = make_client(
+        [{"name": "recovering", "model": "m", "base_url": recovering_url}, {"name": "healthy", "model": "m", "base_url": healthy_url}],
+        max_concurrency=2,
+    )
+    half_open = client.endpoints[0]
+    half_open.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    half_open.breaker.record_failure()
+    time.sleep(0.06)
+    assert half_open.breaker.state == "half_open"
+
+    # both calls pick the half open endpoint, then queue for a slot: one gets the trial
+    for _ in range(2):
+        await client._semaphore.acquire()
+    calls = [asyncio.ensure_future(client.chat(f"prompt {i}", hedge=False)) for i in range(2)]
+    await asyncio.sleep(0.05)
+    for _ in range(2):
+        client._semaphore.release()
+
+    assert sorted(await asyncio.gather(*calls)) == ["healthy", "recovering"]
+    assert len(recovering.requests) == 1 and len(healthy.requests) == 1
+    assert half_open.breaker.state == "closed"
+
+    # a stream that loses the trial moves on the same way
+    half_open.breaker.record_failure()
+    time.sleep(0.06)
+    half_open.breaker.allow()  # somebody else's trial
+    assert "".join([chunk async for chunk in client.chat_stream("streamed")]) == "healthy"
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_takes_the_first_reply(stub_llm_factory):
+    slow, slow_url = stub_llm_factory(reply="slow", delay=0.6)
+    fast, fast_url = stub_llm_factory(reply="fast", delay=0.05)
+    endpoints = [{"name": "slow", "model": "m", "base_url": slow_url}, {"name": "fast", "model": "m", "base_url": fast_url}]
+    client = make_client(endpoints, hedge_tasks={"answer"}, hedge_delay=0.1)
+
+    start = time.monotonic()
+    assert await client.chat("write it", agent="answer") == "fast"
+    assert time.monotonic() - start < 0.45
+    assert client.counters["hedged"] == 1 and client.counters["hedge_wins"] == 1
+    assert len(slow.requests) == 1 and len(fast.requests) == 1
+    assert client.in_flight == 0  # the slow request was cancelled
+
+    # agents not in hedge_tasks wait for their endpoint
+    client = make_client(endpoints, hedge_tasks={"answer"}, hedge_delay=0.1)
+    start = time.monotonic()
+    assert await client.chat("score it", agent="scoring") == "slow"
+    assert time.monotonic() - start >= 0.6
+    assert client.counters["hedged"] == 0
+
+
+@pytest.mark.asyncio
+async def test_hedge_delay_follows_p95(stub_llm_factory):
+    stub, url = stub_llm_factory(delay=0.1)
+    client = make_client([{"model": "m", "base_url": url}], hedge_delay=0.01)
+    for i in range(5):
+        await client.chat(f"warm {i}", hedge=False)
+
+    # p95 (~100ms) is now the hedge delay, a quicker answer doesn't trigger a duplicate
+    stub.delay = 0.03
+    await client.chat("hello", hedge=True)
+    assert client.counters["hedged"] == 0 and len(stub.requests) == 6
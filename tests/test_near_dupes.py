@@ -0,0 +1,106 @@
+import os
+import random
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test-key")
+
+import pytest
+import app.main as main
+from app.models import JobDescription
+from app.tools.near_dupes import NearDuplicateIndex, near_duplicate_mask, posting_text
+
+WORDS = (
+    "python sql team build scale data api cloud design own services customers growth "
+    "platform reliable kubernetes pipelines analytics mentor ship product users latency "
+    "observability security review roadmap stakeholders experiment deploy monitor"
+).split()
+
+
+def posting(seed: int, words: int = 250) -> str:
+    rnd = random.Random(seed)
+    return " ".join(rnd.choice(WORDS) for _ in range(words))
+
+
+def reworded(text: str) -> str:
+    words = text.split()
+    words[10] = "Rust"
+    words[100] = "hybrid"
+    return " ".join(words) + " Apply through our recruiting partner today."
+
+
+def test_finds_near_copy_not_unrelated():
+    index = NearDuplicateIndex(path=None)
+    index.add("a", posting_text("Backend Engineer", posting(1)))
+    index.add("b", posting_text("Data Analyst", posting(2)))
+
+    match = index.find(posting_text("Backend Engineer", reworded(posting(1))))
+    assert match is not None and match[0] == "a"
+    assert index.find(posting_text("Backend Engineer", posting(3))) is None
+
+
+def test_persists_postings_and_analyses(tmp_path):
+    path = str(tmp_path / "dupes.db")
+    index = NearDuplicateIndex(path=path)
+    doc_id = index.canonical_id(posting_text("SRE", posting(5)))
+    index.save_analysis(doc_id, "ctx", {"match_score": 80})
+    index.close()
+
+    reopened = NearDuplicateIndex(path=path)
+    assert len(reopened) == 1
+    assert reopened.canonical_id(posting_text("SRE", reworded(posting(5)))) == doc_id
+    assert reopened.get_analysis(doc_id, "ctx") == {"match_score": 80}
+    assert reopened.get_analysis(doc_id, "other resume") is None
+    reopened.close()
+
+
+def test_oldest_postings_and_expired_analyses_are_pruned(tmp_path):
+    path = str(tmp_path / "dupes.db")
+    index = NearDuplicateIndex(path=path, max_postings=10, analysis_ttl=60)
+    ids = [index.canonical_id(posting_text("SRE", posting(seed))) for seed in range(10)]
+    index.save_analysis(ids[0], "ctx", {"match_score": 10})
+    index.save_analysis(ids[9], "ctx", {"match_score": 90})
+    index.add_many([(f"bulk{seed}", posting(seed)) for seed in range(100, 102)])
+
+    # 12 > 10: the oldest go, down to 9
+    assert len(index) == 9 and index.stats()["postings_pruned"] == 3
+    assert index.find(posting_text("SRE", posting(0))) is None
+    assert index.find(posting_text("SRE", posting(9)))[0] == ids[9]
+    assert index.get_analysis(ids[0], "ctx") is None
+    index._db.execute("UPDATE analyses SET created_at = 0")
+    assert index.get_analysis(ids[9], "ctx") is None  # older than analysis_ttl
+    index._db.commit()
+    index.close()
+
+    reopened = NearDuplicateIndex(path=path, max_postings=5)
+    assert len(reopened) == 4
+    assert reopened._db.execute("SELECT COUNT(*) FROM postings").fetchone()[0] == 4
+    assert reopened._db.execute("SELECT COUNT(*) FROM analyses").fetchone()[0] == 0
+    assert reopened.find(posting(101))[0] == "bulk101"
+    reopened.close()
+
+
+def test_near_duplicate_mask():
+    texts = [posting(1), None, reworded(posting(1)), posting(2)]
+    assert near_duplicate_mask(texts) == [False, False, True, False]
+
+
+@pytest.mark.asyncio
+async def test_score_job_reuses_analysis_for_near_copy(monkeypatch):
+    calls = []
+
+    async def fake_generate_score(resume_text, job, prefs):
+        calls.append(job.raw_text)
+        return {"match_score": 64, "matched_skills": [], "missing_skills": [], "tailoring_tips": [], "fit_summary": "ok"}
+
+    monkeypatch.setattr(main, "dupe_index", NearDuplicateIndex(path=":memory:"))
+    monkeypatch.setattr(main.scoring_agent, "generate_score", fake_generate_score)
+
+    original = JobDescription(title="ML Engineer", company="Acme", raw_text=posting(9))
+    copy = JobDescription(title="ML Engineer", company="Acme via Recruiter", raw_text=reworded(posting(9)))
+
+    first = await main.score_job("my resume", original, None)
+    second = await main.score_job("my resume", copy, None)
+    other_resume = await main.score_job("a different resume", copy, None)
+
+    assert first == second == other_resume
+    # the copy reused the first analysis, a new resume needed a fresh one
+    assert len(calls) == 2
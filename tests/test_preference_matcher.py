@@ -0,0 +1,121 @@
+import os
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test-key")
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.agents.preference_matcher import PreferenceMatcher, preference_frame, preference_matcher_for, rank_by_preferences
+from app.models import JobDescription
+from app.tools.keyword_matcher import KeywordMatcher, MatcherCache
+
+PREFS = {
+    "user_id": "u1",
+    "values": ["Work-Life Balance", "Career Growth", "Job Security"],
+    "field": "Data",
+    "subfield": "Data Engineering",
+    "specialization": "Streaming",
+    "locations": ["Austin", "New York"],
+    "remote_preference": True,
+    "role_level": "Mid-Level",
+}
+
+
+def boost(raw_text, title="Data Engineer", location="Austin, TX", prefs=PREFS):
+    job = JobDescription(title=title, company="Globex", location=location, raw_text=raw_text)
+    return PreferenceMatcher().calculate_preference_boost(job, prefs)
+
+
+def test_keyword_matcher_whole_words_single_pass():
+    matcher = KeywordMatcher([("mid", ["mid"]), ("lead", ["lead"]), ("senior", ["sr.", "staff"]),
+                              ("principal", ["staff engineer"]), ("remote", ["work from home"])])
+    assert matcher.scan("Midnight on-call, misleading dashboards, leadership") == set()
+    assert matcher.scan("Sr. engineer, MID level") == {"senior", "mid"}
+    assert matcher.scan("Staff Engineer who can work from\n  home") == {"senior", "principal", "remote"}
+    assert KeywordMatcher([]).scan("anything") == set()
+
+
+def test_boost_matches_every_section():
+    result = boost(
+        "Join our data platform team building streaming pipelines in Data Engineering. "
+        "Remote friendly. Intermediate engineers welcome. Flexible hours, professional development budget."
+    )
+    assert result["preference_boost"] == 3 + 3 + 2 + 3 + 2 + 4 + 2
+    assert result["preference_insights"][3] == "✓ Location match: Austin"
+    assert result["preference_warnings"] == []
+
+
+def test_substrings_inside_words_no_longer_match():
+    # "mid" in "midnight", "remote" in "remotely", "data" in "database"
+    text = "Midnight database maintenance, misleading alerts handled remotely. Learnings shared."
+    result = boost(text, title="Database Administrator", location="Denver")
+    assert result["preference_boost"] == 0
+    assert "⚠ This role appears to be on-site, but you prefer remote work" in result["preference_warnings"]
+
+
+def test_title_level_mismatch_warning():
+    result = boost("Python and Kafka.", title="Principal Data Engineer")
+    assert result["preference_warnings"] == ["⚠ This appears to be a Lead/Principal role, but you're targeting Mid-Level"]
+
+
+def test_matchers_cached_per_user(monkeypatch):
+    monkeypatch.setattr("app.agents.preference_matcher.matcher_cache", MatcherCache())
+    from app.agents import preference_matcher as module
+
+    first = preference_matcher_for(PREFS)
+    assert preference_matcher_for(dict(PREFS, remote_preference=False)) is first  # doesn't change the keywords
+    assert module.matcher_cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+    moved = preference_matcher_for(dict(PREFS, locations=["Berlin"]))
+    assert moved is not first and ("location", "berlin") in moved.scan("Office in Berlin")
+    assert preference_matcher_for(dict(PREFS, user_id="u2")) is not moved
+    assert module.matcher_cache.stats()["entries"] == 2
+
+
+JOBS = [
+    JobDescription(title="Senior Backend Engineer", company="A", location="Denver, CO", raw_text="Payments APIs in Go, on-site."),
+    JobDescription(title="Data Engineer", company="B", location="Austin, TX",
+                   raw_text="Data Engineering on streaming pipelines, remote friendly, intermediate level, flexible hours."),
+    JobDescription(title="Engineer", company="C", location="Remote", raw_text="Data platform work, midnight on-call, career growth."),
+    JobDescription(title="Analyst", company="D", location=None, raw_text=""),
+]
+
+
+def test_bulk_boost_matches_single_job_boost():
+    scored = preference_frame(JOBS, PREFS)
+    single = [PreferenceMatcher().calculate_preference_boost(job, PREFS)["preference_boost"] for job in JOBS]
+    assert list(scored["preference_boost"]) == single
+    assert list(scored["remote_match"]) == [False, True, False, False]
+    assert list(scored["level_match"]) == [False, True, False, False]
+    assert preference_frame(JOBS, None)["preference_boost"].sum() == 0
+    assert preference_frame([], PREFS).empty
+
+
+def test_rank_by_preferences_is_stable_and_uses_jobspy_remote_flag():
+    frame = pd.DataFrame({
+        "title": ["Analyst", "Data Engineer", "Engineer"],
+        "location": ["Denver", "Austin, TX", "Denver"],
+        "description": ["Spreadsheets.", "Data Engineering, streaming.", "Backend services."],
+        "is_remote": [False, None, True],
+    })
+    ranked = rank_by_preferences(frame, PREFS)
+    assert list(ranked["title"]) == ["Data Engineer", "Engineer", "Analyst"]
+    assert list(ranked["remote_match"]) == [False, True, False]
+    assert "preference_boost" not in frame.columns
+
+
+def test_search_results_ranked_by_preferences(monkeypatch):
+    frame = pd.DataFrame({"title": ["Analyst", "Data Engineer"], "description": ["Spreadsheets.", "Data Engineering in Austin."]})
+
+    async def fake_search(query, location, limit):
+        return frame, {"indeed": "ok"}
+
+    monkeypatch.setattr(main.scraper, "search_jobs_df", fake_search)
+    monkeypatch.setattr(main, "get_user_preferences", lambda user_id: PREFS if user_id == "u1" else None)
+    with TestClient(main.app) as client:
+        ranked = client.post("/api/search-jobs", json={"query": "data", "user_id": "u1", "fields": ["title", "preference_boost"]}).json()
+        unknown = client.post("/api/search-jobs", json={"query": "data", "user_id": "nobody"}).json()
+    assert [r["title"] for r in ranked["results"]] == ["Data Engineer", "Analyst"]
+    assert ranked["results"][0]["preference_boost"] == 3 + 3 + 3
+    assert [r["title"] for r in unknown["results"]] == ["Analyst", "Data Engineer"]
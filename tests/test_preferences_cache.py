@@ -0,0 +1,106 @@
+import os
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test-key")
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app import database
+from app.tools.preferences_cache import PreferencesCache
+
+PREFS = {
+    "user_id": "u1",
+    "values": ["Career Growth"],
+    "field": "Data",
+    "subfield": "Data Engineering",
+    "specialization": "Streaming",
+    "locations": ["Austin"],
+    "remote_preference": True,
+    "role_level": "Mid-Level",
+}
+
+
+@pytest.fixture
+def memory_db(memory_db, monkeypatch):
+    """conftest's in-memory database, with a fresh preferences cache that re-checks every lookup"""
+    cache = PreferencesCache(database.load_user_preferences, database.get_preferences_version, check_interval=0)
+    monkeypatch.setattr(database, "preferences_cache", cache)
+    monkeypatch.setattr(main, "preferences_cache", cache)
+    return memory_db
+
+
+def count_loads(monkeypatch, cache):
+    loads = []
+    load = cache.load
+    monkeypatch.setattr(cache, "load", lambda user_id: loads.append(user_id) or load(user_id))
+    return loads
+
+
+def test_repeated_reads_parse_once(memory_db, monkeypatch):
+    cache = database.preferences_cache
+    database.save_user_preferences(PREFS)
+    cache.invalidate()
+    loads = count_loads(monkeypatch, cache)
+
+    for _ in range(5):
+        assert database.get_user_preferences("u1") == PREFS
+    assert database.get_user_preferences("nobody") is None
+    assert database.get_user_preferences("nobody") is None  # negative entries are cached too
+    assert loads == ["u1", "nobody"]
+
+    stats = cache.stats()
+    assert stats["hits"] == 5 and stats["misses"] == 2 and stats["version_checks"] == 5
+    assert stats["hit_ratio"] == round(5 / 7, 4)
+
+
+def test_save_writes_through_and_bumps_version(memory_db, monkeypatch):
+    cache = database.preferences_cache
+    database.save_user_preferences(PREFS)
+    loads = count_loads(monkeypatch, cache)
+
+    database.save_user_preferences(dict(PREFS, field="AI", locations=["Berlin"]))
+    assert database.get_user_preferences("u1")["locations"] == ["Berlin"]
+    assert loads == []
+    assert database.get_preferences_version("u1") == 2
+    assert cache.stats()["writes"] == 2
+
+
+def test_other_workers_saves_are_noticed(memory_db, monkeypatch):
+    database.save_user_preferences(PREFS)
+    assert database.get_user_preferences("u1")["field"] == "Data"
+
+    # a second worker: its own cache over the same db
+    cache = database.preferences_cache
+    monkeypatch.setattr(database, "preferences_cache", PreferencesCache(database.load_user_preferences, database.get_preferences_version))
+    database.save_user_preferences(dict(PREFS, field="AI"))
+
+    assert cache.get("u1")["field"] == "AI"
+    assert cache.stats()["stale"] == 1
+
+
+def test_check_interval_and_lru_bound():
+    versions = {"a": 1, "b": 1, "c": 1}
+    checks = []
+    cache = PreferencesCache(
+        lambda user_id: ({"user_id": user_id}, versions[user_id]),
+        lambda user_id: checks.append(user_id) or versions[user_id],
+        max_entries=2,
+        check_interval=60,
+    )
+    for user_id in ("a", "b", "a", "c"):
+        cache.get(user_id)
+    assert checks == []  # trusted within the interval
+    assert cache.stats()["entries"] == 2
+    cache.get("b")  # evicted by "c"
+    assert cache.stats()["misses"] == 4
+
+
+def test_preferences_endpoints_update_cache(memory_db):
+    with TestClient(main.app) as client:
+        assert client.post("/api/preferences", json=PREFS).status_code == 200
+        assert client.get("/api/preferences/u1").json()["field"] == "Data"
+        assert client.put("/api/preferences/u1", json=dict(PREFS, field="AI")).status_code == 200
+        assert client.get("/api/preferences/u1").json()["field"] == "AI"
+        stats = client.get("/api/stats").json()["preferences"]
+    assert stats["writes"] == 2 and stats["misses"] == 0
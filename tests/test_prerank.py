@@ -0,0 +1,108 @@
+import json
+import os
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test-key")
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.agents.scoring_agent import ScoringAgent
+from app.models import ResumeMatch
+from app.tools.near_dupes import NearDuplicateIndex
+from app.tools.prerank import TfidfRanker, local_estimate, rank_frame, select_for_llm, tokenize
+
+RESUME = "Data engineer: Python, SQL, Airflow, Spark and C++ pipelines on AWS."
+POSTINGS = [
+    "Registered nurse for our night shift, patient care and charting.",
+    "Data Engineer. Build Spark and Airflow pipelines in Python, strong SQL, AWS a plus.",
+    "Java backend developer, Spring Boot, Kafka.",
+    "Analytics engineer: SQL, dbt, Python.",
+]
+
+
+def test_tokenize_keeps_language_names():
+    assert tokenize("C++, C# and node.js - the • best!") == ["c++", "c#", "node", "js", "best"]
+
+
+def test_ranker_orders_by_similarity():
+    ranker = TfidfRanker(POSTINGS, RESUME)
+    similarity = ranker.similarities()
+    assert list(np.argsort(-similarity))[:2] == [1, 3]
+    assert similarity[0] == 0 and 0 < similarity.max() <= 1
+    coverage = ranker.coverage()
+    assert coverage[1] > coverage[3] > coverage[0] == 0
+
+    found, missing = ranker.keywords(2, limit=10)
+    assert found == [] and set(missing) >= {"java", "spring", "kafka"}
+
+
+def test_select_for_llm():
+    similarity = np.array([0.1, 0.5, 0.0, 0.3, 0.2])
+    assert select_for_llm(similarity, top_n=10).all()
+    assert list(select_for_llm(similarity, top_n=2)) == [False, True, False, True, False]
+    assert list(select_for_llm(similarity, top_n=1, min_similarity=0.2)) == [False, True, False, True, True]
+
+
+def test_local_estimate_is_a_marked_resume_match():
+    ranker = TfidfRanker(POSTINGS, RESUME)
+    estimate = local_estimate(ranker, 3, float(ranker.coverage()[3]))
+    match = ResumeMatch(**estimate)
+    assert match.estimated is True
+    assert "python" in match.matched_skills and "dbt" in match.missing_skills
+    assert "Not analyzed by the AI" in match.fit_summary
+
+
+class CountingLLM:
+    def __init__(self):
+        self.prompts = []
+
+    async def chat(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return json.dumps({"match_score": 80, "matched_skills": ["Python"], "missing_skills": [],
+                           "tailoring_tips": ["a"], "fit_summary": "LLM analysis."})
+
+
+def test_batch_sends_only_top_jobs_to_llm(monkeypatch):
+    llm = CountingLLM()
+    agent = ScoringAgent(llm_provider=llm)
+    agent.max_batch_jobs = 1  # one prompt per job so the prompts can be counted
+    saved = []
+    monkeypatch.setattr(main, "scoring_agent", agent)
+    monkeypatch.setattr(main, "add_applications", lambda records: saved.extend(records) or len(records))
+    monkeypatch.setattr(main, "get_user_preferences", lambda user_id: None)
+    monkeypatch.setattr(main, "dupe_index", NearDuplicateIndex(path=":memory:"))
+
+    body = {
+        "resume_text": RESUME,
+        "top_n": 2,
+        "jobs": [{"job_title": f"Role {i}", "company": "Globex", "job_description": text} for i, text in enumerate(POSTINGS)],
+    }
+    with TestClient(main.app) as client:
+        lines = [json.loads(l) for l in client.post("/api/analyze-batch", json=body).text.splitlines() if l]
+
+    items = {l["index"]: l for l in lines[:-1]}
+    assert lines[-1] == {"done": True, "total": 4, "saved": 2}
+    assert len(llm.prompts) == 2
+    assert {i for i, item in items.items() if item.get("estimated")} == {0, 2}
+    assert items[1]["result"]["fit_summary"] == "LLM analysis."
+    assert items[0]["result"]["estimated"] is True and items[0]["result"]["match_score"] == 0
+    assert sorted(r["job_title"] for r in saved) == ["Role 1", "Role 3"]
+
+
+def test_search_results_ranked_by_resume(monkeypatch):
+    frame = pd.DataFrame({"title": ["Nurse", "Data Engineer", "Java Dev"], "description": [POSTINGS[0], POSTINGS[1], POSTINGS[2]]})
+    ranked = rank_frame(frame, RESUME)
+    assert list(ranked["title"])[0] == "Data Engineer"
+    assert list(ranked["relevance"]) == sorted(ranked["relevance"], reverse=True)
+    assert "relevance" not in frame.columns  # cached frame untouched
+
+    async def fake_search(query, location, limit):
+        return frame, {"indeed": "ok"}
+
+    monkeypatch.setattr(main.scraper, "search_jobs_df", fake_search)
+    with TestClient(main.app) as client:
+        body = client.post("/api/search-jobs", json={"query": "data", "resume_text": RESUME, "fields": ["title", "match_estimate"]}).json()
+    assert body["results"][0]["title"] == "Data Engineer"
+    assert body["results"][0]["match_estimate"] > 0
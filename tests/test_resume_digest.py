@@ -0,0 +1,104 @@
+import json
+import os
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test-key")
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.database as database
+import app.main as main
+from app.agents.answer_agent import AnswerAgent
+from app.agents.scoring_agent import ScoringAgent
+from app.models import JobDescription, PersonalInfo, UserProfile
+from app.tools.near_dupes import NearDuplicateIndex
+from app.tools.resume_digest import build_digest, extract_skills, resume_prompt
+
+RESUME = """Jane Doe
+jane@example.com | +1 (555) 123-4567 | linkedin.com/in/jane
+Professional Summary
+Data engineer with 6 years building batch and streaming pipelines on AWS. Led the move to Airflow.
+Experience
+Senior Data Engineer at Globex, 2020 - Present
+- Built PySpark and Kafka pipelines processing 2TB/day
+Data Analyst | Initech | 2017 - 2020
+- SQL, Tableau dashboards, Python (pandas) automation
+Skills
+Python, SQL, R, C++, Docker, k8s, Postgres, node.js
+""" + "\n".join(f"- Shipped internal project number {i} with the platform team" for i in range(80))
+
+
+@pytest.fixture
+def memory_db(memory_db, monkeypatch):
+    """conftest's in-memory database, with fresh resume counters"""
+    monkeypatch.setattr(main, "resume_stats", {"digests_built": 0, "digests_reused": 0, "pdf_parses_skipped": 0})
+
+
+class PromptLLM:
+    def __init__(self):
+        self.prompts = []
+
+    async def chat(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return json.dumps({"match_score": 70, "matched_skills": ["Python"], "missing_skills": [],
+                           "tailoring_tips": ["a"], "fit_summary": "ok"})
+
+
+def test_digest_fields():
+    digest = build_digest(RESUME)
+    assert digest.skills[:4] == ["AWS", "Airflow", "Spark", "Kafka"]
+    assert {"Kubernetes", "PostgreSQL", "Node.js", "R", "C++"} <= set(digest.skills)
+    assert digest.titles == ["Senior Data Engineer", "Data Analyst"]
+    assert digest.summary.startswith("Data engineer with 6 years") and "Experience" not in digest.summary
+    assert extract_skills("I wrote a C program for R&D and Go tooling") == []
+
+
+def test_resume_prompt_is_compact():
+    prompt = resume_prompt(build_digest(RESUME), token_budget=200)
+    assert prompt.startswith("TITLES: Senior Data Engineer; Data Analyst\nSKILLS: AWS, Airflow")
+    assert "jane@example.com" not in prompt and "555" not in prompt
+    assert len(prompt) <= 200 * 4 < len(RESUME) / 2
+    assert resume_prompt(RESUME, 200) == prompt  # raw text gets the same digest
+
+
+def test_digest_saved_once_and_reused(memory_db, monkeypatch):
+    llm = PromptLLM()
+    monkeypatch.setattr(main, "scoring_agent", ScoringAgent(llm_provider=llm))
+    monkeypatch.setattr(main, "add_applications", lambda records: len(records))
+    monkeypatch.setattr(main, "dupe_index", NearDuplicateIndex(path=":memory:"))
+
+    with TestClient(main.app) as client:
+        for title in ("Data Engineer", "Platform Engineer"):
+            body = {"job_title": title, "company": "Globex", "job_description": "Spark", "resume_text": RESUME, "user_id": "u1"}
+            assert client.post("/api/analyze-manual", json=body).status_code == 200
+        stored = client.get("/api/resume/u1").json()
+
+    assert main.resume_stats["digests_built"] == 1 and main.resume_stats["digests_reused"] == 1
+    assert stored["titles"] == ["Senior Data Engineer", "Data Analyst"] and "text" not in stored
+    assert all("SKILLS: AWS" in p and "jane@example.com" not in p for p in llm.prompts)
+    assert all("project number 79" not in p for p in llm.prompts)
+
+
+def test_pdf_parsed_once(memory_db, monkeypatch):
+    parses = []
+    monkeypatch.setattr(main, "pdf_text", lambda content: parses.append(content) or RESUME)
+
+    with TestClient(main.app) as client:
+        for _ in range(2):
+            response = client.post("/api/resume", files={"file": ("cv.pdf", b"%PDF-1.4 jane", "application/pdf")}, data={"user_id": "u2"})
+            assert response.status_code == 200
+        assert client.get("/api/resume/nobody").status_code == 404
+
+    assert len(parses) == 1
+    assert main.resume_stats["pdf_parses_skipped"] == 1
+    assert response.json()["skills"][:2] == ["AWS", "Airflow"]
+    assert database.get_resume_digest(user_id="u2")["text"] == RESUME
+
+
+def test_answer_prompt_uses_digest():
+    job = JobDescription(title="Data Engineer", company="Globex", raw_text="Requirements:\nKafka")
+    profile = UserProfile(personal_info=PersonalInfo(name="Jane", email="jane@example.com"), skills=["Python", "Leadership"])
+    prompt = AnswerAgent()._build_prompt("Why us?", job, profile, build_digest(RESUME))
+    assert "USER SKILLS: Python, Leadership, AWS, Airflow" in prompt
+    assert "TITLES: Senior Data Engineer" in prompt
+    assert "TITLES:" not in AnswerAgent()._build_prompt("Why us?", job, profile)
@@ -0,0 +1,97 @@
+import asyncio
+import time
+import pytest
+from app.tools.scraper import JobScraper, HostScheduler, host_key, retry_after_seconds
+
+
+def test_host_key_groups_subdomains():
+    assert host_key("https://www.linkedin.com/jobs/view/1") == "linkedin.com"
+    assert host_key("https://uk.linkedin.com/jobs/view/1") == "linkedin.com"
+    assert host_key("https://jobs.example.co.uk/1") == "example.co.uk"
+    assert host_key("http://127.0.0.1:8000/x") == "127.0.0.1"
+
+
+def test_retry_after_parsing():
+    assert retry_after_seconds("3") == 3.0
+    assert retry_after_seconds(None) is None
+    assert retry_after_seconds("garbage") is None
+    assert 0 <= retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+@pytest.mark.asyncio
+async def test_retries_after_429_and_honours_retry_after(stub_board):
+    board, port = stub_board
+    board.throttle_first = 1
+    board.retry_after = "0.3"
+    scraper = JobScraper(http2=False, scheduler=HostScheduler(backoff_max=5))
+
+    job = await scraper.scrape(f"http://127.0.0.1:{port}/job/1")
+    await scraper.close()
+
+    assert job.title == "Job /job/1"
+    statuses = [r[3] for r in board.requests]
+    assert statuses == [429, 200]
+    assert board.requests[1][2] - board.requests[0][2] >= 0.3
+    assert scraper.scheduler.stats()["hosts"]["127.0.0.1"]["retries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries(stub_board):
+    board, port = stub_board
+    board.throttle_first = 100
+    board.retry_after = "0"
+    scraper = JobScraper(http2=False, scheduler=HostScheduler(max_retries=2))
+
+    job = await scraper.scrape(f"http://127.0.0.1:{port}/job/1")
+    await scraper.close()
+
+    assert job.title.startswith("Error")
+    assert len(board.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_per_host_concurrency_cap(stub_board):
+    board, port = stub_board
+    board.delay = 0.1
+    scheduler = HostScheduler(host_concurrency=2, host_rate=1000, host_burst=1000)
+    scraper = JobScraper(http2=False, scheduler=scheduler)
+
+    # 127.0.0.1 and localhost are two different domains on the same stub server
+    urls = [f"http://127.0.0.1:{port}/a{i}" for i in range(6)] + [f"http://localhost:{port}/b{i}" for i in range(6)]
+    jobs = await asyncio.gather(*(scraper.scrape(u) for u in urls))
+    await scraper.close()
+
+    assert not any(j.title.startswith("Error") for j in jobs)
+    assert board.max_active["127.0.0.1"] == 2
+    assert board.max_active["localhost"] == 2
+    # both hosts ran side by side
+    assert board.max_active_total == 4
+
+
+@pytest.mark.asyncio
+async def test_global_in_flight_cap(stub_board):
+    board, port = stub_board
+    board.delay = 0.1
+    scheduler = HostScheduler(global_concurrency=3, host_concurrency=10, host_rate=1000, host_burst=1000)
+    scraper = JobScraper(http2=False, scheduler=scheduler)
+
+    urls = [f"http://127.0.0.1:{port}/a{i}" for i in range(5)] + [f"http://localhost:{port}/b{i}" for i in range(5)]
+    await asyncio.gather(*(scraper.scrape(u) for u in urls))
+    await scraper.close()
+
+    assert board.max_active_total == 3
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_rate(stub_board):
+    board, port = stub_board
+    scheduler = HostScheduler(host_concurrency=10, host_rate=10, host_burst=1)
+    scraper = JobScraper(http2=False, scheduler=scheduler)
+
+    start = time.monotonic()
+    await asyncio.gather(*(scraper.scrape(f"http://127.0.0.1:{port}/r{i}") for i in range(5)))
+    elapsed = time.monotonic() - start
+    await scraper.close()
+
+    # 1 token up front then 10/s
+    assert elapsed >= 0.35
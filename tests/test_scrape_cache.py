@@ -0,0 +1,132 @@
+import threading
+
+import httpx
+import pytest
+from app.models import JobDescription
+from app.tools.scrape_cache import ScrapeCache, normalize_url
+from app.tools.scraper import JobScraper
+
+JOB_PAGE = "<html><head><title>Data Engineer</title></head><body><main>Spark, Airflow</main></body></html>"
+
+
+def test_normalize_url_drops_tracking_and_fragment():
+    a = normalize_url("HTTPS://www.LinkedIn.com/jobs/view/123/?utm_source=x&trk=abc#apply")
+    b = normalize_url("https://www.linkedin.com/jobs/view/123")
+    assert a == b
+    assert normalize_url("https://x.com/j?b=2&a=1") == normalize_url("https://x.com/j?a=1&b=2")
+
+
+def test_lru_eviction_and_disk_tier(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ScrapeCache(path=path, max_entries=2)
+    for i in range(3):
+        cache.put(f"https://x.com/{i}", JobDescription(title=f"Job {i}", company="X", raw_text="t"))
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["memory_entries"] == 2
+    # evicted from memory but still on disk
+    assert cache.get("https://x.com/0").job.title == "Job 0"
+    cache.close()
+
+    # survives a restart
+    reopened = ScrapeCache(path=path)
+    assert reopened.get("https://x.com/2").job.title == "Job 2"
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_scraper_hits_cache_and_revalidates(tmp_path):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text=JOB_PAGE, headers={"ETag": '"v1"'})
+
+    cache = ScrapeCache(path=str(tmp_path / "cache.db"), ttl=60)
+    scraper = JobScraper(transport=httpx.MockTransport(handler), cache=cache)
+
+    first = await scraper.scrape("https://jobs.example.com/9?utm_campaign=a")
+    second = await scraper.scrape("https://jobs.example.com/9")
+    assert len(requests) == 1
+    assert first == second
+
+    # expire it, next scrape is a conditional GET answered with 304
+    cache._memory[normalize_url("https://jobs.example.com/9")].expires_at = 0
+    third = await scraper.scrape("https://jobs.example.com/9")
+    assert len(requests) == 2
+    assert requests[1].headers["if-none-match"] == '"v1"'
+    assert third.title == "Data Engineer"
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["revalidated"] == 1
+    await scraper.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_scrapes_are_negative_cached(tmp_path):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(404)
+
+    cache = ScrapeCache(path=str(tmp_path / "cache.db"), error_ttl=60)
+    scraper = JobScraper(transport=httpx.MockTransport(handler), cache=cache)
+
+    job = await scraper.scrape("https://dead.example.com/job")
+    again = await scraper.scrape("https://dead.example.com/job")
+    assert job.title.startswith("Error")
+    assert again.title.startswith("Error")
+    assert len(calls) == 1
+    assert cache.stats()["error_hits"] == 1
+    await scraper.close()
+
+
+@pytest.mark.asyncio
+async def test_disk_cap_enforced_at_runtime_and_hits_rarely_write(tmp_path, monkeypatch):
+    cache = ScrapeCache(path=str(tmp_path / "cache.db"), max_entries=1, max_disk_entries=5, prune_every=4)
+    for i in range(20):
+        await cache.aput(f"https://x.com/{i}", JobDescription(title=f"Job {i}", company="X", raw_text="t"))
+    assert cache.stats()["disk_entries"] <= 5 + 3  # pruned every 4th write, never far over the cap
+    assert (await cache.aget("https://x.com/19")).job.title == "Job 19"
+
+    # disk lookups run on a thread, and a fresh row doesn't rewrite its accessed_at
+    threads = []
+    load = cache._load
+    monkeypatch.setattr(cache, "_load", lambda key: threads.append(threading.current_thread()) or load(key))
+    total = cache._disk._db.total_changes
+    assert (await cache.aget("https://x.com/18")).job.title == "Job 18"
+    assert threads and threads[0] is not threading.main_thread()
+    assert cache._disk._db.total_changes == total
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_revalidation_serves_the_stale_posting(tmp_path):
+    down = []
+
+    def handler(request):
+        if down:
+            raise httpx.ConnectError("board is down")
+        return httpx.Response(200, text=JOB_PAGE, headers={"ETag": '"v1"'})
+
+    cache = ScrapeCache(path=str(tmp_path / "cache.db"), ttl=60, error_ttl=60)
+    scraper = JobScraper(transport=httpx.MockTransport(handler), cache=cache)
+    url = "https://jobs.example.com/9"
+    await scraper.scrape(url)
+
+    cache._memory[normalize_url(url)].expires_at = 0
+    down.append(True)
+    assert (await scraper.scrape(url)).title == "Data Engineer"
+    assert (await scraper.scrape(url)).title == "Data Engineer"  # served for error_ttl, no new attempt
+    assert cache.stats()["stale_served"] == 1
+
+    # the stored copy still has its etag for when the board is back
+    cache._memory.clear()
+    stored = await cache.aget(url)
+    assert stored.etag == '"v1"' and stored.job.title == "Data Engineer"
+    await scraper.close()
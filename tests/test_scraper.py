@@ -0,0 +1,147 @@
+import asyncio
+import httpx
+import pytest
+from app.tools.scraper import JobScraper, HostScheduler
+
+JOB_PAGE = """
+<html><head><title>Backend Engineer</title>
+<meta property="og:site_name" content="Acme">
+<script type="application/ld+json">
+{"@type": "JobPosting", "title": "Backend Engineer", "hiringOrganization": {"name": "Acme"},
+ "jobLocation": {"address": {"addressLocality": "Berlin", "addressRegion": "BE"}}}
+</script></head>
+<body><nav>Menu</nav><main><h1>Backend Engineer</h1><p>Python and SQL required.</p></main></body></html>
+"""
+
+
+@pytest.mark.asyncio
+async def test_scrape_uses_one_shared_client():
+    """Every scrape goes through the same pooled AsyncClient."""
+    calls = []
+
+    def handler(request):
+        calls.append(str(request.url))
+        return httpx.Response(200, text=JOB_PAGE)
+
+    scraper = JobScraper(transport=httpx.MockTransport(handler))
+    await scraper.start()
+    client = scraper._client
+
+    job = await scraper.scrape("https://jobs.example.com/1")
+    await scraper.scrape("https://jobs.example.com/2")
+
+    assert scraper._client is client
+    assert len(calls) == 2
+    assert job.title == "Backend Engineer"
+    assert job.company == "Acme"
+    assert job.location == "Berlin, BE"
+    assert "Python and SQL required." in job.raw_text
+    assert "Menu" not in job.raw_text
+
+    await scraper.close()
+    assert scraper._client is None
+
+
+@pytest.mark.asyncio
+async def test_scrape_runs_concurrently():
+    """A slow board must not serialize other scrapes."""
+
+    async def handler(request):
+        await asyncio.sleep(0.2)
+        return httpx.Response(200, text=JOB_PAGE)
+
+    scheduler = HostScheduler(host_concurrency=5, host_burst=5)
+    scraper = JobScraper(transport=httpx.MockTransport(handler), scheduler=scheduler)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    jobs = await asyncio.gather(*(scraper.scrape(f"https://jobs.example.com/{i}") for i in range(5)))
+    elapsed = loop.time() - start
+    await scraper.close()
+
+    assert all(job.title == "Backend Engineer" for job in jobs)
+    assert elapsed < 0.6
+
+
+@pytest.mark.asyncio
+async def test_scrape_connection_error_returns_error_job():
+    def handler(request):
+        raise httpx.ConnectError("boom", request=request)
+
+    scraper = JobScraper(transport=httpx.MockTransport(handler))
+    job = await scraper.scrape("https://down.example.com")
+    await scraper.close()
+
+    assert job.title == "Error: Connection Failed"
+    assert job.company == "System"
+
+
+LONG_DESCRIPTION = "&lt;p&gt;" + "Build reliable Python services and data pipelines. " * 10 + "&lt;/p&gt;"
+JSON_LD_HEAD = (
+    '<html><head><title>Ignored</title><script type="application/ld+json">'
+    '{"@type": "JobPosting", "title": "Platform Engineer", "hiringOrganization": {"name": "Initech"},'
+    ' "jobLocation": {"address": {"addressLocality": "Remote"}}, "description": "' + LONG_DESCRIPTION + '"}'
+    '</script></head><body>'
+)
+
+
+@pytest.mark.asyncio
+async def test_json_ld_short_circuit_stops_reading():
+    """A complete JobPosting block ends the download, the rest of the page is never read."""
+    sent = []
+    filler = b"<div>" + b"x" * 4096 + b"</div>"
+
+    async def body():
+        for chunk in [JSON_LD_HEAD.encode()] + [filler] * 200:
+            sent.append(len(chunk))
+            yield chunk
+
+    total = len(JSON_LD_HEAD) + len(filler) * 200
+
+    def handler(request):
+        return httpx.Response(200, content=body(), headers={"Content-Length": str(total)})
+
+    scraper = JobScraper(transport=httpx.MockTransport(handler))
+    job, report = await scraper.scrape_with_report("https://jobs.example.com/ld")
+    await scraper.close()
+
+    assert job.title == "Platform Engineer"
+    assert job.company == "Initech"
+    assert job.location == "Remote"
+    assert job.raw_text.startswith("Build reliable Python services")
+    assert report.short_circuit
+    assert len(sent) < 5
+    assert report.bytes_downloaded < total
+    assert report.bytes_avoided == total - report.bytes_downloaded
+    assert scraper.transfer_stats["short_circuits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_body_is_capped():
+    page = "<html><body><main><p>Start of posting</p>" + "<p>padding</p>" * 5000 + "<p>never read</p></main></body></html>"
+
+    def handler(request):
+        return httpx.Response(200, text=page)
+
+    scraper = JobScraper(transport=httpx.MockTransport(handler), max_bytes=4096)
+    job, report = await scraper.scrape_with_report("https://jobs.example.com/big")
+    await scraper.close()
+
+    assert report.truncated
+    assert "Start of posting" in job.raw_text
+    assert "never read" not in job.raw_text
+
+
+@pytest.mark.asyncio
+async def test_meta_charset_is_honoured():
+    page = '<html><head><meta charset="iso-8859-1"><title>Caf\xe9 Manager</title></head><body><main>Cr\xe8me</main></body></html>'
+
+    def handler(request):
+        return httpx.Response(200, content=page.encode("latin-1"), headers={"Content-Type": "text/html"})
+
+    scraper = JobScraper(transport=httpx.MockTransport(handler))
+    job, report = await scraper.scrape_with_report("https://jobs.example.com/fr")
+    await scraper.close()
+
+    assert report.encoding == "iso8859-1"
+    assert job.title == "Caf\xe9 Manager"
+    assert job.raw_text == "Cr\xe8me"
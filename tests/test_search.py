@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+import pandas as pd
+import pytest
+import app.tools.scraper as scraper_module
+from app.tools.scraper import JobScraper, merge_search_results
+
+
+def fake_board_results(site):
+    rows = {
+        "linkedin": [
+            {"site": "linkedin", "job_url": "https://linkedin.com/jobs/1", "title": "Senior Python Engineer", "company": "Acme"},
+            {"site": "linkedin", "job_url": "https://linkedin.com/jobs/2", "title": "Data Analyst", "company": "Globex"},
+        ],
+        "indeed": [
+            # same posting cross-posted with different punctuation / case
+            {"site": "indeed", "job_url": "https://indeed.com/viewjob?jk=9", "title": "Senior Python Engineer!", "company": "ACME"},
+            {"site": "indeed", "job_url": "https://linkedin.com/jobs/2", "title": "Data Analyst II", "company": "Globex"},
+            {"site": "indeed", "job_url": "https://indeed.com/viewjob?jk=10", "title": "ML Engineer", "company": "Initech"},
+        ],
+    }
+    return pd.DataFrame(rows.get(site, []))
+
+
+@pytest.fixture
+def fake_jobspy(monkeypatch):
+    calls = []
+
+    def fake_scrape_jobs(site_name, **kwargs):
+        site = site_name[0]
+        calls.append(site)
+        if site == "glassdoor":
+            raise RuntimeError("blocked")
+        if site == "ziprecruiter":
+            time.sleep(1.0)
+        return fake_board_results(site)
+
+    monkeypatch.setattr(scraper_module, "scrape_jobs", fake_scrape_jobs)
+    return calls
+
+
+def test_merge_dedupes_by_url_and_title_company():
+    jobs = merge_search_results([fake_board_results("linkedin"), fake_board_results("indeed"), pd.DataFrame()])
+    assert list(jobs["job_url"]) == [
+        "https://linkedin.com/jobs/1",
+        "https://linkedin.com/jobs/2",
+        "https://indeed.com/viewjob?jk=10",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_search_is_parallel_partial_and_cached(fake_jobspy):
+    scraper = JobScraper()
+    scraper.search_site_timeout = 0.3
+
+    start = time.monotonic()
+    jobs, sites = await scraper.search_jobs_df("Python", "Remote", 10)
+    elapsed = time.monotonic() - start
+
+    # slow board timed out, broken board errored, the rest still came back
+    assert sites == {"linkedin": "ok", "indeed": "ok", "glassdoor": "error", "ziprecruiter": "timeout"}
+    assert len(jobs) == 3
+    assert elapsed < 0.9
+
+    again = await scraper.search_jobs("python ", "remote", 10)
+    assert len(again) == 3
+    assert fake_jobspy.count("linkedin") == 1
+    assert scraper.search_stats["cache_hits"] == 1
+    assert scraper.search_stats["duplicates_removed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_stuck_board_keeps_its_threads_to_itself(monkeypatch):
+    release = threading.Event()
+
+    def fake_scrape_jobs(site_name, **kwargs):
+        if site_name[0] == "ziprecruiter":
+            release.wait(5)  # hangs past any timeout
+        return fake_board_results(site_name[0])
+
+    monkeypatch.setattr(scraper_module, "scrape_jobs", fake_scrape_jobs)
+    scraper = JobScraper()
+    scraper.search_site_timeout = 0.2
+    scraper.search_site_workers = 1
+
+    for i in range(3):
+        start = time.monotonic()
+        _, sites = await scraper.search_jobs_df(f"query {i}", "", 10)
+        # the other boards still get their full timeout, nothing queues behind the stuck calls
+        assert sites == {"linkedin": "ok", "indeed": "ok", "glassdoor": "ok", "ziprecruiter": "timeout"}
+        assert time.monotonic() - start < 0.5
+    assert scraper._search_running["ziprecruiter"] == 1  # later searches skipped it instead of queueing
+    assert scraper.search_errors["ziprecruiter"].startswith("skipped")
+
+    release.set()
+    await asyncio.sleep(0.1)
+    assert scraper._search_running["ziprecruiter"] == 0
+    _, sites = await scraper.search_jobs_df("query 3", "", 10)
+    assert sites["ziprecruiter"] == "ok"
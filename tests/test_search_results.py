@@ -0,0 +1,58 @@
+import datetime
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.encoders import jsonable_encoder
+from app.tools import search_results
+
+
+def jobspy_frame():
+    return pd.DataFrame({
+        "site": ["linkedin", "indeed", "glassdoor"],
+        "job_url": ["https://a/1", "https://b/2", None],
+        "title": ["Python Dev", "Data Analyst", np.nan],
+        "min_amount": [100000.0, np.nan, 90000.0],
+        "date_posted": [datetime.date(2026, 9, 1), None, datetime.date(2026, 9, 3)],
+        "emails": [["hr@a.com"], None, None],
+        "is_remote": [True, False, None],
+    })
+
+
+def old_cleaning(jobs):
+    # what /api/search-jobs did before, row by row
+    cleaned = []
+    for job in jobs.to_dict(orient="records"):
+        cleaned.append({k: (None if not isinstance(v, list) and pd.isna(v) else v) for k, v in job.items()})
+    return jsonable_encoder(cleaned)
+
+
+def test_records_match_row_by_row_cleaning():
+    jobs = jobspy_frame()
+    payload = json.loads(search_results.search_payload(jobs, {"linkedin": "ok"}))
+    assert payload["results"] == old_cleaning(jobs)
+    assert payload["sites"] == {"linkedin": "ok"}
+    assert payload["results"][1]["min_amount"] is None
+    assert payload["results"][0]["date_posted"] == "2026-09-01"
+
+
+def test_projection_and_columnar_format():
+    payload = json.loads(search_results.search_payload(jobspy_frame(), {}, fields=["title", "job_url", "nope"], fmt="columns"))
+    results = payload["results"]
+    assert results["columns"] == ["title", "job_url"]
+    assert results["count"] == 3
+    assert results["data"]["title"] == ["Python Dev", "Data Analyst", None]
+
+
+def test_empty_results():
+    payload = json.loads(search_results.search_payload(pd.DataFrame(), {"indeed": "timeout"}))
+    assert payload == {"results": [], "sites": {"indeed": "timeout"}}
+
+
+@pytest.mark.skipif(not search_results.ARROW_AVAILABLE, reason="pyarrow not installed")
+def test_arrow_round_trip():
+    import pyarrow as pa
+    body = search_results.arrow_ipc(jobspy_frame(), fields=["site", "min_amount", "emails"])
+    table = pa.ipc.open_stream(body).read_all()
+    assert table.column_names == ["site", "min_amount", "emails"]
+    assert table.column("min_amount").to_pylist() == [100000.0, None, 90000.0]
@@ -0,0 +1,144 @@
+import asyncio
+import os
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test-key")
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.tools.near_dupes import NearDuplicateIndex
+from app.tools.scraper import JobScraper
+from app.tools.single_flight import SingleFlight
+
+JOB_PAGE = "<html><head><title>Data Engineer</title></head><body><main>Spark, Airflow</main></body></html>"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return {"score": 80}
+
+    results = await asyncio.gather(*(flight.do("k", work) for _ in range(10)))
+    assert len(runs) == 1
+    assert all(r == {"score": 80} for r in results)
+    assert flight.stats() == {"calls": 10, "executed": 1, "coalesced": 9, "errors": 0, "cancelled": 0, "in_flight": 0}
+
+    # finished keys are forgotten, the next call runs again
+    await flight.do("k", work)
+    assert len(runs) == 2
+
+
+@pytest.mark.asyncio
+async def test_error_reaches_every_waiter():
+    flight = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise ValueError("llm down")
+
+    results = await asyncio.gather(*(flight.do("k", boom) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.stats()["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_the_others():
+    flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def work():
+        started.set()
+        await asyncio.sleep(0.05)
+        return "done"
+
+    first = asyncio.create_task(flight.do("k", work))
+    second = asyncio.create_task(flight.do("k", work))
+    await started.wait()
+    first.cancel()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert flight.stats()["cancelled"] == 0
+
+
+@pytest.mark.asyncio
+async def test_work_is_cancelled_when_every_waiter_leaves():
+    flight = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    tasks = [asyncio.create_task(flight.do("k", work)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.wait_for(cancelled.wait(), 1)
+    await asyncio.sleep(0)
+    assert flight.in_flight() == 0
+    assert flight.stats()["cancelled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_scraper_coalesces_same_normalized_url():
+    calls = []
+
+    async def handler(request):
+        calls.append(str(request.url))
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, text=JOB_PAGE)
+
+    scraper = JobScraper(transport=httpx.MockTransport(handler))
+    jobs = await asyncio.gather(
+        scraper.scrape("https://jobs.example.com/1?utm_source=slack"),
+        scraper.scrape("https://jobs.example.com/1"),
+        scraper.scrape("https://JOBS.example.com/1/#apply"),
+        scraper.scrape("https://jobs.example.com/2"),
+    )
+    await scraper.close()
+
+    assert len(calls) == 2
+    assert {j.title for j in jobs} == {"Data Engineer"}
+    assert scraper.inflight.stats()["coalesced"] == 2
+
+
+def test_identical_analyze_requests_run_once(monkeypatch):
+    saved, runs = [], []
+
+    async def fake_score(resume_text, job_data, prefs, resume=None):
+        runs.append(job_data.title)
+        await asyncio.sleep(0.1)
+        return {"match_score": 70, "matched_skills": [], "missing_skills": [], "tailoring_tips": [], "fit_summary": "ok"}
+
+    monkeypatch.setattr(main, "score_job", fake_score)
+    monkeypatch.setattr(main, "add_applications", lambda records: saved.extend(records))
+    monkeypatch.setattr(main, "dupe_index", NearDuplicateIndex(path=":memory:"))
+    monkeypatch.setattr(main, "analysis_flight", SingleFlight())
+
+    body = {"job_title": "Data Engineer", "company": "Globex", "job_description": "Spark and SQL", "resume_text": "Python"}
+
+    async def fire():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.post("/api/analyze-manual", json=body) for _ in range(5)))
+
+    responses = asyncio.run(fire())
+    assert all(r.status_code == 200 and r.json()["match_score"] == 70 for r in responses)
+    assert len(runs) == 1 and len(saved) == 1
+    assert main.analysis_flight.stats()["coalesced"] == 4
+
+    with TestClient(main.app) as client:
+        assert client.get("/api/stats").json()["single_flight"]["analysis"]["coalesced"] == 4
@@ -0,0 +1,92 @@
+import os
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test-key")
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app import database
+from app.tools.near_dupes import NearDuplicateIndex
+
+ANALYSIS = {
+    "match_score": 72,
+    "matched_skills": ["Python", "SQL"],
+    "missing_skills": ["Spark"],
+    "tailoring_tips": ["Mention the Airflow migration"],
+    "fit_summary": "Solid data engineering fit.",
+    "estimated": False,
+}
+POSTING = {
+    "title": "Data Engineer",
+    "company": "Globex",
+    "location": "Austin",
+    "raw_text": "We build streaming pipelines with Spark, Kafka and SQL. " * 40,
+}
+
+
+def record(url, analysis=ANALYSIS, job=POSTING):
+    return {"job_title": job["title"], "company": job["company"], "score": analysis["match_score"], "url": url,
+            "analysis": analysis, "job": job}
+
+
+def test_postings_and_analyses_stored_once_and_compressed(memory_db):
+    # the same posting from two boards, and again in a later batch with the keys in another order
+    database.add_applications([record("https://a/1"), record("https://b/1"), record("https://a/2", dict(ANALYSIS, match_score=40))])
+    database.add_applications([record("https://c/1", job=dict(reversed(list(POSTING.items()))))])
+
+    db = database.SessionLocal()
+    blobs = db.query(database.BlobTable).all()
+    db.close()
+    assert len(blobs) == 3  # one posting, two distinct analyses
+    posting = next(b for b in blobs if b.size > 1000)
+    assert posting.codec == "zlib" and len(posting.data) < posting.size / 5
+    assert {b.codec for b in blobs if b is not posting} == {"raw"}
+
+    stored = database.get_stored_analysis(2)
+    assert stored["analysis"] == ANALYSIS
+    assert stored["job"] == dict(POSTING, url="https://b/1")
+    assert stored["application"]["match_score"] == 72
+    assert database.get_stored_analysis(99) is None
+
+
+def test_rows_without_analysis(memory_db):
+    database.add_application(job_title="Old", company="Acme", score=50, url="https://old")
+    stored = database.get_stored_analysis(1)
+    assert stored["analysis"] is None and stored["job"] is None
+
+
+def test_reopened_analysis_needs_no_network(memory_db, monkeypatch):
+    async def score_job(resume_text, job_data, prefs, resume=None):
+        return dict(ANALYSIS)
+
+    monkeypatch.setattr(main, "score_job", score_job)
+    monkeypatch.setattr(main, "dupe_index", NearDuplicateIndex(path=":memory:"))
+    body = {"job_title": "Data Engineer", "company": "Globex", "job_description": POSTING["raw_text"], "resume_text": "Python", "user_id": "u1"}
+    with TestClient(main.app) as client:
+        assert client.post("/api/analyze-manual", json=body).status_code == 200
+
+    async def offline(*args, **kwargs):
+        raise AssertionError("no network calls when reopening an analysis")
+
+    monkeypatch.setattr(main, "score_job", offline)
+    monkeypatch.setattr(main.scraper, "scrape", offline)
+    with TestClient(main.app) as client:
+        application = client.get("/api/dashboard", params={"user_id": "u1"}).json()[0]
+        stored = client.get(f"/api/applications/{application['id']}", params={"user_id": "u1"}).json()
+        assert client.get("/api/applications/999", params={"user_id": "u1"}).status_code == 404
+
+    assert stored["application"]["id"] == application["id"]
+    assert stored["analysis"] == ANALYSIS
+    assert stored["job"]["raw_text"] == POSTING["raw_text"] and stored["job"]["url"] == "Manual Entry"
+
+
+def test_only_the_owner_gets_an_analysis(memory_db):
+    database.add_applications([dict(record("https://a/1"), user_id="u1"), record("https://a/2")])
+
+    with TestClient(main.app) as client:
+        assert client.get("/api/applications/1", params={"user_id": "u1"}).status_code == 200
+        assert client.get("/api/applications/1", params={"user_id": "u2"}).status_code == 404
+        assert client.get("/api/applications/1").status_code == 404  # not anonymous either
+        assert client.get("/api/applications/2").status_code == 200
+        assert client.get("/api/applications/2", params={"user_id": "u1"}).status_code == 404
@@ -0,0 +1,155 @@
+import json
+import os
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test-key")
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.agents.scoring_agent import ScoringAgent
+from app.models import JobDescription
+from app.tools.json_stream import JsonFieldStream
+from app.tools.near_dupes import NearDuplicateIndex
+from llm_client import AIClient, LLMCache, LLMError
+
+SCORE_REPLY = """```json
+{"match_score": 68, "matched_skills": ["Python", "SQL"], "missing_skills": ["Go"],
+ "tailoring_tips": ["Add Go", "Quantify impact", "Mention \\"Airflow\\""], "fit_summary": "Solid data engineer."}
+```"""
+JOB = JobDescription(title="Data Engineer", company="Globex", location="Berlin, BE", raw_text="Python SQL Go, remote friendly")
+
+
+class FakeLLM:
+    """chat / chat_stream provider that replays a canned reply a few characters at a time."""
+
+    def __init__(self, reply):
+        self.reply = reply
+
+    async def chat(self, prompt, **kwargs):
+        return self.reply
+
+    async def chat_stream(self, prompt, **kwargs):
+        for i in range(0, len(self.reply), 7):
+            yield self.reply[i:i + 7]
+
+
+def test_fields_are_emitted_as_soon_as_they_close():
+    parser = JsonFieldStream()
+    seen = []
+    for i, ch in enumerate(SCORE_REPLY):
+        for name, value in parser.feed(ch):
+            seen.append((name, value, i))
+
+    assert [s[0] for s in seen] == ["match_score", "matched_skills", "missing_skills", "tailoring_tips", "fit_summary"]
+    assert seen[1][1] == ["Python", "SQL"]
+    assert seen[3][1][2] == 'Mention "Airflow"'
+    # the list is emitted on its closing bracket, before the next key starts
+    assert SCORE_REPLY[seen[1][2]] == "]"
+    assert parser.done
+
+
+@pytest.mark.asyncio
+async def test_stream_score_ends_with_generate_score_result():
+    agent = ScoringAgent(llm_provider=FakeLLM(SCORE_REPLY))
+    prefs = {"field": "data", "locations": ["Berlin"], "remote_preference": True}
+
+    events = [e async for e in agent.stream_score("Python dev", JOB, prefs)]
+    expected = await agent.generate_score("Python dev", JOB, prefs)
+
+    assert events[-1] == {"result": expected}
+    fields = {e["field"]: e["value"] for e in events[:-1]}
+    # preference boost is already in the streamed score / summary
+    assert fields["match_score"] == expected["match_score"] > 68
+    assert fields["fit_summary"] == expected["fit_summary"]
+
+
+class FakeStream:
+    def __init__(self, pieces, fail=False):
+        self.pieces, self.fail = pieces, fail
+
+    def __aiter__(self):
+        return self._gen()
+
+    async def _gen(self):
+        for piece in self.pieces:
+            delta = type("Delta", (), {"content": piece})
+            yield type("Chunk", (), {"choices": [type("Choice", (), {"delta": delta})]})
+        if self.fail:
+            raise RuntimeError("connection reset")
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_caches_only_complete_streams():
+    client = AIClient(api_key="test-key", cache=LLMCache(path=":memory:"))
+    calls = []
+
+    class Completions:
+        async def create(self, **kwargs):
+            calls.append(kwargs)
+            return FakeStream(["Hel", "lo", None, "!"], fail=len(calls) == 1)
+
+    client.client.chat.completions = Completions()
+
+    failed = []
+    with pytest.raises(LLMError):
+        async for chunk in client.chat_stream("hi"):
+            failed.append(chunk)
+    # tokens were already out, so no silent retry
+    assert failed == ["Hel", "lo", "!"] and len(calls) == 1
+
+    assert [c async for c in client.chat_stream("hi")] == ["Hel", "lo", "!"]
+    assert calls[-1]["stream"] is True
+    # complete reply now cached, served as one chunk without a request
+    assert [c async for c in client.chat_stream("hi")] == ["Hello!"]
+    assert await client.chat("hi") == "Hello!"
+    assert len(calls) == 2
+
+
+@pytest.fixture
+def client(monkeypatch):
+    saved = []
+
+    async def fake_scrape(url):
+        return JOB
+
+    monkeypatch.setattr(main.scraper, "scrape", fake_scrape)
+    monkeypatch.setattr(main, "add_applications", lambda records: saved.extend(records))
+    monkeypatch.setattr(main.application_writer, "durable", True)  # saved as soon as a response is back
+    monkeypatch.setattr(main, "get_user_preferences", lambda user_id: None)
+    monkeypatch.setattr(main, "dupe_index", NearDuplicateIndex(path=":memory:"))
+    monkeypatch.setattr(main.scoring_agent, "llm_provider", FakeLLM(SCORE_REPLY))
+    monkeypatch.setattr(main.answer_agent, "llm", FakeLLM("\n  I led the migration of our ETL jobs to Airflow."))
+    with TestClient(main.app) as c:
+        c.saved = saved
+        yield c
+
+
+def test_generate_answer_streams_tokens_over_sse(client):
+    body = {
+        "question": "Tell us about a project",
+        "job_url": "https://jobs.example.com/1",
+        "user_profile": {"personal_info": {"name": "Ada", "email": "ada@example.com"}, "skills": ["Airflow"]},
+    }
+    plain = client.post("/api/generate-answer", json=body).json()["answer"]
+
+    response = client.post("/api/generate-answer", json=body, headers={"Accept": "text/event-stream"})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [json.loads(line[len("data: "):]) for line in response.text.split("\n\n") if line]
+    assert len([e for e in events if "token" in e]) > 3
+    assert events[-1] == {"done": True, "answer": plain}
+    assert "".join(e.get("token", "") for e in events) == plain
+
+
+def test_analyze_stream_matches_analyze(client):
+    body = {"url": "https://jobs.example.com/1", "resume_text": "Python developer"}
+    final = client.post("/api/analyze", json=body).json()
+    # second run would reuse the stored analysis, start from a fresh index
+    main.dupe_index = NearDuplicateIndex(path=":memory:")
+
+    response = client.post("/api/analyze-stream", json=body)
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines() if line]
+    assert [l["field"] for l in lines[:-1]] == ["match_score", "matched_skills", "missing_skills", "tailoring_tips", "fit_summary"]
+    assert lines[-1] == {"done": True, "result": final}
+    assert len(client.saved) == 2
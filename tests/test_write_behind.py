@@ -0,0 +1,128 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import database
+from app.tools.write_behind import WriteBehindQueue
+
+
+def record(i):
+    return {"job_title": f"Job {i}", "company": "Acme", "score": i, "url": f"https://jobs/{i}"}
+
+
+class Recorder:
+    def __init__(self, delay=0.0, fail=False):
+        self.groups = []
+        self.delay = delay
+        self.fail = fail
+
+    async def __call__(self, records):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("disk full")
+        self.groups.append([r["job_title"] for r in records])
+        return len(records)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_records_share_one_commit():
+    write = Recorder()
+    queue = WriteBehindQueue(write, max_batch=100, max_delay=0.05)
+    await queue.start()
+
+    start = time.perf_counter()
+    counts = await asyncio.gather(*(queue.submit([record(i)]) for i in range(10)))
+    assert time.perf_counter() - start < 0.03  # nobody waited for the group
+    assert counts == [1] * 10 and write.groups == []
+
+    await asyncio.sleep(0.1)
+    assert write.groups == [[f"Job {i}" for i in range(10)]]
+    stats = queue.stats()
+    assert stats["groups"] == 1 and stats["committed"] == 10 and stats["pending"] == 0 and stats["records_per_group"] == 10
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_full_groups_are_written_without_waiting_for_the_delay():
+    write = Recorder()
+    queue = WriteBehindQueue(write, max_batch=3, max_delay=60)
+    await queue.start()
+    for i in range(7):
+        queue.submit_nowait([record(i)])
+
+    await asyncio.sleep(0.05)
+    assert [len(g) for g in write.groups] == [3, 3]  # the 7th waits for company (or shutdown)
+    await queue.close()
+    assert [len(g) for g in write.groups] == [3, 3, 1]
+    assert queue.stats()["largest_group"] == 3
+
+
+@pytest.mark.asyncio
+async def test_durable_submit_waits_for_the_commit():
+    write = Recorder(delay=0.05)
+    queue = WriteBehindQueue(write, max_delay=0.01, durable=True)
+    await queue.start()
+
+    await queue.submit([record(1)])
+    assert write.groups == [["Job 1"]]
+    await queue.submit([record(2)], wait=False)
+    assert len(write.groups) == 1
+    await queue.close()
+    assert len(write.groups) == 2 and queue.stats()["durable_waits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_commit_reaches_waiters_and_worker_keeps_going():
+    write = Recorder(fail=True)
+    queue = WriteBehindQueue(write, max_delay=0.01)
+    await queue.start()
+
+    with pytest.raises(RuntimeError):
+        await queue.submit([record(1)], wait=True)
+    write.fail = False
+    await queue.submit([record(2)], wait=True)
+    await queue.close()
+    assert write.groups == [["Job 2"]] and queue.stats()["failed"] == 1 and queue.stats()["retries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_group_is_retried_once():
+    write = Recorder()
+    calls = []
+
+    async def flaky(records):
+        calls.append(len(records))
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+        return await write(records)
+
+    queue = WriteBehindQueue(flaky, max_delay=0.01)
+    await queue.start()
+    for i in range(3):
+        queue.submit_nowait([record(i)])
+    await queue.close()
+    assert calls == [3, 3] and write.groups == [["Job 0", "Job 1", "Job 2"]]
+    assert queue.stats()["failed"] == 0 and queue.stats()["retries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_close_commits_queued_records_to_the_database(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    database.Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine))
+
+    queue = WriteBehindQueue(lambda records: database.run_db_write(database.add_applications, records), max_delay=60)
+    await queue.start()
+    await asyncio.gather(*(queue.submit([record(i)]) for i in range(20)))
+    assert database.get_all_applications() == []
+    await queue.close()
+    assert len(database.get_all_applications()) == 20
+
+    # after shutdown records are written straight away
+    assert queue.submit_nowait([record(99)]) is False
+    await queue.submit([record(99)])
+    assert len(database.get_all_applications()) == 21 and queue.stats()["direct"] == 1